@@ -0,0 +1,57 @@
+"""
+A subset of unittests used for testing the multi-move analysis.
+"""
+import unittest
+
+from engine import Engine
+from headless import analyse_position, make_game
+from strategy import analyse
+
+
+class AnalyseUnitTests(unittest.TestCase):
+    def test_scores_match_engine(self):
+        """
+        Test that every move is scored as the engine solves it, best first.
+        """
+        game = make_game('s', True, 18)
+        engine = Engine()
+        lines = analyse(game)
+        self.assertEqual(sorted(move for move, _, _ in lines), [1, 4, 9, 16])
+        for move, score, _ in lines:
+            self.assertEqual(score, -engine.value(
+                game, game.current_state.make_move(move)))
+        self.assertEqual([score for _, score, _ in lines],
+                         sorted((score for _, score, _ in lines),
+                                reverse=True))
+
+    def test_lines_play_to_the_end(self):
+        """
+        Test that each principal variation starts with its move, is valid
+        and ends the game, with the winner its score says.
+        """
+        game = make_game('h', True, 2)
+        for move, score, line in analyse_position('h', 2, ['A']):
+            self.assertEqual(line[0], move)
+            state = game.current_state.make_move('A')
+            for played in line:
+                self.assertTrue(state.is_valid_move(played))
+                state = state.make_move(played)
+            self.assertTrue(game.is_over(state))
+            # p2 made move, and the player to move at the end has lost
+            self.assertEqual(state.p1_turn, score == 1)
+
+    def test_shared_table(self):
+        """
+        Test that the analysis fills a given table, which a second analysis
+        then answers from.
+        """
+        table = {}
+        first = analyse_position('h', 2, [], table=table)
+        size = len(table)
+        self.assertGreater(size, 0)
+        self.assertEqual(analyse_position('h', 2, [], table=table), first)
+        self.assertEqual(len(table), size)
+
+
+if __name__ == "__main__":
+    unittest.main()
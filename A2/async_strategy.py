@@ -0,0 +1,130 @@
+"""
+Strategies for asyncio.
+
+An async strategy is a coroutine function strategy(game, control) that
+returns a move for game. control is a SearchControl: the strategy should stop
+when control.should_stop() is true, and report its best move so far with
+control.report so that a move is available if it runs out of time.
+
+as_async turns the blocking strategies of strategy.py into async strategies
+by running them in background threads, and choose_move asks any strategy for
+a move with an optional time limit.
+"""
+from typing import Any, Callable
+import asyncio
+import copy
+import inspect
+import threading
+import time
+from strategy import SearchControl
+
+
+def run_in_thread(function: Callable, *args: Any) -> asyncio.Future:
+    """
+    Return a future for function(*args), called in a new daemon thread.
+
+    Unlike the event loop's default executor, a daemon thread that is still
+    running does not keep the event loop or the program from shutting down.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result: Any, error: BaseException) -> None:
+        """
+        Set the outcome of future, unless it was cancelled.
+        """
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run() -> None:
+        """
+        Call function and pass its outcome to the event loop.
+        """
+        try:
+            outcome = (function(*args), None)
+        except Exception as error:
+            outcome = (None, error)
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(settle, *outcome)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def from_sync(strategy: Callable[[Any], Any]) -> Callable:
+    """
+    Return an async strategy that runs the blocking strategy(game) in a
+    background thread.
+
+    A blocking strategy cannot be interrupted: if it runs out of time it is
+    left to finish in the background, and its move is ignored.
+    """
+    async def async_strategy(game: Any, control: SearchControl) -> Any:
+        """
+        Return strategy's move for game.
+        """
+        return await run_in_thread(strategy, copy.copy(game))
+    async_strategy.__name__ = strategy.__name__
+    return async_strategy
+
+
+def from_searching(strategy: Callable[[Any, SearchControl], Any]) -> Callable:
+    """
+    Return an async strategy that runs strategy(game, control) in a
+    background thread. strategy is a blocking strategy that takes a
+    SearchControl, such as iterative_deepening_minimax, so it stops when it
+    runs out of time.
+    """
+    async def async_strategy(game: Any, control: SearchControl) -> Any:
+        """
+        Return strategy's move for game.
+        """
+        return await run_in_thread(strategy, copy.copy(game), control)
+    async_strategy.__name__ = strategy.__name__
+    return async_strategy
+
+
+def as_async(strategy: Callable) -> Callable:
+    """
+    Return strategy as an async strategy: unchanged if it is a coroutine
+    function, through from_searching if it takes a control argument, and
+    through from_sync otherwise.
+    """
+    if asyncio.iscoroutinefunction(strategy):
+        return strategy
+    if 'control' in inspect.signature(strategy).parameters:
+        return from_searching(strategy)
+    return from_sync(strategy)
+
+
+async def choose_move(strategy: Callable, game: Any,
+                      timeout: float = None) -> Any:
+    """
+    Return the move strategy makes for game, where strategy is an async or
+    blocking strategy.
+
+    If timeout seconds pass first, the strategy is told to stop and the best
+    move it has reported is returned, or the first possible move if it has
+    reported none. Cancelling choose_move also stops the strategy.
+    """
+    control = SearchControl(None if timeout is None
+                            else time.monotonic() + timeout)
+    task = asyncio.ensure_future(as_async(strategy)(game, control))
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        task.cancel()
+        if control.best_move is not None:
+            return control.best_move
+        return next(game.current_state.iter_possible_moves(), None)
+    finally:
+        control.stop()
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,91 @@
+"""
+A subset of unittests used for testing async strategies and the asyncio
+play loop.
+"""
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from game_interface import GameInterface, playable_games, usable_strategies
+from async_strategy import choose_move
+from strategy import SearchControl, iterative_deepening_minimax
+StonehengeGame = playable_games['h']
+SubtractSquareGame = playable_games['s']
+
+
+class AsyncStrategyUnitTests(unittest.TestCase):
+    def test_deadline_returns_best_so_far(self):
+        """
+        Test that iterative deepening on a large Stonehenge board stops at
+        its deadline and returns a valid move found before it.
+        """
+        with patch('builtins.input', return_value='5'):
+            game = StonehengeGame(True)
+
+        start = time.monotonic()
+        move = asyncio.run(choose_move(iterative_deepening_minimax, game,
+                                       0.3))
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(game.current_state.is_valid_move(move),
+                        "choose_move returned the invalid move {}."
+                        .format(move))
+        self.assertLess(elapsed, 2,
+                        "choose_move with a timeout of 0.3s took {:.2f}s."
+                        .format(elapsed))
+
+    def test_iterative_deepening_reports(self):
+        """
+        Test that iterative deepening reports its move for each depth, and
+        stops deepening once the whole game has been searched.
+        """
+        with patch('builtins.input', return_value='18'):
+            game = SubtractSquareGame(True)
+        control = SearchControl()
+
+        move = iterative_deepening_minimax(game, control)
+
+        self.assertTrue(move in [1, 16],
+                        "The move for 18 should be 1 or 16, not {}."
+                        .format(move))
+        self.assertEqual(control.best_move, move,
+                         "The move returned should be the last reported.")
+        self.assertEqual(control.depth, 18,
+                         "Deepening should stop at depth 18, where every " +
+                         "line of play has been searched to the end.")
+
+    def test_async_strategy_and_sync_adapter(self):
+        """
+        Test that choose_move accepts both coroutine strategies and blocking
+        strategies.
+        """
+        with patch('builtins.input', return_value='4'):
+            game = SubtractSquareGame(True)
+
+        async def take_one(g, control):
+            return 1
+
+        self.assertEqual(asyncio.run(choose_move(take_one, game)), 1,
+                         "The move of an async strategy should be returned.")
+        self.assertEqual(asyncio.run(choose_move(usable_strategies['mr'],
+                                                 game)), 4,
+                         "The move of a blocking strategy should be returned.")
+
+    def test_play_async(self):
+        """
+        Test that play_async plays a game of Stonehenge to the end.
+        """
+        with patch('builtins.input', side_effect=['y', '2']):
+            interface = GameInterface(StonehengeGame,
+                                      iterative_deepening_minimax,
+                                      usable_strategies['ro'])
+        with patch('builtins.print'):
+            asyncio.run(interface.play_async(0.5))
+
+        self.assertTrue(interface.game.is_over(interface.game.current_state),
+                        "play_async should play until the game is over.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,285 @@
+"""
+A census of the StoneHenge state space.
+
+census expands every position reachable from the start of a board breadth
+first, one ply at a time, and counts for each ply:
+
+    positions - the distinct positions after that many moves
+    terminal - those where the game is over, which are not expanded
+    generated - the positions made by moves from the ply before, with
+                repeats
+    transpositions - generated minus positions: the positions reached
+                     again by another order of moves
+
+A position is its StoneHengeState.code(), held in a NumPy int64 array. A
+move from each position is made on the whole array at once: the digits of
+the codes are read with integer division, the player's digit for a cell is
+added to every position where the cell is free, and each ley-line through
+the cell is claimed where the player then holds half of it. Each ply is
+deduplicated with numpy.unique, which sorts. Codes fit in 64 bits up to
+side-length 4.
+
+When a ply would generate more codes than memory_limit, it is spilled: the
+generated codes are split by code into bucket files in a temporary
+directory, each bucket is deduplicated alone, and the ply is kept on disk as
+one .npy file per bucket, read back a chunk at a time. Run
+
+    python census.py SIZE [--memory-limit CODES] [--spill-dir DIR]
+
+to take the census of a board of side-length SIZE.
+"""
+from typing import Iterator, List, Union
+from math import ceil
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from stonehenge import StoneHengeState, ley_line_index
+
+# The largest side-length whose codes fit in 64 bits
+MAX_SIZE = 4
+# The most bucket files a spilled ply is split into
+MAX_BUCKETS = 256
+# A ply held in memory, or on disk as .npy files
+Ply = List[Union[np.ndarray, str]]
+
+
+class Layout:
+    """
+    Where each cell and ley-line of a board is found in its states' codes.
+
+    size - the side-length
+    cells - the number of cells
+    weights - the place value in a code of each cell, then each ley-line
+    lines - the cell positions of each ley-line
+    cell_lines - the ley-lines through each cell
+    halves - the cells needed to claim each ley-line
+    turn - the difference in code between p2 and p1 to move
+    """
+    size: int
+    cells: int
+    weights: List[int]
+    lines: tuple
+    cell_lines: tuple
+    halves: List[int]
+    turn: int
+
+    def __init__(self, size: int) -> None:
+        """
+        Initialize the Layout of a board of side-length size.
+        """
+        self.size = size
+        self.lines, self.cell_lines = ley_line_index(size)
+        self.cells = len(self.cell_lines)
+        digits = self.cells + len(self.lines)
+        # As in StoneHengeState.code: a digit for the player to move, a base
+        # 3 digit for each cell and ley-line, and 3 bits for the side-length
+        self.weights = [8 * 3 ** (digits - 1 - i) for i in range(digits)]
+        self.turn = 8 * 3 ** digits
+        self.halves = [int(ceil(len(line) / 2)) for line in self.lines]
+
+    def digit(self, codes: np.ndarray, index: int) -> np.ndarray:
+        """
+        Return the digit of each of codes for the cell or ley-line at index
+        (a ley-line's index follows the cells): 0 when unclaimed, or the
+        player who claimed it.
+        """
+        return codes // self.weights[index] % 3
+
+    def line_counts(self, codes: np.ndarray, player: int) -> np.ndarray:
+        """
+        Return the number of ley-lines player has claimed in each of codes.
+        """
+        count = np.zeros(len(codes), dtype=np.int64)
+        for x in range(len(self.lines)):
+            count += self.digit(codes, self.cells + x) == player
+        return count
+
+    def is_over(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Return whether the game is over at each of codes, as
+        StoneHenge.is_over decides.
+        """
+        half = int(ceil(len(self.lines) / 2))
+        return (self.line_counts(codes, 1) >= half) | \
+            (self.line_counts(codes, 2) >= half)
+
+    def children(self, codes: np.ndarray, player: int) -> np.ndarray:
+        """
+        Return the codes of the positions after every move by player from
+        each of codes, with repeats.
+        """
+        digits = [self.digit(codes, i) for i in range(len(self.weights))]
+        # The cells of each ley-line player holds before moving
+        held = [sum(digits[cell] == player for cell in line)
+                for line in self.lines]
+        # The other player moves next
+        turn = self.turn if player == 1 else -self.turn
+        result = []
+        for cell in range(self.cells):
+            free = digits[cell] == 0
+            child = codes[free] + (player * self.weights[cell] + turn)
+            for x in self.cell_lines[cell]:
+                line = self.cells + x
+                claim = (held[x][free] + 1 >= self.halves[x]) & \
+                    (digits[line][free] == 0)
+                child[claim] += player * self.weights[line]
+            result.append(child)
+        return np.concatenate(result)
+
+
+def _parts(ply: Ply, chunk: int) -> Iterator[np.ndarray]:
+    """
+    Return an iterator over the codes of ply, at most chunk at a time.
+    """
+    for part in ply:
+        codes = np.load(part, mmap_mode='r') if isinstance(part, str) \
+            else part
+        for start in range(0, len(codes), chunk):
+            yield np.asarray(codes[start:start + chunk])
+
+
+def _size(ply: Ply) -> int:
+    """
+    Return the number of codes in ply.
+    """
+    return sum(len(np.load(part, mmap_mode='r')) if isinstance(part, str)
+               else len(part) for part in ply)
+
+
+def census(size: int, p1_starts: bool = True, memory_limit: int = 1 << 24,
+           spill_dir: str = None) -> dict:
+    """
+    Return the census of a board of side-length size: a row of counts for
+    every ply, their totals, the seconds taken and the number of plies
+    spilled to disk.
+
+    At most about memory_limit codes are held in memory at once; plies that
+    would generate more are spilled to a temporary directory in spill_dir
+    (the system's if None), which is removed afterwards.
+
+    Raise ValueError if size is above MAX_SIZE.
+    """
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError('side-lengths 1 to {} fit in 64-bit codes'.format(
+            MAX_SIZE))
+    layout = Layout(size)
+    start = time.perf_counter()
+    directory = tempfile.mkdtemp(prefix='census', dir=spill_dir)
+    try:
+        rows, spilled = _expand(layout, p1_starts, memory_limit, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    totals = {name: sum(row[name] for row in rows)
+              for name in ['positions', 'terminal', 'generated',
+                           'transpositions']}
+    return {'size': size, 'plies': rows, 'totals': totals,
+            'seconds': time.perf_counter() - start, 'spilled': spilled}
+
+
+def _expand(layout: Layout, p1_starts: bool, memory_limit: int,
+            directory: str) -> tuple:
+    """
+    Return the rows of census for layout and the number of plies spilled,
+    using directory for spilled plies.
+    """
+    first = StoneHengeState(p1_starts, layout.size).code()
+    ply = [np.array([first], dtype=np.int64)]
+    player = 1 if p1_starts else 2
+    rows = [{'ply': 0, 'positions': 1, 'terminal': 0, 'generated': 1,
+             'transpositions': 0}]
+    spilled = 0
+    # Parents are expanded this many at a time, which bounds their children
+    chunk = max(memory_limit // layout.cells, 1)
+    while _size(ply):
+        parents = _size(ply)
+        spill = parents * layout.cells > memory_limit
+        generated = 0
+        if spill:
+            spilled += 1
+            buckets = min(max(2 * parents * layout.cells // memory_limit, 2),
+                          MAX_BUCKETS)
+            paths = [os.path.join(directory, 'b{}'.format(b))
+                     for b in range(buckets)]
+            files = [open(path, 'wb') for path in paths]
+            try:
+                for codes in _parts(ply, chunk):
+                    children = layout.children(codes, player)
+                    generated += len(children)
+                    # Children grouped by bucket, without the side-length
+                    # bits that every code shares
+                    which = children // 8 % buckets
+                    order = np.argsort(which, kind='stable')
+                    bounds = np.searchsorted(which[order],
+                                             np.arange(buckets + 1))
+                    for b in range(buckets):
+                        children[order[bounds[b]:bounds[b + 1]]].tofile(
+                            files[b])
+            finally:
+                for file in files:
+                    file.close()
+            groups = (np.fromfile(path, dtype=np.int64) for path in paths)
+        else:
+            children = [layout.children(codes, player)
+                        for codes in _parts(ply, chunk)]
+            generated = sum(len(codes) for codes in children)
+            groups = iter([np.concatenate(children)] if children else [])
+        positions = terminal = 0
+        next_ply = []
+        for b, group in enumerate(groups):
+            distinct = np.unique(group)
+            over = layout.is_over(distinct)
+            positions += len(distinct)
+            terminal += int(over.sum())
+            if spill:
+                os.remove(paths[b])
+                path = os.path.join(directory, 'p{}_{}.npy'.format(
+                    len(rows), b))
+                np.save(path, distinct[~over])
+                next_ply.append(path)
+            else:
+                next_ply.append(distinct[~over])
+        for part in ply:
+            if isinstance(part, str):
+                os.remove(part)
+        if not generated:
+            break
+        rows.append({'ply': len(rows), 'positions': positions,
+                     'terminal': terminal, 'generated': generated,
+                     'transpositions': generated - positions})
+        ply = next_ply
+        player = 3 - player
+    return rows, spilled
+
+
+def main() -> None:
+    """
+    Print the census of the board given on the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('size', type=int)
+    parser.add_argument('--memory-limit', type=int, default=1 << 24,
+                        help='the most codes to hold in memory at once')
+    parser.add_argument('--spill-dir')
+    args = parser.parse_args()
+    result = census(args.size, memory_limit=args.memory_limit,
+                    spill_dir=args.spill_dir)
+    print('{:>4} {:>12} {:>12} {:>12} {:>14}'.format(
+        'ply', 'positions', 'terminal', 'generated', 'transpositions'))
+    for row in result['plies']:
+        print('{ply:>4} {positions:>12} {terminal:>12} {generated:>12} '
+              '{transpositions:>14}'.format(**row))
+    print('totals', result['totals'])
+    print('{:.2f}s, {} plies spilled'.format(result['seconds'],
+                                              result['spilled']))
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        main()
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,56 @@
+"""
+A subset of unittests used for testing the state-space census.
+"""
+import unittest
+
+from census import census
+from game_interface import playable_games
+from stonehenge import StoneHengeState
+
+
+def set_census(size):
+    """
+    Return (positions, terminal) for every ply of a board of side-length
+    size, counted with sets of states.
+    """
+    game = playable_games['h'].from_state(None)
+    ply = {StoneHengeState(True, size)}
+    counts = [(1, 0)]
+    while ply:
+        children = {state.make_move(move) for state in ply
+                    for move in state.get_possible_moves()}
+        if not children:
+            break
+        over = {state for state in children if game.is_over(state)}
+        counts.append((len(children), len(over)))
+        ply = children - over
+    return counts
+
+
+class CensusUnitTests(unittest.TestCase):
+    def test_matches_sets_of_states(self):
+        """
+        Test that the census counts the positions and terminal positions
+        found with sets of StoneHengeStates.
+        """
+        for size in [1, 2]:
+            rows = census(size)['plies']
+            self.assertEqual([(row['positions'], row['terminal'])
+                              for row in rows], set_census(size))
+            for row in rows[1:]:
+                self.assertEqual(row['transpositions'],
+                                 row['generated'] - row['positions'])
+
+    def test_spilled_census(self):
+        """
+        Test that a census spilled to disk counts the same.
+        """
+        expected = census(2)
+        spilled = census(2, memory_limit=100)
+        self.assertGreater(spilled['spilled'], 0)
+        self.assertEqual(spilled['plies'], expected['plies'])
+        self.assertRaises(ValueError, census, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+"""
+A minimax engine with a cache of solved positions.
+
+Engine solves positions exactly, like recursive_minimax, but remembers the
+value of every position it solves in a table, so transpositions and later
+searches (from any game the engine plays) are answered from the table. An
+Engine can be called as a strategy.
+
+An engine playing one game can be re-rooted after each move: positions that
+can no longer be reached are dropped from its tables, and the rest are kept
+for its next move. make_engine_strategy wraps an engine as a strategy that
+GameInterface and play_headless re-root in this way, through
+reroot_strategies.
+
+analyse scores every move of a position with an Engine, giving each its
+principal variation.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+import random
+from strategy import SearchControl, SearchStopped, depth_limited_minimax
+
+
+class Engine:
+    """
+    A minimax engine whose table of solved positions is shared by every game
+    it searches.
+
+    table - maps each solved state to its value for the player to move
+    winning_moves - maps each solved state that is a win to a winning move,
+        kept only with a dict table so that a bounded table bounds memory
+    nodes - the number of positions searched
+    hits - the number of positions answered from table
+    """
+    table: dict
+    winning_moves: dict
+    nodes: int
+    hits: int
+
+    def __init__(self, table: dict = None, seed: int = None) -> None:
+        """
+        Initialize an Engine using table as its table of solved positions,
+        or a new table if table is None.
+
+        With a seed, moves are searched in an order shuffled by a random
+        number generator seeded with it, rather than in the order of
+        get_possible_moves. Values are the same either way, but engines with
+        different orders sharing a table solve different positions first.
+        """
+        self.table = {} if table is None else table
+        self.winning_moves = {}
+        self._keep_moves = isinstance(self.table, dict)
+        # The size of table after the last reroot
+        self._rooted_size = 1
+        self.nodes = 0
+        self.hits = 0
+        self._random = None if seed is None else random.Random(seed)
+
+    def moves(self, state: Any) -> Any:
+        """
+        Return the moves of state in the order this engine searches them.
+        """
+        if self._random is None:
+            return state.iter_possible_moves()
+        moves = state.get_possible_moves()
+        self._random.shuffle(moves)
+        return moves
+
+    def value(self, game: Any, state: Any,
+              control: SearchControl = None) -> int:
+        """
+        Return the value of state for its current player under perfect play:
+        state.WIN or state.LOSE.
+
+        Raise SearchStopped if control says to stop first.
+        """
+        known = self.table.get(state)
+        if known is not None:
+            self.hits += 1
+            return known
+        self.nodes += 1
+        if control is not None and control.should_stop():
+            raise SearchStopped
+        if game.is_over(state):
+            # The player who made the last move has won.
+            result = state.LOSE
+        else:
+            result = state.LOSE
+            for move in self.moves(state):
+                if self.value(game, state.make_move(move), control) == \
+                        state.LOSE:
+                    # Nothing beats a win, so the other moves need no search
+                    result = state.WIN
+                    if self._keep_moves:
+                        self.winning_moves[state] = move
+                    break
+        self.table[state] = result
+        return result
+
+    def best_move(self, game: Any, control: SearchControl = None) -> Any:
+        """
+        Return the most optimal move for game.
+
+        A one-move lookahead is reported to control before solving, so that
+        it has a move if it stops the search.
+        """
+        state = game.current_state
+        new_search = getattr(self.table, 'new_search', None)
+        if new_search is not None:
+            # Tables that age their entries start a new search
+            new_search()
+        if state in self.winning_moves:
+            self.hits += 1
+            return self.winning_moves[state]
+        if control is not None:
+            control.report(depth_limited_minimax(game, 1), 1)
+        moves = state.get_possible_moves()
+        try:
+            for move in self.moves(state):
+                if self.value(game, state.make_move(move), control) == \
+                        state.LOSE:
+                    self.table[state] = state.WIN
+                    if self._keep_moves:
+                        self.winning_moves[state] = move
+                    return move
+        except SearchStopped:
+            return control.best_move
+        return moves[0] if moves else None
+
+    def reroot(self, state: Any, force: bool = False) -> int:
+        """
+        Drop the solved positions this engine no longer needs now that the
+        game it is playing has reached state, and return how many were
+        dropped.
+
+        The positions kept are those reachable from state when this engine
+        plays its known winning moves, so the walk follows one move from
+        each winning position and every move from the others. Unless force,
+        nothing is done until the table has grown to twice its size after
+        the last re-root, so re-rooting after every move adds time in
+        proportion to the positions solved, not to the moves played.
+        """
+        if not force and len(self.table) < 2 * self._rooted_size:
+            return 0
+        kept = {}
+        if state in self.table:
+            kept[state] = self.table[state]
+        stack = [state]
+        while stack:
+            position = stack.pop()
+            if position in self.winning_moves:
+                moves = [self.winning_moves[position]]
+            else:
+                moves = position.iter_possible_moves()
+            for move in moves:
+                child = position.make_move(move)
+                if child in self.table and child not in kept:
+                    kept[child] = self.table[child]
+                    stack.append(child)
+        dropped = len(self.table) - len(kept)
+        if dropped:
+            self.table.clear()
+            self.table.update(kept)
+            self.winning_moves = {position: move for position, move
+                                  in self.winning_moves.items()
+                                  if position in kept}
+        self._rooted_size = max(len(kept), 1)
+        return dropped
+
+    def __call__(self, game: Any, control: SearchControl = None) -> Any:
+        """
+        Return the most optimal move for game, so the engine can be used as
+        a strategy.
+        """
+        return self.best_move(game, control)
+
+    def stats(self) -> dict:
+        """
+        Return the engine's counters and the size of its table.
+        """
+        return {'positions': len(self.table), 'nodes': self.nodes,
+                'hits': self.hits}
+
+
+def make_engine_strategy(engine: Engine = None) -> Callable[[Any], Any]:
+    """
+    Return a strategy that plays engine's moves (a new Engine's if None).
+
+    The strategy has engine as its engine attribute and engine.reroot as its
+    reroot attribute, which GameInterface calls with the new state after
+    every move, so the engine keeps what it solved for the positions still
+    to come.
+    """
+    engine = Engine() if engine is None else engine
+
+    def engine_strategy(game: Any, control: SearchControl = None) -> Any:
+        """
+        Return engine's move for game.
+        """
+        return engine.best_move(game, control)
+    engine_strategy.engine = engine
+    engine_strategy.reroot = engine.reroot
+    return engine_strategy
+
+
+def reroot_strategies(state: Any, strategies: List[Callable]) -> None:
+    """
+    Call the reroot attribute of each of strategies that has one with
+    state, the new state of the game they are playing.
+    """
+    for strategy in strategies:
+        reroot = getattr(strategy, 'reroot', None)
+        if reroot is not None:
+            reroot(state)
+
+
+def principal_variation(engine: Engine, game: Any, state: Any) -> List[Any]:
+    """
+    Return the moves from state to the end of game when both players play
+    perfectly, as engine solves the positions: each player makes their
+    first winning move, or their first move if they have none.
+    """
+    line = []
+    while not game.is_over(state):
+        moves = state.get_possible_moves()
+        if not moves:
+            break
+        best = moves[0]
+        for move in moves:
+            if engine.value(game, state.make_move(move)) == state.LOSE:
+                best = move
+                break
+        line.append(best)
+        state = state.make_move(best)
+    return line
+
+
+def analyse(game: Any, table: Dict[Any, int] = None) \
+        -> List[Tuple[Any, int, List[Any]]]:
+    """
+    Return (move, score, line) for every possible move of game's current
+    state, best score first and otherwise in the order of
+    get_possible_moves. score is WIN or LOSE for the player making move, and
+    line is the principal variation: move, then perfect play to the end.
+
+    Every move is solved by one Engine with table (a new one if table is
+    None, or another Engine's table), so positions shared between the moves'
+    subtrees are solved once.
+    """
+    engine = Engine(table)
+    state = game.current_state
+    lines = []
+    for move in state.get_possible_moves():
+        child = state.make_move(move)
+        lines.append((move, -engine.value(game, child),
+                      [move] + principal_variation(engine, game, child)))
+    return sorted(lines, key=lambda line: -line[1])
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,77 @@
+"""
+A subset of unittests used for testing the engine's search reuse.
+"""
+import unittest
+from unittest.mock import patch
+
+from engine import Engine, make_engine_strategy
+from game_interface import GameInterface, new_strategy, playable_games, \
+    usable_strategies
+from headless import make_game, play_headless
+
+
+class EngineUnitTests(unittest.TestCase):
+    def test_search_kept_between_moves(self):
+        """
+        Test that an engine playing both sides of a game searches only for
+        its first move, re-rooted after every move.
+        """
+        strategy = make_engine_strategy()
+        engine = strategy.engine
+        nodes = []
+
+        def counted(game):
+            """
+            Return strategy's move, recording the engine's nodes before it.
+            """
+            nodes.append(engine.nodes)
+            return strategy(game)
+        counted.reroot = strategy.reroot
+        play_headless(make_game('h', True, 3), counted, counted)
+        self.assertGreater(nodes[1], 0)
+        self.assertEqual(nodes[-1], nodes[1])
+
+    def test_reroot_drops_unreachable(self):
+        """
+        Test that re-rooting to a new game drops the old game's positions,
+        and that re-rooting within a game keeps the current position.
+        """
+        engine = Engine()
+        game = make_game('h', True, 2)
+        move = engine.best_move(game)
+        size = len(engine.table)
+        child = game.current_state.make_move(move)
+        self.assertGreater(engine.reroot(child, True), 0)
+        self.assertIn(child, engine.table)
+        self.assertLess(len(engine.table), size)
+        remaining = len(engine.table)
+        self.assertEqual(engine.reroot(make_game('s', True, 5).current_state,
+                                       True), remaining)
+        self.assertEqual(len(engine.table), 0)
+
+    def test_game_interface_engine(self):
+        """
+        Test that GameInterface plays a game with the engine strategy.
+        """
+        strategy = make_engine_strategy()
+        with patch('builtins.input', side_effect=['y', '11']), \
+                patch('builtins.print'):
+            interface = GameInterface(playable_games['s'], strategy,
+                                      strategy)
+            interface.play()
+        self.assertTrue(interface.game.is_winner('p1'))
+
+    def test_engine_per_game(self):
+        """
+        Test that new_strategy builds a new engine for every game, and gives
+        other strategies as they are.
+        """
+        first, second = new_strategy('me'), new_strategy('me')
+        self.assertIsNot(first.engine, second.engine)
+        play_headless(make_game('s', True, 20), first, first)
+        self.assertEqual(len(second.engine.table), 0)
+        self.assertIs(new_strategy('mr'), usable_strategies['mr'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+Golden results for the minimax tests.
+
+A fixture file holds the score of every move of a set of positions, solved
+once by the Engine, so tests can check a strategy's choice against it
+instead of solving the position again. Fixture files are JSON:
+
+    {"game": "s", "setting": null, "scores": {"31": {"1": -1, ...}, ...}}
+
+For SubtractSquare ("s") a position is a starting total. For StoneHenge
+("h") it is the moves made from the start of a board of side-length setting,
+joined by commas. Player 1 moves first in every position. A move scores WIN
+if the player making it wins under perfect play, and LOSE otherwise.
+
+A position is decisive when some of its moves win and others lose, so a
+strategy choosing a wrong move fails its test; in a position where every
+move scores the same, any move passes. With --decisive only decisive
+positions are written.
+
+load_fixtures reads a file once per test session and returns it decoded.
+Run
+
+    python fixtures.py s FIRST LAST PATH [--decisive]
+    python fixtures.py h SIZE PLIES PATH [--count N] [--seed S] [--decisive]
+    python fixtures.py GAME SETTING 0 PATH --positions-from LEGACY_FILE \
+        [--decisive]
+
+to solve the totals FIRST to LAST, every sequence of PLIES moves on a board
+(or N random ones), or the positions of a fixture file in the old format.
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+import argparse
+import ast
+import functools
+import itertools
+import json
+import os
+import random
+from engine import Engine
+from headless import make_game
+
+# Fixture files are found next to this module
+FIXTURE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def position_game(game_key: str, setting: int, position: Any) -> Any:
+    """
+    Return a game at position: a starting total of SubtractSquare, or a
+    sequence of moves from the start of a StoneHenge board of side-length
+    setting.
+    """
+    if game_key == 's':
+        return make_game('s', True, position)
+    game = make_game('h', True, setting)
+    for move in position:
+        game.current_state = game.current_state.make_move(move)
+    return game
+
+
+def solve_position(game: Any, engine: Engine) -> Dict[Any, int]:
+    """
+    Return the score of every possible move of game's current state for the
+    player making it.
+    """
+    state = game.current_state
+    return {move: -engine.value(game, state.make_move(move))
+            for move in state.iter_possible_moves()}
+
+
+def stonehenge_sequences(size: int, plies: int, count: int = None,
+                         seed: int = 0) -> List[Tuple[str, ...]]:
+    """
+    Return every sequence of plies moves from the start of a board of
+    side-length size that does not end the game, or count of them chosen at
+    random with seed.
+    """
+    game = make_game('h', True, size)
+    cells = game.current_state.get_possible_moves()
+    sequences = [moves for moves in itertools.permutations(cells, plies)
+                 if not game.is_over(position_game('h', size, moves)
+                                     .current_state)]
+    if count is not None:
+        sequences = random.Random(seed).sample(sequences, count)
+    return sequences
+
+
+def legacy_positions(path: str) -> List[Any]:
+    """
+    Return the positions of a fixture file in the old format: a Python dict
+    literal keyed by total, move or tuple of moves. The file is parsed with
+    ast.literal_eval, which evaluates no code.
+    """
+    with open(path) as file:
+        positions = list(ast.literal_eval(file.read()))
+    return [(position,) if isinstance(position, str) else position
+            for position in positions]
+
+
+def is_decisive(scores: Dict[Any, int]) -> bool:
+    """
+    Return whether some moves of scores win and others lose.
+    """
+    return len(set(scores.values())) > 1
+
+
+def generate_fixtures(game_key: str, setting: Any, positions: Iterable,
+                      path: str, engine: Engine = None,
+                      decisive: bool = False, count: int = None) -> int:
+    """
+    Solve every position of a game with engine (a new Engine if None), all
+    sharing its table, write them to the fixture file path, and return the
+    number of positions written.
+
+    If decisive, only decisive positions are written, and if count is given,
+    at most count of them (the first found).
+    """
+    engine = Engine() if engine is None else engine
+    scores = {}
+    for position in positions:
+        if count is not None and len(scores) >= count:
+            break
+        game = position_game(game_key, setting, position)
+        solved = solve_position(game, engine)
+        if decisive and not is_decisive(solved):
+            continue
+        key = str(position) if game_key == 's' else ','.join(position)
+        scores[key] = {str(move): score for move, score in solved.items()}
+    with open(path, 'w') as file:
+        json.dump({'game': game_key, 'setting': setting, 'scores': scores},
+                  file, separators=(',', ':'))
+        file.write('\n')
+    return len(scores)
+
+
+@functools.lru_cache(maxsize=None)
+def load_fixtures(name: str) -> Dict[Any, Dict[Any, int]]:
+    """
+    Return the scores of the fixture file name, found in FIXTURE_DIRECTORY
+    unless it is an absolute path. Positions and moves are decoded: totals
+    and moves of SubtractSquare are ints, and StoneHenge positions are
+    tuples of moves.
+
+    Each file is read once per session; treat the result as read-only.
+    """
+    with open(os.path.join(FIXTURE_DIRECTORY, name)) as file:
+        fixture = json.load(file)
+    if fixture['game'] == 's':
+        return {int(total): {int(move): score for move, score
+                             in scores.items()}
+                for total, scores in fixture['scores'].items()}
+    return {tuple(moves.split(',')) if moves else (): scores
+            for moves, scores in fixture['scores'].items()}
+
+
+def best_moves(scores: Dict[Any, int]) -> List[Any]:
+    """
+    Return the moves with the best score in scores.
+    """
+    best = max(scores.values())
+    return [move for move, score in scores.items() if score == best]
+
+
+def main() -> None:
+    """
+    Generate a fixture file as given on the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('game', choices=['s', 'h'])
+    parser.add_argument('first', type=int,
+                        help='the first total, or the side-length')
+    parser.add_argument('last', type=int,
+                        help='the last total, or the number of moves')
+    parser.add_argument('path')
+    parser.add_argument('--count', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--positions-from', dest='legacy')
+    parser.add_argument('--decisive', action='store_true',
+                        help='write only positions where some moves win '
+                             'and others lose')
+    args = parser.parse_args()
+    count = None
+    if args.legacy is not None:
+        positions = legacy_positions(args.legacy)
+    elif args.game == 's':
+        positions = range(args.first, args.last + 1)
+    elif args.decisive and args.count is not None:
+        # Every sequence in random order, until count decisive ones are found
+        positions = stonehenge_sequences(args.first, args.last)
+        random.Random(args.seed).shuffle(positions)
+        count = args.count
+    else:
+        positions = stonehenge_sequences(args.first, args.last, args.count,
+                                         args.seed)
+    setting = None if args.game == 's' else args.first
+    print(generate_fixtures(args.game, setting, positions, args.path,
+                            decisive=args.decisive, count=count),
+          'positions written to', args.path)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        main()
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,64 @@
+"""
+A subset of unittests used for testing the golden-result fixtures.
+"""
+import os
+import tempfile
+import unittest
+
+from engine import Engine
+from fixtures import best_moves, generate_fixtures, is_decisive, \
+    legacy_positions, load_fixtures, position_game, solve_position
+
+
+class FixturesUnitTests(unittest.TestCase):
+    def test_checked_in_fixtures(self):
+        """
+        Test that the checked-in fixtures are decisive and match a fresh
+        solve by the engine, and are only read once.
+        """
+        engine = Engine()
+        for name, game_key, setting in [('my_results.json', 's', None),
+                                        ('new_results.json', 'h', 2),
+                                        ('newer_results.json', 'h', 3)]:
+            fixtures = load_fixtures(name)
+            self.assertIs(load_fixtures(name), fixtures,
+                          "{} should be read once.".format(name))
+            for position, scores in fixtures.items():
+                self.assertTrue(is_decisive(scores),
+                                "{} {} is not decisive, so any move passes."
+                                .format(name, position))
+                game = position_game(game_key, setting, position)
+                self.assertEqual(solve_position(game, engine), scores,
+                                 "{} {} was not solved the same."
+                                 .format(name, position))
+
+    def test_generate_round_trip(self):
+        """
+        Test that generated fixtures load back with decoded positions and
+        moves, and that old-format files are parsed without running them.
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'square.json')
+        self.assertEqual(generate_fixtures('s', None, [4, 5], path), 2)
+        self.assertEqual(load_fixtures(path),
+                         {4: {1: -1, 4: 1}, 5: {1: -1, 4: -1}})
+        self.assertEqual(best_moves(load_fixtures(path)[4]), [4])
+        decisive = os.path.join(directory, 'decisive.json')
+        self.assertEqual(generate_fixtures('s', None, range(1, 10), decisive,
+                                           decisive=True, count=2), 2)
+        self.assertEqual(list(load_fixtures(decisive)), [4, 8])
+
+        legacy = os.path.join(directory, 'legacy')
+        with open(legacy, 'w') as file:
+            file.write("{'A': {}, ('B', 'C'): {}}")
+        self.assertEqual(legacy_positions(legacy), [('A',), ('B', 'C')])
+        with open(legacy, 'w') as file:
+            file.write("{__import__('os').getcwd(): {}}")
+        self.assertRaises(ValueError, legacy_positions, legacy)
+        for name in [path, legacy, decisive]:
+            os.remove(name)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,296 @@
+"""
+Differential fuzzing of game state implementations and strategies.
+
+fuzz plays random legal games of every StoneHenge side-length and of
+SubtractSquare from a range of totals, and replays each one through two
+implementations of the game states in lockstep. At every position it
+compares:
+
+    the state's repr, which shows the cells and ley-lines
+    the possible moves, in order
+    whether the game is over
+    the minimax value, once few enough plies are left to solve it
+
+An implementation maps each game key of playable_games to a state class
+built from (p1_starts, setting), like headless.game_states. The default
+reference is reference_states: the original, unoptimised rules, which
+recompute every ley-line after each move. Strategies can be fuzzed too: at
+every solved position where the game is not over, each must choose a move
+with the best value, so only exact strategies should be given. Strategies
+without a table, like recursive_minimax, need a low solve_limit.
+
+A failing game is shrunk, by dropping moves and lowering the starting total,
+to a short sequence that still fails. Run
+
+    python fuzz.py [GAMES [SEED]]
+
+to fuzz the current implementation against the reference.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from math import ceil
+import random
+import time
+from engine import Engine
+from game_interface import playable_games
+from headless import game_states
+from stonehenge import StoneHengeState
+from subtract_square_state import SubtractSquareState
+
+# A game to replay: (game key, setting, p1_starts, moves)
+Case = Tuple[str, int, bool, tuple]
+
+
+class ReferenceStoneHengeState(StoneHengeState):
+    """
+    StoneHenge states with the original rules: every ley-line is recomputed
+    from the whole grid after each move.
+    """
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state.
+        """
+        owners = self.left_diagonal + self.right_diagonal + self.horizontal
+        if owners.count(1) >= int(ceil(len(owners) / 2)) or \
+                owners.count(2) >= int(ceil(len(owners))):
+            return []
+        return [x for x in sum(self.grid, ())
+                if x in self.constant_letters]
+
+    def iter_possible_moves(self) -> Any:
+        """
+        Return an iterator over the possible moves of this state.
+        """
+        return iter(self.get_possible_moves())
+
+    def make_move(self, move: str) -> 'ReferenceStoneHengeState':
+        """
+        Return the GameState that results from applying move to this
+        GameState.
+        """
+        player = 1 if self.p1_turn else 2
+        grid = [[player if x == move else x for x in row]
+                for row in self.grid]
+        lines = [list(self.left_diagonal), list(self.right_diagonal),
+                 list(self.horizontal)]
+        groups = [self.transform_to_left(grid),
+                  self.transform_to_right(grid), grid]
+        for owners, group in zip(lines, groups):
+            for x in range(len(group)):
+                half = int(ceil(len(group[x]) / 2))
+                for p in [1, 2]:
+                    if group[x].count(p) >= half and owners[x] not in [1, 2]:
+                        owners[x] = p
+        return ReferenceStoneHengeState.from_parts(
+            not self.p1_turn, self.size, tuple(tuple(row) for row in grid),
+            *[tuple(owners) for owners in lines])
+
+
+class ReferenceSubtractSquareState(SubtractSquareState):
+    """
+    SubtractSquare states with the original rules.
+    """
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state.
+        """
+        return [i ** 2 for i in range(1, self.current_total + 1)
+                if i ** 2 <= self.current_total]
+
+    def iter_possible_moves(self) -> Any:
+        """
+        Return an iterator over the possible moves of this state.
+        """
+        return iter(self.get_possible_moves())
+
+    def make_move(self, move: Any) -> 'ReferenceSubtractSquareState':
+        """
+        Return the GameState that results from applying move to this
+        GameState.
+        """
+        return ReferenceSubtractSquareState(not self.p1_turn,
+                                            self.current_total - int(move))
+
+
+reference_states = {'s': ReferenceSubtractSquareState,
+                    'h': ReferenceStoneHengeState}
+
+
+def random_case(rng: random.Random, sizes: List[int],
+                totals: List[int]) -> Case:
+    """
+    Return a random game played to the end with the reference rules, on a
+    side-length in sizes or from a total in totals.
+    """
+    game_key = rng.choice(['s', 'h'])
+    setting = rng.choice(totals if game_key == 's' else sizes)
+    p1_starts = rng.random() < 0.5
+    game = playable_games[game_key].from_state(
+        reference_states[game_key](p1_starts, setting))
+    moves = []
+    state = game.current_state
+    while not game.is_over(state):
+        moves.append(rng.choice(state.get_possible_moves()))
+        state = state.make_move(moves[-1])
+    return game_key, setting, p1_starts, tuple(moves)
+
+
+def plies_left(state: Any) -> int:
+    """
+    Return the most moves that can still be made from state: its unclaimed
+    cells in StoneHenge, or its total in SubtractSquare.
+    """
+    if isinstance(state, SubtractSquareState):
+        return state.current_total
+    return len(state.get_possible_moves())
+
+
+class Differ:
+    """
+    Compares two implementations of the game states, and strategies, along
+    replayed games.
+
+    candidate, reference - maps from game key to state class
+    strategies - strategies that must choose a move with the best value
+    solve_limit - positions with at most this many plies left are solved
+    positions - the number of positions compared
+    """
+    candidate: Dict[str, Any]
+    reference: Dict[str, Any]
+    strategies: List[Callable[[Any], Any]]
+    solve_limit: int
+    positions: int
+
+    def __init__(self, candidate: Dict[str, Any], reference: Dict[str, Any],
+                 strategies: List[Callable[[Any], Any]] = (),
+                 solve_limit: int = 8) -> None:
+        """
+        Initialize a Differ of candidate against reference.
+        """
+        self.candidate = candidate
+        self.reference = reference
+        self.strategies = list(strategies)
+        self.solve_limit = solve_limit
+        self.positions = 0
+        self._engines = (Engine(), Engine())
+
+    def check(self, case: Case) -> Optional[str]:
+        """
+        Replay case through both implementations and return a description
+        of the first difference, or None if there is none. A case whose
+        moves are not all legal for the reference has no difference.
+        """
+        game_key, setting, p1_starts, moves = case
+        games = [playable_games[game_key].from_state(
+            states[game_key](p1_starts, setting))
+                 for states in [self.reference, self.candidate]]
+        for ply in range(len(moves) + 1):
+            problem = self.compare(games)
+            if problem is not None:
+                return 'after {}: {}'.format(list(moves[:ply]), problem)
+            if ply < len(moves):
+                if moves[ply] not in games[0].current_state \
+                        .get_possible_moves():
+                    return None
+                for game in games:
+                    game.current_state = game.current_state.make_move(
+                        moves[ply])
+        return None
+
+    def compare(self, games: List[Any]) -> Optional[str]:
+        """
+        Return a description of how the current states of the reference and
+        candidate games differ, or None.
+        """
+        self.positions += 1
+        states = [game.current_state for game in games]
+        for name, get in [('repr', lambda g: repr(g.current_state)),
+                          ('moves', lambda g: list(
+                              g.current_state.get_possible_moves())),
+                          ('over', lambda g: g.is_over(g.current_state))]:
+            expected, found = get(games[0]), get(games[1])
+            if expected != found:
+                return '{} is {!r}, expected {!r}'.format(name, found,
+                                                          expected)
+        if plies_left(states[0]) > self.solve_limit:
+            return None
+        values = [engine.value(game, game.current_state)
+                  for engine, game in zip(self._engines, games)]
+        if values[0] != values[1]:
+            return 'value is {}, expected {}'.format(values[1], values[0])
+        over = games[0].is_over(states[0])
+        for strategy in [] if over else self.strategies:
+            move = strategy(games[1])
+            score = -self._engines[0].value(games[0],
+                                            states[0].make_move(move))
+            if score != values[0]:
+                return '{} chose {!r}, which scores {}, not {}'.format(
+                    strategy.__name__, move, score, values[0])
+        return None
+
+    def shrink(self, case: Case) -> Case:
+        """
+        Return a shorter case that still fails, found by lowering the
+        starting total and dropping moves while the case keeps failing.
+        """
+        improved = True
+        while improved:
+            improved = False
+            game_key, setting, p1_starts, moves = case
+            smaller = [(game_key, setting, p1_starts, moves[:i] + moves[i + 1:])
+                       for i in reversed(range(len(moves)))]
+            if game_key == 's':
+                smaller += [(game_key, total, p1_starts, moves)
+                            for total in range(1, setting)]
+            for candidate in smaller:
+                if self.check(candidate) is not None:
+                    case = candidate
+                    improved = True
+                    break
+        return case
+
+
+def fuzz(games: int = 200, seed: int = 0,
+         candidate: Dict[str, Any] = None,
+         reference: Dict[str, Any] = None,
+         strategies: List[Callable[[Any], Any]] = (),
+         sizes: List[int] = (1, 2, 3, 4, 5), totals: List[int] = None,
+         solve_limit: int = 8, max_failures: int = 5) -> dict:
+    """
+    Fuzz candidate (headless.game_states if None) against reference
+    (reference_states if None) with games random games, and return the
+    number of positions compared, the positions per second and up to
+    max_failures shrunk failing cases with their differences.
+    """
+    differ = Differ(game_states if candidate is None else candidate,
+                    reference_states if reference is None else reference,
+                    strategies, solve_limit)
+    rng = random.Random(seed)
+    totals = list(range(1, 200)) if totals is None else list(totals)
+    failures = []
+    start = time.perf_counter()
+    for _ in range(games):
+        case = random_case(rng, list(sizes), totals)
+        if differ.check(case) is not None:
+            case = differ.shrink(case)
+            failures.append({'case': case, 'problem': differ.check(case)})
+            if len(failures) >= max_failures:
+                break
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'positions': differ.positions,
+            'seconds': elapsed,
+            'positions_per_second': differ.positions / elapsed,
+            'failures': failures}
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        from proof_number import proof_number_strategy
+        print(fuzz(int(sys.argv[1]),
+                   int(sys.argv[2]) if len(sys.argv) > 2 else 0,
+                   strategies=[proof_number_strategy]))
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,55 @@
+"""
+A subset of unittests used for testing the differential fuzzing harness.
+"""
+import unittest
+
+from fuzz import Differ, fuzz, reference_states
+from headless import game_states
+from proof_number import proof_number_strategy
+from subtract_square_state import SubtractSquareState
+
+
+class MisCountingState(SubtractSquareState):
+    """
+    A SubtractSquare state that takes one too many whenever it reaches 7.
+    """
+
+    def make_move(self, move):
+        total = self.current_total - move
+        return MisCountingState(not self.p1_turn,
+                                total - 1 if total == 7 else total)
+
+
+class FuzzUnitTests(unittest.TestCase):
+    def test_current_rules_match_reference(self):
+        """
+        Test that the current states and the proof-number strategy agree with
+        the reference rules on random games.
+        """
+        report = fuzz(60, 3, strategies=[proof_number_strategy],
+                      sizes=[1, 2, 3], totals=range(1, 50))
+        self.assertEqual(report['failures'], [])
+        self.assertGreater(report['positions'], 60)
+        self.assertGreater(report['positions_per_second'], 0)
+
+    def test_finds_and_shrinks_difference(self):
+        """
+        Test that a difference deep in a game is found and shrunk to a
+        single move, with solving turned off so that only the states are
+        compared.
+        """
+        broken = dict(game_states, s=MisCountingState)
+        differ = Differ(broken, reference_states, solve_limit=0)
+        case = ('s', 30, True, (1, 4, 9, 9))
+        self.assertIsNotNone(differ.check(case))
+
+        game_key, total, _, moves = differ.shrink(case)
+        self.assertEqual(len(moves), 1,
+                         "The shrunk case should need one move, not {}."
+                         .format(moves))
+        self.assertEqual(total - moves[0], 7)
+        self.assertIn('repr', differ.check((game_key, total, True, moves)))
+
+
+if __name__ == "__main__":
+    unittest.main()
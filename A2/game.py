@@ -16,6 +16,16 @@ class Game:
         """
         raise NotImplementedError
 
+    @classmethod
+    def from_state(cls, state: GameState) -> 'Game':
+        """
+        Return a game of this class whose current state is state, without
+        asking for any input.
+        """
+        game = cls.__new__(cls)
+        game.current_state = state
+        return game
+
     def get_instructions(self) -> str:
         """
         Return the instructions for this Game.
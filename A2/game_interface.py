@@ -10,15 +10,23 @@ your own curiousity!)
 """
 # TODO: import the modules needed to make game_interface run.
 from strategy import interactive_strategy, rough_outcome_strategy, \
-    recursive_minimax, iterative_minimax
+    recursive_minimax, iterative_minimax, depth_limited_minimax, \
+    iterative_deepening_minimax
+from async_strategy import choose_move
+from proof_number import proof_number_strategy
+from engine import make_engine_strategy, reroot_strategies
+from pondering import Ponderer
+from memory_profile import MemoryProfiler
 from typing import Any, Callable
 from subtract_square_game import SubtractSquareGame
+from multi_subtract_square import MultiSubtractSquareGame, grundy_strategy
 from stonehenge import StoneHenge
 
 # TODO: Replace None with the corresponding class name for your games.
 # 'h' should map to Stonehenge.
 playable_games = {'s': SubtractSquareGame,
-                  'h': StoneHenge}
+                  'h': StoneHenge,
+                  'm': MultiSubtractSquareGame}
 
 # TODO: Replace None with the corresponding function names for your strategies.
 # 'mr' should map to your recursive implementation of minimax while
@@ -26,7 +34,26 @@ playable_games = {'s': SubtractSquareGame,
 usable_strategies = {'i': interactive_strategy,
                      'ro': rough_outcome_strategy,
                      'mr': recursive_minimax,
-                     'mi': iterative_minimax}
+                     'mi': iterative_minimax,
+                     'md': depth_limited_minimax,
+                     'mid': iterative_deepening_minimax,
+                     'pn': proof_number_strategy,
+                     'g': grundy_strategy}
+
+# Strategies that keep what they learn between moves, such as an engine's
+# table, are built for each game by these factories instead of being shared
+# by every game in the process
+strategy_factories = {'me': make_engine_strategy}
+
+
+def new_strategy(key: str) -> Callable[[Any], Any]:
+    """
+    Return the strategy usable_strategies[key], or a new strategy from
+    strategy_factories[key].
+    """
+    if key in strategy_factories:
+        return strategy_factories[key]()
+    return usable_strategies[key]
 
 
 class GameInterface:
@@ -36,12 +63,22 @@ class GameInterface:
     """
 
     def __init__(self, game: Any, p1_strategy: Callable,
-                 p2_strategy: Callable[[Any], Any]) -> None:
+                 p2_strategy: Callable[[Any], Any],
+                 ponder: bool = False,
+                 profiler: MemoryProfiler = None) -> None:
         """
         Initialize this GameInterface, setting its active game to game, and
         using the strategies p1_strategy for Player 1 and p2_strategy for
         Player 2.
 
+        If ponder, a strategy of make_engine_strategy keeps searching in the
+        background while its opponent decides on a move (see pondering.py).
+        With a profiler, every strategy call is profiled by it (see
+        memory_profile.py).
+
+        Raise ValueError if both ponder and a profiler are given, since the
+        pondering thread's memory would be counted in the profiled calls.
+
         :param game: The game to be played.
         :type game:
         :param p1_strategy: The strategy for Player 1.
@@ -49,6 +86,8 @@ class GameInterface:
         :param p2_strategy: The strategy for Play 2.
         :type p2_strategy:
         """
+        if ponder and profiler is not None:
+            raise ValueError('cannot profile strategies while pondering')
         first_player = input("Type y if player 1 is to make the first move: ")
         is_p1_turn = False
         if first_player.lower() == 'y':
@@ -57,51 +96,126 @@ class GameInterface:
         self.game = game(is_p1_turn)
         self.p1_strategy = p1_strategy
         self.p2_strategy = p2_strategy
+        # A Ponderer for each player whose strategy has an engine, if
+        # pondering. A strategy playing both sides never waits to ponder.
+        self.ponderers = {}
+        if ponder and p1_strategy is not p2_strategy:
+            for name, strategy in [('p1', p1_strategy), ('p2', p2_strategy)]:
+                if hasattr(strategy, 'engine'):
+                    self.ponderers[name] = Ponderer(strategy.engine)
+        if profiler is not None:
+            self.p1_strategy = profiler.wrap(p1_strategy)
+            self.p2_strategy = self.p1_strategy if p1_strategy is \
+                p2_strategy else profiler.wrap(p2_strategy)
 
-    def play(self) -> None:
+    def _track_state(self) -> None:
         """
-        Play the game.
+        Tell the ponderers and the strategies with a reroot attribute that
+        the game has reached its current state, and start the ponderers of
+        the players waiting for their opponent.
         """
-        current_state = self.game.current_state
-
-        print(self.game.get_instructions())
-        print(current_state)
+        state = self.game.current_state
+        for ponderer in self.ponderers.values():
+            ponderer.stop(state)
+        reroot_strategies(state, [self.p1_strategy, self.p2_strategy])
+        if not self.game.is_over(state):
+            for name, ponderer in self.ponderers.items():
+                if name != state.get_current_player_name():
+                    ponderer.start(self.game)
 
-        # Pick moves until the game is over
-        while not self.game.is_over(current_state):
-            move_to_make = None
-
-            # Print out all of the valid moves
-            possible_moves = current_state.get_possible_moves()
-            print("The current available moves are:")
-            for move in possible_moves:
-                print(move)
+    def _report_pondering(self) -> None:
+        """
+        Print how often each ponderer's search matched the move played.
+        """
+        for name, ponderer in sorted(self.ponderers.items()):
+            stats = ponderer.stats()
+            print("{} pondered {} turns: {} hits ({:.0%}), {:.3f}s "
+                  "saved.".format(name, stats['ponders'], stats['hits'],
+                                  stats['hit_rate'], stats['saved']))
 
-            # Pick a (legal) move.
-            while not current_state.is_valid_move(move_to_make):
-                current_strategy = self.p2_strategy
-                if current_state.get_current_player_name() == 'p1':
-                    current_strategy = self.p1_strategy
-                move_to_make = current_strategy(self.game)
+    def _start(self) -> None:
+        """
+        Show the game's instructions and starting state.
+        """
+        self._track_state()
+        print(self.game.get_instructions())
+        print(self.game.current_state)
 
-            # Apply the move
-            current_player_name = current_state.get_current_player_name()
-            new_game_state = current_state.make_move(move_to_make)
-            self.game.current_state = new_game_state
-            current_state = self.game.current_state
+    def _current_strategy(self) -> Callable:
+        """
+        Print out all of the valid moves, and return the strategy of the
+        player to move.
+        """
+        current_state = self.game.current_state
+        print("The current available moves are:")
+        for move in current_state.iter_possible_moves():
+            print(move)
+        if current_state.get_current_player_name() == 'p1':
+            return self.p1_strategy
+        return self.p2_strategy
 
-            print("{} made the move {}. The game's state is now:".format(
-                current_player_name, move_to_make))
-            print(current_state)
+    def _apply(self, move_to_make: Any) -> None:
+        """
+        Make the (legal) move move_to_make and show the new state.
+        """
+        current_state = self.game.current_state
+        current_player_name = current_state.get_current_player_name()
+        self.game.current_state = current_state.make_move(move_to_make)
+        self._track_state()
+        print("{} made the move {}. The game's state is now:".format(
+            current_player_name, move_to_make))
+        print(self.game.current_state)
 
-        # Print out the winner of the game
+    def _finish(self) -> None:
+        """
+        Print out the winner of the game and the pondering report.
+        """
         if self.game.is_winner("p1"):
             print("Player 1 is the winner!")
         elif self.game.is_winner("p2"):
             print("Player 2 is the winner!")
         else:
             print("It's a tie!")
+        self._report_pondering()
 
+    def play(self) -> None:
+        """
+        Play the game.
+
+        Strategies with a reroot attribute, like those of
+        make_engine_strategy, are given the game's state at the start and
+        after every move, so they can keep their search between moves, and
+        ponder during their opponent's turns if pondering.
+        """
+        self._start()
+        # Pick moves until the game is over
+        while not self.game.is_over(self.game.current_state):
+            current_strategy = self._current_strategy()
+            move_to_make = None
+            # Pick a (legal) move.
+            while not self.game.current_state.is_valid_move(move_to_make):
+                move_to_make = current_strategy(self.game)
+            self._apply(move_to_make)
+        self._finish()
+
+    async def play_async(self, move_timeout: float = None) -> None:
+        """
+        Play the game like play, asking the strategies for moves with
+        choose_move so that each move takes at most move_timeout seconds.
+
+        The strategies may be async strategies or blocking ones; blocking
+        strategies run in background threads, so the event loop stays
+        responsive while they think.
+        """
+        self._start()
+        while not self.game.is_over(self.game.current_state):
+            current_strategy = self._current_strategy()
+            move_to_make = None
+            while not self.game.current_state.is_valid_move(move_to_make):
+                move_to_make = await choose_move(current_strategy, self.game,
+                                                 move_timeout)
+            self._apply(move_to_make)
+        self._finish()
 
 if __name__ == '__main__':
     games = ", ".join(["'{}': {}".format(key, playable_games[key].__name__) if
@@ -112,7 +226,9 @@ if __name__ == '__main__':
                                               usable_strategies[key].__name__)
                             if usable_strategies[key] is not None else
                             "'{}': None".format(key)
-                            for key in usable_strategies])
+                            for key in usable_strategies] +
+                           ["'{}': new {}".format(key, factory.__name__)
+                            for key, factory in strategy_factories.items()])
 
     chosen_game = ''
     while chosen_game not in playable_games.keys():
@@ -122,11 +238,23 @@ if __name__ == '__main__':
     p1 = ''
     p2 = ''
 
-    while p1 not in usable_strategies.keys():
+    while p1 not in usable_strategies.keys() | strategy_factories.keys():
         p1 = input("Select the strategy for Player 1 ({}): ".format(strategies))
 
-    while p2 not in usable_strategies.keys():
+    while p2 not in usable_strategies.keys() | strategy_factories.keys():
         p2 = input("Select the strategy for Player 2 ({}): ".format(strategies))
 
-    GameInterface(playable_games[chosen_game], usable_strategies[p1],
-                  usable_strategies[p2]).play()
\ No newline at end of file
+    ponder = input("Type y to let engines ponder during their opponent's "
+                   "turns: ").lower() == 'y'
+
+    # Profiling counts a pondering thread's memory, so it is offered only
+    # without pondering
+    report_path = '' if ponder else input(
+        "Type a file name to write a memory profile of the strategies to "
+        "(blank for none): ").strip()
+    profiler = MemoryProfiler() if report_path else None
+
+    GameInterface(playable_games[chosen_game], new_strategy(p1),
+                  new_strategy(p2), ponder=ponder, profiler=profiler).play()
+    if profiler is not None:
+        profiler.report(report_path)
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Game records and a bulk replayer.
+
+A game record is (game key, setting, p1_starts, moves): the game of
+playable_games[game key] with its side-length or starting total, whether p1
+moved first, and the moves made. In a record file each record is one line:
+
+    h3 1 AGCK
+    s31 2 1,4,9
+
+the game key and setting, 1 or 2 for the player who moved first, and the
+moves: StoneHenge cells written together, SubtractSquare squares separated
+by commas.
+
+replay rebuilds the states of a record, checking that every move is valid,
+and replay_all does so for a stream of records, without input() or
+printing. Run
+
+    python game_records.py FILE
+
+to check every record of a file and report games per second.
+"""
+from typing import Any, Iterable, Iterator, TextIO, Tuple
+import functools
+import time
+from game_interface import playable_games
+from headless import check_setting, game_states
+
+# (game key, setting, p1_starts, moves)
+Record = Tuple[str, int, bool, tuple]
+
+# The games that records can be written for: those whose setting is a
+# number and whose moves are a cell or a number
+RECORD_GAMES = ('h', 's')
+# A game of each key, used only for its is_over
+_GAMES = {}
+# The most start states kept for replay
+START_CACHE_SIZE = 256
+
+
+def format_record(record: Record) -> str:
+    """
+    Return record as a line of a record file, without the newline.
+    """
+    game_key, setting, p1_starts, moves = record
+    joiner = '' if game_key == 'h' else ','
+    return '{}{} {} {}'.format(game_key, setting, 1 if p1_starts else 2,
+                               joiner.join(str(move) for move in moves))
+
+
+def parse_record(line: str) -> Record:
+    """
+    Return the record written on line.
+
+    Raise ValueError if line is not a record, or its setting is not one
+    its game can be played with.
+    """
+    fields = line.split()
+    if len(fields) not in [2, 3] or fields[0][:1] not in RECORD_GAMES or \
+            fields[1] not in ['1', '2']:
+        raise ValueError('not a game record: {!r}'.format(line))
+    game_key = fields[0][0]
+    try:
+        setting = int(fields[0][1:])
+        check_setting(game_key, setting)
+    except ValueError as error:
+        raise ValueError('not a game record: {!r} ({})'.format(
+            line, error)) from None
+    moves = fields[2] if len(fields) == 3 else ''
+    if game_key == 'h':
+        moves = tuple(moves)
+    else:
+        moves = tuple(int(move) for move in moves.split(',') if move)
+    return game_key, setting, fields[1] == '1', moves
+
+
+def write_records(records: Iterable[Record], file: TextIO) -> int:
+    """
+    Write records to file, one per line, and return how many were written.
+    """
+    count = 0
+    for record in records:
+        file.write(format_record(record) + '\n')
+        count += 1
+    return count
+
+
+def read_records(file: TextIO) -> Iterator[Record]:
+    """
+    Return an iterator over the records of file, skipping blank lines.
+    """
+    for line in file:
+        if line.strip():
+            yield parse_record(line)
+
+
+@functools.lru_cache(maxsize=START_CACHE_SIZE)
+def _start_state(game_key: str, setting: int, p1_starts: bool) -> Any:
+    """
+    Return the start state of a game of game_key with setting, which is
+    immutable and so shared by every replay of it.
+
+    Raise ValueError if the game cannot be played with setting.
+    """
+    check_setting(game_key, setting)
+    return game_states[game_key](p1_starts, setting)
+
+
+def replay(record: Record, intermediate: bool = False) -> Iterator[Any]:
+    """
+    Return an iterator over the states of record: every state from the
+    start if intermediate, and otherwise only the final state.
+
+    Raise ValueError when the setting or a move is invalid, or a move is
+    made after the game is over.
+    """
+    game_key, setting, p1_starts, moves = record
+    if game_key not in _GAMES:
+        _GAMES[game_key] = playable_games[game_key].from_state(None)
+    is_over = _GAMES[game_key].is_over
+    state = _start_state(game_key, setting, p1_starts)
+    if intermediate:
+        yield state
+    for ply, move in enumerate(moves):
+        if is_over(state) or not state.is_valid_move(move):
+            raise ValueError('move {} of {!r} is invalid: {!r}'.format(
+                ply + 1, format_record(record), move))
+        state = state.make_move(move)
+        if intermediate:
+            yield state
+    if not intermediate:
+        yield state
+
+
+def replay_all(records: Iterable[Record], intermediate: bool = False,
+               skip_invalid: bool = False) -> Iterator[Tuple[Record, Any]]:
+    """
+    Return an iterator over (record, state) for the states of every record,
+    as replay gives them.
+
+    An invalid record raises ValueError, or is left out if skip_invalid
+    (along with any of its states not yet given, if intermediate).
+    """
+    for record in records:
+        try:
+            for state in replay(record, intermediate):
+                yield record, state
+        except ValueError:
+            if not skip_invalid:
+                raise
+
+
+def check_file(path: str) -> dict:
+    """
+    Replay every record of the record file path, and return the number of
+    games and moves, the invalid games and the games per second.
+    """
+    games = moves = invalid = 0
+    start = time.perf_counter()
+    with open(path) as file:
+        for record in read_records(file):
+            games += 1
+            moves += len(record[3])
+            try:
+                for _ in replay(record):
+                    pass
+            except ValueError:
+                invalid += 1
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'moves': moves, 'invalid': invalid,
+            'seconds': elapsed, 'games_per_second': games / elapsed}
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        print(check_file(sys.argv[1]))
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,62 @@
+"""
+A subset of unittests used for testing game records.
+"""
+import io
+import unittest
+
+from game_records import (START_CACHE_SIZE, _start_state, format_record,
+                          parse_record, read_records, replay, replay_all,
+                          write_records)
+from headless import make_game
+
+
+class GameRecordsUnitTests(unittest.TestCase):
+    def test_round_trip(self):
+        """
+        Test that records written to a file are read back unchanged.
+        """
+        records = [('h', 2, True, ('A', 'E', 'B')), ('s', 31, False, (1, 9)),
+                   ('s', 5, True, ())]
+        file = io.StringIO()
+        self.assertEqual(write_records(records, file), 3)
+        self.assertEqual(file.getvalue().split('\n')[0], 'h2 1 AEB')
+        file.seek(0)
+        self.assertEqual(list(read_records(file)), records)
+        self.assertRaises(ValueError, parse_record, 'x2 1 AB')
+
+    def test_replay_states(self):
+        """
+        Test that replay gives the states of playing the moves.
+        """
+        game = make_game('h', False, 2)
+        moves = ('A', 'E', 'B', 'C')
+        states = [game.current_state]
+        for move in moves:
+            states.append(states[-1].make_move(move))
+        self.assertEqual(list(replay(('h', 2, False, moves), True)), states)
+        self.assertEqual(list(replay(('h', 2, False, moves))), states[-1:])
+        for total in range(2 * START_CACHE_SIZE):
+            list(replay(('s', total, True, ())))
+        self.assertLessEqual(_start_state.cache_info().currsize,
+                             START_CACHE_SIZE)
+
+    def test_invalid_records(self):
+        """
+        Test that invalid settings and moves, and moves after the game is
+        over, are rejected or skipped.
+        """
+        valid = format_record(('s', 5, True, (4, 1)))
+        self.assertRaises(ValueError, list, replay(('h', 2, True, ('A', 'A'))))
+        self.assertRaises(ValueError, list,
+                          replay(('s', 5, True, (4, 1, 1))))
+        for line in ['h0 1 A', 'h9 1 AB', 's-5 2']:
+            self.assertRaises(ValueError, parse_record, line)
+        records = [('h', 2, True, ('A', 'Z')), ('h', 9, True, ('A', 'B')),
+                   parse_record(valid)]
+        self.assertEqual([record for record, _ in
+                          replay_all(records, skip_invalid=True)],
+                         records[2:])
+
+
+if __name__ == "__main__":
+    unittest.main()
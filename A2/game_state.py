@@ -3,7 +3,7 @@ The GameState superclass.
 
 NOTE: You do not have to run python-ta on this file.
 """
-from typing import Any
+from typing import Any, Iterator
 
 
 class GameState:
@@ -19,6 +19,7 @@ class GameState:
     LOSE: int = -1
     DRAW: int = 0
     p1_turn: bool
+    __slots__ = ('p1_turn', '_move_set', '_hash')
 
     def __init__(self, is_p1_turn: bool) -> None:
         """
@@ -27,6 +28,10 @@ class GameState:
 
         """
         self.p1_turn = is_p1_turn
+        # Moves of this state as returned by get_move_set, once computed
+        self._move_set = None
+        # hash(self), once computed
+        self._hash = None
 
     def __str__(self) -> str:
         """
@@ -40,6 +45,22 @@ class GameState:
         """
         raise NotImplementedError
 
+    def iter_possible_moves(self) -> Iterator:
+        """
+        Return an iterator over the possible moves of this state, generating
+        them lazily where the state supports it.
+        """
+        return iter(self.get_possible_moves())
+
+    def get_move_set(self) -> frozenset:
+        """
+        Return the possible moves of this state as an immutable set. The set
+        is built once per state.
+        """
+        if self._move_set is None:
+            self._move_set = frozenset(self.iter_possible_moves())
+        return self._move_set
+
     def get_current_player_name(self) -> str:
         """
         Return 'p1' if the current player is Player 1, and 'p2' if the current
@@ -59,7 +80,60 @@ class GameState:
         """
         Return whether move is a valid move for this GameState.
         """
-        return move in self.get_possible_moves()
+        try:
+            return move in self.get_move_set()
+        except TypeError:
+            # move is unhashable, so it cannot be one of the moves
+            return False
+
+    def key(self) -> tuple:
+        """
+        Return a tuple of the values that identify this state. Two states
+        are equal when they have the same type and key.
+        """
+        raise NotImplementedError
+
+    def code(self) -> int:
+        """
+        Return a non-negative integer that identifies this state. Unlike
+        hash(self), the code is the same in every process and run.
+        """
+        raise NotImplementedError
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self and other are the same position with the same
+        player to move.
+        """
+        return type(self) is type(other) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of this state consistent with __eq__.
+        """
+        if self._hash is None:
+            self._hash = hash(self.key())
+        return self._hash
+
+    def __getstate__(self) -> dict:
+        """
+        Return the attributes of this state to pickle.
+
+        The cached hash and move set are left out: string hashes differ
+        between processes, so they are recomputed where the state is loaded.
+        """
+        return {name: getattr(self, name) for cls in type(self).__mro__
+                for name in getattr(cls, '__slots__', ())
+                if name not in ['_move_set', '_hash']}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore this state from the attributes returned by __getstate__.
+        """
+        self._move_set = None
+        self._hash = None
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def __repr__(self) -> Any:
         """
@@ -76,6 +150,50 @@ class GameState:
         raise NotImplementedError
 
 
+class InternTable:
+    """
+    A table that keeps one object for every distinct state added to it, so
+    that positions reached through different move orders can share it.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty InternTable.
+        """
+        self._states = {}
+
+    def intern(self, state: GameState) -> GameState:
+        """
+        Return the state in this table equal to state, adding state to the
+        table if there is none.
+        """
+        return self._states.setdefault(state, state)
+
+    def make_move(self, state: GameState, move: Any) -> GameState:
+        """
+        Return the interned state that results from applying move to state.
+        """
+        return self.intern(state.make_move(move))
+
+    def __contains__(self, state: GameState) -> bool:
+        """
+        Return whether a state equal to state is in this table.
+        """
+        return state in self._states
+
+    def __len__(self) -> int:
+        """
+        Return the number of distinct states in this table.
+        """
+        return len(self._states)
+
+    def clear(self) -> None:
+        """
+        Remove every state from this table.
+        """
+        self._states.clear()
+
+
 if __name__ == "__main__":
     from python_ta import check_all
     check_all(config="a2_pyta.txt")
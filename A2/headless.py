@@ -0,0 +1,168 @@
+"""
+Tools for playing games without a terminal.
+
+The Game classes ask for their settings with input(); make_game builds them
+from arguments instead, and play_headless plays a game between two strategies
+without printing, so games can be run in bulk. analyse_position scores
+every move of a position reached by a list of moves.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from engine import reroot_strategies
+from game_interface import playable_games
+from memory_profile import MemoryProfiler
+from strategy import analyse
+from stonehenge import StoneHengeState
+from subtract_square_state import SubtractSquareState
+from multi_subtract_square import MultiSubtractSquareState
+
+def heap_sizes(setting: Any) -> Tuple[int, ...]:
+    """
+    Return the heap sizes of setting for MultiSubtractSquare: a sequence of
+    sizes, or a string of them separated by commas.
+
+    Raise ValueError if setting is not one or more sizes of at least 0.
+    """
+    sizes = setting
+    if isinstance(setting, str):
+        sizes = setting.split(',') if setting.strip() else []
+    try:
+        heaps = tuple(int(heap) for heap in sizes)
+    except (TypeError, ValueError):
+        raise ValueError('heaps must be sizes separated by commas, not '
+                         '{!r}'.format(setting)) from None
+    if not heaps or min(heaps) < 0:
+        raise ValueError('heaps must be one or more sizes of at least 0, '
+                         'not {!r}'.format(setting))
+    return heaps
+
+
+def multi_subtract_square_state(p1_starts: bool,
+                                setting: Any) -> MultiSubtractSquareState:
+    """
+    Return the start of MultiSubtractSquare with the heaps of setting (see
+    heap_sizes), subtracting square numbers.
+    """
+    return MultiSubtractSquareState(p1_starts, heap_sizes(setting))
+
+
+# The state class of each game in playable_games, built from (p1_starts,
+# setting) where setting is the side-length, starting total or heap sizes
+game_states = {'s': SubtractSquareState,
+               'h': StoneHengeState,
+               'm': multi_subtract_square_state}
+
+# The lowest and highest (None for no limit) setting of each game whose
+# setting is a number
+setting_ranges = {'s': (0, None),
+                  'h': (1, 5)}
+
+
+def read_setting(game_key: str, text: str) -> Any:
+    """
+    Return the setting of a game of game_key written as text, as given on
+    a command line.
+
+    Raise ValueError if text is not a setting of a game in game_states.
+    """
+    if game_key not in game_states:
+        raise ValueError('unknown game {}'.format(game_key))
+    setting = heap_sizes(text) if game_key == 'm' else int(text)
+    check_setting(game_key, setting)
+    return setting
+
+
+def check_setting(game_key: str, setting: Any) -> None:
+    """
+    Raise ValueError if game_key is not in game_states, or a game of it
+    cannot be played with setting.
+    """
+    if game_key not in game_states:
+        raise ValueError('unknown game {}'.format(game_key))
+    if game_key == 'm':
+        heap_sizes(setting)
+        return
+    lowest, highest = setting_ranges[game_key]
+    if setting < lowest or (highest is not None and setting > highest):
+        allowed = 'at least {}'.format(lowest) if highest is None else \
+            '{} to {}'.format(lowest, highest)
+        raise ValueError('setting of {} must be {}, not {}'.format(
+            game_key, allowed, setting))
+
+
+def make_game(game_key: str, p1_starts: bool, setting: int) -> Any:
+    """
+    Return a new game of playable_games[game_key] where p1 moves first if
+    p1_starts, with setting as its side-length, starting total or heap
+    sizes.
+
+    Raise ValueError if game_key is not in game_states, or the game cannot
+    be played with setting.
+    """
+    check_setting(game_key, setting)
+    return playable_games[game_key].from_state(
+        game_states[game_key](p1_starts, setting))
+
+
+def winner(game: Any) -> str:
+    """
+    Return 'p1' or 'p2' if that player has won game, and None otherwise.
+    """
+    for player in ['p1', 'p2']:
+        if game.is_winner(player):
+            return player
+    return None
+
+
+def play_headless(game: Any, p1_strategy: Callable[[Any], Any],
+                  p2_strategy: Callable[[Any], Any],
+                  profiler: MemoryProfiler = None) -> Tuple[str, List]:
+    """
+    Play game to the end with p1_strategy and p2_strategy, and return the
+    winner and the list of moves made.
+
+    Strategies with a reroot attribute are given the state at the start and
+    after every move, as in GameInterface.play. With a profiler, every
+    strategy call is profiled by it.
+
+    Raise ValueError if a strategy makes an invalid move.
+    """
+    if profiler is not None:
+        same = p1_strategy is p2_strategy
+        p1_strategy = profiler.wrap(p1_strategy)
+        p2_strategy = p1_strategy if same else profiler.wrap(p2_strategy)
+    moves = []
+    reroot_strategies(game.current_state, [p1_strategy, p2_strategy])
+    while not game.is_over(game.current_state):
+        state = game.current_state
+        strategy = p1_strategy if state.p1_turn else p2_strategy
+        move = strategy(game)
+        if not state.is_valid_move(move):
+            raise ValueError('{} made the invalid move {!r}'.format(
+                state.get_current_player_name(), move))
+        game.current_state = state.make_move(move)
+        moves.append(move)
+        reroot_strategies(game.current_state, [p1_strategy, p2_strategy])
+    return winner(game), moves
+
+
+def analyse_position(game_key: str, setting: int, moves: List[Any] = (),
+                     p1_starts: bool = True, table: Dict[Any, int] = None) \
+        -> List[Tuple[Any, int, List[Any]]]:
+    """
+    Return strategy.analyse of the position reached by making moves from
+    the start of a game of playable_games[game_key], with table as its
+    table of solved positions.
+
+    Raise ValueError if one of moves is invalid.
+    """
+    game = make_game(game_key, p1_starts, setting)
+    for move in moves:
+        if not game.current_state.is_valid_move(move):
+            raise ValueError('invalid move {!r}'.format(move))
+        game.current_state = game.current_state.make_move(move)
+    return analyse(game, table)
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,191 @@
+"""
+Lazy SMP: parallel search of one root by several processes.
+
+Splitting a search between the root moves leaves workers idle once the
+small subtrees are done, and StoneHenge positions often have one root move
+with a much bigger subtree than the rest. In lazy SMP every worker searches
+the whole root instead, each in its own move order, and all of them share
+one SharedTable. The workers solve different parts of the tree first and
+pick up each other's results from the table. The first worker to finish
+supplies the answer and the others are stopped.
+
+Worker 0 searches in the usual move order, so with one worker lazy_smp finds
+the move Engine finds. With more workers the move may be a different winning
+move. Run
+
+    python lazy_smp.py SIZE [PLIES [MAX_WORKERS]]
+
+to report the scaling from 1 to MAX_WORKERS (16 by default) workers on a
+StoneHenge board of side-length SIZE after PLIES random moves.
+"""
+from typing import Any, List, Tuple
+import multiprocessing
+import os
+import queue
+import random
+import time
+from engine import Engine
+from shared_table import SharedTable
+from strategy import SearchControl
+
+# Seconds between checks that some worker is still searching
+POLL_INTERVAL = 0.1
+
+
+class SharedStop(SearchControl):
+    """
+    A SearchControl that also stops when a flag shared between processes is
+    set.
+    """
+
+    def __init__(self, flag: Any, deadline: float = None) -> None:
+        """
+        Initialize a SharedStop that stops searches at deadline, or when
+        flag.value is not 0. flag is a multiprocessing Value.
+        """
+        super().__init__(deadline)
+        self._flag = flag
+
+    def should_stop(self) -> bool:
+        """
+        Return whether the search should stop now.
+        """
+        return self._flag.value != 0 or super().should_stop()
+
+
+def _search_worker(game: Any, table: SharedTable, number: int, flag: Any,
+                   results: Any) -> None:
+    """
+    Search game as worker number, in the move order of that seed (or the
+    usual order for worker 0), and put (number, move, nodes) on results
+    unless the search was stopped.
+    """
+    engine = Engine(table, None if number == 0 else number)
+    control = SharedStop(flag)
+    move = engine.best_move(game, control)
+    if not flag.value:
+        results.put((number, move, engine.nodes))
+
+
+def lazy_smp(game: Any, workers: int = 4, table: SharedTable = None,
+             timeout: float = None) -> Tuple[Any, dict]:
+    """
+    Return the move for game of the first of workers processes to solve it,
+    and details of the search: which worker finished first, its nodes and
+    the seconds taken.
+
+    The workers share table, or a new SharedTable if table is None. If
+    timeout seconds pass first, every worker is stopped and the first
+    possible move is returned.
+
+    Raise RuntimeError if every worker exits without a move, as one does
+    when its search raises.
+    """
+    context = multiprocessing.get_context()
+    own_table = table is None
+    if own_table:
+        table = SharedTable(1 << 22)
+    flag = context.Value('b', 0, lock=False)
+    results = context.Queue()
+    start = time.perf_counter()
+    processes = [context.Process(target=_search_worker,
+                                 args=(game, table, number, flag, results),
+                                 daemon=True) for number in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        number, move, nodes = _first_result(processes, results, timeout)
+        if number is None:
+            move = next(game.current_state.iter_possible_moves(), None)
+        flag.value = 1
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        if own_table:
+            table.close()
+    return move, {'worker': number, 'nodes': nodes,
+                  'seconds': time.perf_counter() - start}
+
+
+def _first_result(processes: List[Any], results: Any,
+                  timeout: float = None) -> Tuple[Any, Any, int]:
+    """
+    Return the first (number, move, nodes) put on results by one of
+    processes, or (None, None, 0) if timeout seconds pass first.
+
+    Raise RuntimeError if every process has exited without a result.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        wait = POLL_INTERVAL if deadline is None else \
+            min(POLL_INTERVAL, max(deadline - time.monotonic(), 0))
+        try:
+            return results.get(timeout=wait)
+        except queue.Empty:
+            pass
+        if deadline is not None and time.monotonic() >= deadline:
+            return None, None, 0
+        if not any(process.is_alive() for process in processes):
+            # A result put just before its worker exited may still be on
+            # its way through the queue
+            try:
+                return results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                raise RuntimeError(
+                    'every lazy SMP worker exited without a move '
+                    '(exit codes {})'.format(
+                        [process.exitcode for process in processes])) \
+                    from None
+
+
+def make_lazy_smp_strategy(workers: int = 4, timeout: float = None) -> Any:
+    """
+    Return a strategy that plays the move of lazy_smp with workers
+    processes.
+    """
+    def lazy_smp_strategy(game: Any) -> Any:
+        """
+        Return the move of lazy_smp for game.
+        """
+        return lazy_smp(game, workers, timeout=timeout)[0]
+    return lazy_smp_strategy
+
+
+def scaling_report(game: Any, max_workers: int = 16) -> List[dict]:
+    """
+    Return the time of lazy_smp on game for 1, 2, 4, ... up to max_workers
+    workers, each with a new table, with the speedup over one worker and
+    the efficiency (speedup per worker).
+    """
+    report = []
+    workers = 1
+    while workers <= max_workers:
+        move, details = lazy_smp(game, workers)
+        details.update({'workers': workers, 'move': move})
+        report.append(details)
+        workers *= 2
+    for details in report:
+        details['speedup'] = report[0]['seconds'] / details['seconds']
+        details['efficiency'] = details['speedup'] / details['workers']
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) >= 2:
+        from headless import make_game
+        board = make_game('h', True, int(sys.argv[1]))
+        rng = random.Random(0)
+        for _ in range(int(sys.argv[2]) if len(sys.argv) > 2 else 0):
+            board.current_state = board.current_state.make_move(
+                rng.choice(board.current_state.get_possible_moves()))
+        print('{} CPUs'.format(os.cpu_count()))
+        for line in scaling_report(board, int(sys.argv[3])
+                                   if len(sys.argv) > 3 else 16):
+            print(line)
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,54 @@
+"""
+A subset of unittests used for testing lazy SMP parallel search.
+"""
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+from engine import Engine
+from lazy_smp import lazy_smp, scaling_report
+StonehengeGame = playable_games['h']
+
+
+class LazySMPUnitTests(unittest.TestCase):
+    def test_one_worker_matches_engine(self):
+        """
+        Test that lazy SMP with one worker plays the engine's move.
+        """
+        with patch('builtins.input', return_value='3'):
+            game = StonehengeGame(True)
+        move, details = lazy_smp(game, 1)
+        self.assertEqual(move, Engine().best_move(game))
+        self.assertEqual(details['worker'], 0)
+
+    def test_many_workers_find_a_winning_move(self):
+        """
+        Test that with several workers the move found still wins, and that
+        the scaling report covers 1, 2 and 4 workers.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(False)
+        state = game.current_state
+        move, _ = lazy_smp(game, 3)
+        self.assertEqual(Engine().value(game, state.make_move(move)),
+                         state.LOSE,
+                         "{} should leave the opponent lost.".format(move))
+
+        report = scaling_report(game, 4)
+        self.assertEqual([line['workers'] for line in report], [1, 2, 4])
+        self.assertEqual(report[0]['speedup'], 1.0)
+
+    def test_workers_that_fail(self):
+        """
+        Test that lazy_smp raises, rather than waiting forever, when every
+        worker's search fails.
+        """
+        with patch('builtins.input', return_value='3000'):
+            game = playable_games['s'](True)
+        # The workers' tracebacks are printed to their own stderr
+        with patch('sys.stderr'):
+            self.assertRaises(RuntimeError, lazy_smp, game, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
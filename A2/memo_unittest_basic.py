@@ -0,0 +1,48 @@
+"""
+A subset of unittests used for testing the shared rough_outcome cache.
+"""
+import unittest
+
+from headless import make_game
+from strategy import cached_rough_outcome, depth_limited_minimax, \
+    memo_stats, rough_outcome_strategy
+from subtract_square_state import SubtractSquareState
+
+
+class MemoUnitTests(unittest.TestCase):
+    def test_cached_matches_rough_outcome(self):
+        """
+        Test that cached results match rough_outcome, and that an equal
+        state is answered from the cache.
+        """
+        state = make_game('h', True, 3).current_state.make_move('A')
+        before = memo_stats()['rough_outcome']['hits']
+        self.assertEqual(cached_rough_outcome(state), state.rough_outcome())
+        equal = make_game('h', True, 3).current_state.make_move('A')
+        self.assertEqual(cached_rough_outcome(equal), state.rough_outcome())
+        self.assertGreater(memo_stats()['rough_outcome']['hits'], before)
+
+    def test_shared_between_strategies(self):
+        """
+        Test that depth_limited_minimax answers the states
+        rough_outcome_strategy evaluated from the cache, and that
+        is_pos_square's checks are counted.
+        """
+        game = make_game('s', True, 300)
+        rough_outcome_strategy(game)
+        before = memo_stats()
+        depth_limited_minimax(game, 1)
+        after = memo_stats()
+        self.assertGreater(after['rough_outcome']['hits'],
+                           before['rough_outcome']['hits'])
+        self.assertEqual(after['rough_outcome']['misses'],
+                         before['rough_outcome']['misses'])
+        SubtractSquareState(True, 300).rough_outcome()
+        self.assertGreater(after['is_pos_square']['hits'] +
+                           after['is_pos_square']['misses'], 0)
+        self.assertLessEqual(after['is_pos_square']['size'],
+                             after['is_pos_square']['max_size'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+"""
+Memory profiling of strategy calls.
+
+A MemoryProfiler wraps strategies so that every call is traced with
+tracemalloc. For each call it records:
+
+    peak_bytes - the most memory allocated during the call at one time,
+                 above what was allocated when it started
+    nodes - the positions the strategy explored: its calls of make_move on
+            the game's state class
+    bytes_per_node - peak_bytes / nodes
+    top_sites - the source lines holding the most memory near the peak
+    overlapped - whether another profiled call ran at the same time
+
+The sites come from a snapshot taken whenever the memory traced during the
+call grows past its highest snapshot by SNAPSHOT_STEP, checked at each
+explored node, so they show what was alive near the peak rather than what
+survived the call (which is used if the call never grew by MIN_GROWTH).
+Tracing slows the strategies down several times.
+
+Profiled calls may overlap in several threads. make_move is replaced once
+per state class while any call uses it, and a node is counted for the
+innermost profiled call of the thread that made it, so positions explored
+in other threads (pondering, lazy SMP workers) are not counted. Tracing
+starts with the first running call and stops with the last. tracemalloc
+traces the whole process, so the peak and sites of a call recorded as
+overlapped include what the other calls allocated at the same time.
+GameInterface does not take a profiler together with ponder for this
+reason.
+
+play_headless and GameInterface take a profiler, and report writes what it
+recorded as JSON. Run
+
+    python memory_profile.py GAME SETTING P1 P2 [REPORT]
+
+to play a game of playable_games[GAME] between the strategies that
+game_interface.new_strategy gives for P1 and P2 with profiling, writing the
+report to REPORT (or printing it).
+"""
+from typing import Any, Callable, Dict, List
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+# A new snapshot is taken when the memory traced during a call grows by
+# this fraction over its highest snapshot, and by at least MIN_GROWTH bytes
+SNAPSHOT_STEP = 0.1
+MIN_GROWTH = 1 << 16
+
+# Guards _PATCHED, _ACTIVE and _TRACING
+_LOCK = threading.Lock()
+# For each state class whose make_move counts nodes: [profiled calls using
+# it, make_move as found in the class's own __dict__ or None]
+_PATCHED = {}
+# The records of the profiled calls running now, in any thread
+_ACTIVE = []
+# [whether a profiled call started tracemalloc]
+_TRACING = [False]
+# The records of the profiled calls running in each thread, innermost last
+_LOCAL = threading.local()
+
+
+def _frames() -> list:
+    """
+    Return the records of the profiled calls running in this thread.
+    """
+    frames = getattr(_LOCAL, 'frames', None)
+    if frames is None:
+        frames = _LOCAL.frames = []
+    return frames
+
+
+def _patch(cls: type) -> None:
+    """
+    Make cls.make_move count nodes for the profiled calls of the thread it
+    is called in, if no running call has already. Called with _LOCK held.
+    """
+    if cls in _PATCHED:
+        _PATCHED[cls][0] += 1
+        return
+    _PATCHED[cls] = [1, cls.__dict__.get('make_move')]
+    make_move = cls.make_move
+
+    def counting_make_move(self_state: Any, move: Any) -> Any:
+        """
+        Return make_move of self_state, counting it as a node of this
+        thread's innermost profiled call and snapshotting memory if it has
+        grown enough.
+        """
+        frames = getattr(_LOCAL, 'frames', None)
+        if frames:
+            frame = frames[-1]
+            frame['nodes'] += 1
+            current = tracemalloc.get_traced_memory()[0]
+            if current - frame['seen'] > max(
+                    (frame['seen'] - frame['base']) * SNAPSHOT_STEP,
+                    MIN_GROWTH):
+                frame['seen'] = current
+                frame['snapshot'] = tracemalloc.take_snapshot()
+        return make_move(self_state, move)
+
+    cls.make_move = counting_make_move
+
+
+def _unpatch(cls: type) -> None:
+    """
+    Give cls back its own make_move once no running call uses the counting
+    one. Called with _LOCK held.
+    """
+    _PATCHED[cls][0] -= 1
+    if not _PATCHED[cls][0]:
+        original = _PATCHED.pop(cls)[1]
+        if original is None:
+            del cls.make_move
+        else:
+            cls.make_move = original
+
+
+class MemoryProfiler:
+    """
+    Traces the memory used by calls of the strategies it wraps.
+
+    top - the number of allocation sites recorded per call
+    calls - a record of every profiled call, in order of finishing
+    """
+    top: int
+    calls: List[Dict[str, Any]]
+
+    def __init__(self, top: int = 10) -> None:
+        """
+        Initialize a MemoryProfiler recording top allocation sites per call.
+        """
+        self.top = top
+        self.calls = []
+
+    def wrap(self, strategy: Callable) -> Callable:
+        """
+        Return a strategy that plays like strategy and profiles each call.
+        Attributes of strategy, like reroot, are kept.
+        """
+        @functools.wraps(strategy)
+        def profiled(game: Any, *args: Any) -> Any:
+            """
+            Return strategy's move for game, profiling the call.
+            """
+            return self.profile(strategy, game, *args)
+        return profiled
+
+    def profile(self, strategy: Callable, game: Any, *args: Any) -> Any:
+        """
+        Return strategy(game, *args), recording its memory use.
+        """
+        state = game.current_state
+        cls = type(state)
+        with _LOCK:
+            if not _ACTIVE and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _TRACING[0] = True
+            base = tracemalloc.get_traced_memory()[0]
+            frame = {'nodes': 0, 'base': base, 'seen': base,
+                     'snapshot': None, 'overlapped': bool(_ACTIVE)}
+            if _ACTIVE:
+                for other in _ACTIVE:
+                    other['overlapped'] = True
+            else:
+                tracemalloc.reset_peak()
+            _ACTIVE.append(frame)
+            _patch(cls)
+        _frames().append(frame)
+        start = time.perf_counter()
+        try:
+            move = strategy(game, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            _frames().pop()
+            with _LOCK:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                snapshot = frame['snapshot'] or tracemalloc.take_snapshot()
+                _unpatch(cls)
+                _ACTIVE.remove(frame)
+                if not _ACTIVE and _TRACING[0]:
+                    tracemalloc.stop()
+                    _TRACING[0] = False
+        self.calls.append({
+            'strategy': strategy.__name__,
+            'player': state.get_current_player_name(),
+            'move': str(move), 'seconds': elapsed, 'peak_bytes': peak,
+            'nodes': frame['nodes'],
+            'bytes_per_node': peak / frame['nodes'] if frame['nodes']
+            else None,
+            'overlapped': frame['overlapped'],
+            'top_sites': self._sites(snapshot)})
+        return move
+
+    def _sites(self, snapshot: tracemalloc.Snapshot) -> List[dict]:
+        """
+        Return the top source lines by memory held in snapshot, leaving out
+        tracemalloc and this module.
+        """
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)])
+        return [{'site': '{}:{}'.format(stat.traceback[0].filename,
+                                        stat.traceback[0].lineno),
+                 'bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top]]
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Return for each strategy its number of calls, largest peak, total
+        nodes and bytes per node over all its calls.
+        """
+        summary = {}
+        for call in self.calls:
+            totals = summary.setdefault(call['strategy'], {
+                'calls': 0, 'max_peak_bytes': 0, 'nodes': 0,
+                'seconds': 0.0, '_bytes': 0})
+            totals['calls'] += 1
+            totals['max_peak_bytes'] = max(totals['max_peak_bytes'],
+                                           call['peak_bytes'])
+            totals['nodes'] += call['nodes']
+            totals['seconds'] += call['seconds']
+            totals['_bytes'] += call['peak_bytes']
+        for totals in summary.values():
+            spent = totals.pop('_bytes')
+            totals['bytes_per_node'] = spent / totals['nodes'] \
+                if totals['nodes'] else None
+        return summary
+
+    def report(self, path: str = None) -> dict:
+        """
+        Return the summary and calls recorded, and write them to path as
+        JSON if it is given.
+        """
+        report = {'summary': self.summary(), 'calls': self.calls}
+        if path is not None:
+            with open(path, 'w') as file:
+                json.dump(report, file, indent=1)
+                file.write('\n')
+        return report
+
+
+def main() -> None:
+    """
+    Profile a game between the strategies given on the command line.
+    """
+    import sys
+    from game_interface import new_strategy
+    from headless import make_game, play_headless, read_setting
+    game_key, setting, first, second = sys.argv[1:5]
+    profiler = MemoryProfiler()
+    play_headless(make_game(game_key, True, read_setting(game_key, setting)),
+                  new_strategy(first), new_strategy(second),
+                  profiler)
+    report = profiler.report(sys.argv[5] if len(sys.argv) > 5 else None)
+    if len(sys.argv) <= 5:
+        print(json.dumps(report, indent=1))
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        main()
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,105 @@
+"""
+A subset of unittests used for testing memory profiling.
+"""
+import json
+import os
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from engine import make_engine_strategy
+from game_interface import GameInterface, playable_games
+from headless import make_game, play_headless
+from memory_profile import MemoryProfiler
+from strategy import recursive_minimax, rough_outcome_strategy
+from subtract_square_state import SubtractSquareState
+
+
+class MemoryProfileUnitTests(unittest.TestCase):
+    def test_play_headless(self):
+        """
+        Test that every strategy call of a headless game is recorded, with
+        the nodes it explored, and that the game is played as without a
+        profiler.
+        """
+        profiler = MemoryProfiler(top=3)
+        result = play_headless(make_game('s', True, 12), recursive_minimax,
+                               rough_outcome_strategy, profiler)
+        self.assertEqual(result, play_headless(make_game('s', True, 12),
+                                               recursive_minimax,
+                                               rough_outcome_strategy))
+        self.assertEqual(len(profiler.calls), len(result[1]))
+        first = profiler.calls[0]
+        self.assertEqual(first['strategy'], 'recursive_minimax')
+        self.assertEqual(first['player'], 'p1')
+        self.assertGreater(first['nodes'], 0)
+        self.assertGreater(first['peak_bytes'], 0)
+        self.assertLessEqual(len(first['top_sites']), 3)
+        self.assertEqual(SubtractSquareState.make_move.__name__, 'make_move')
+        self.assertFalse(tracemalloc.is_tracing())
+        summary = profiler.summary()
+        self.assertEqual(summary['recursive_minimax']['calls'] +
+                         summary['rough_outcome_strategy']['calls'],
+                         len(result[1]))
+
+    def test_report(self):
+        """
+        Test that the report is written as JSON, and that wrapped engine
+        strategies keep their attributes.
+        """
+        profiler = MemoryProfiler()
+        strategy = profiler.wrap(make_engine_strategy())
+        self.assertTrue(hasattr(strategy, 'reroot'))
+        play_headless(make_game('h', True, 1), strategy, strategy)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.json')
+            profiler.report(path)
+            with open(path) as file:
+                report = json.load(file)
+        self.assertEqual(len(report['calls']), len(profiler.calls))
+        self.assertIn('bytes_per_node', report['summary']['engine_strategy'])
+
+    def test_game_interface(self):
+        """
+        Test that GameInterface profiles the calls of both strategies.
+        """
+        profiler = MemoryProfiler()
+        with patch('builtins.input', side_effect=['y', '9']), \
+                patch('builtins.print'):
+            GameInterface(playable_games['s'], recursive_minimax,
+                          recursive_minimax, profiler=profiler).play()
+        self.assertEqual({call['player'] for call in profiler.calls},
+                         {'p1', 'p2'})
+
+    def test_overlapping_calls(self):
+        """
+        Test that calls profiled at once in two threads each count their own
+        nodes, and leave make_move and tracemalloc as they found them.
+        """
+        profiler = MemoryProfiler()
+        strategy = profiler.wrap(recursive_minimax)
+        alone = MemoryProfiler()
+        for total in [25, 22]:
+            alone.wrap(recursive_minimax)(make_game('s', True, total))
+        threads = [threading.Thread(target=strategy,
+                                    args=(make_game('s', True, total),))
+                   for total in [25, 22]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(call['nodes'] for call in profiler.calls),
+                         sorted(call['nodes'] for call in alone.calls))
+        self.assertTrue(all(call['overlapped'] for call in profiler.calls))
+        self.assertEqual(SubtractSquareState.make_move.__name__, 'make_move')
+        self.assertFalse(tracemalloc.is_tracing())
+        with patch('builtins.input', side_effect=['y', '9']):
+            self.assertRaises(ValueError, GameInterface,
+                              playable_games['s'], recursive_minimax,
+                              make_engine_strategy(), True, profiler)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,6 +26,7 @@ import inspect
 from game_interface import playable_games, usable_strategies
 minimax_iterative_strategy = usable_strategies['mi']
 minimax_recursive_strategy = usable_strategies['mr']
+minimax_depth_limited_strategy = usable_strategies['md']
 StonehengeGame = playable_games['h']
 SubtractSquareGame = playable_games['s']
 
@@ -232,5 +233,50 @@ class MinimaxUnitTests(unittest.TestCase):
                              expected_move, move_chosen, str(new_state)
                          ))
 
+    def test_depth_limited_subtract_square_18(self):
+        """
+        Test depth-limited minimax on a game of SubtractSquare with a value of
+        18. The search is deep enough to see the win, so the chosen move
+        should be 16 or 1.
+        """
+        with patch('builtins.input', return_value='18'):
+            game = SubtractSquareGame(True)
+
+        move_chosen = minimax_depth_limited_strategy(game)
+        expected_moves = [game.str_to_move("1"), game.str_to_move("16")]
+
+        self.assertTrue(move_chosen in expected_moves,
+                        ("Calling depth-limited minimax on a game of " +
+                         "SubtractSquare with " +
+                         "a value of {} should result in a move in {} " +
+                         "being returned, but {} was returned instead.").format(
+                            18, expected_moves, move_chosen
+                        ))
+
+    def test_depth_limited_stonehenge_one_winning_move(self):
+        """
+        Test depth-limited minimax with a depth of 1 on a game of Stonehenge
+        where there is only 1 winning move that is immediately in sight.
+        """
+
+        with patch('builtins.input', return_value='3'):
+            game = StonehengeGame(False)
+
+        moves_to_make = ['K', 'A', 'C', 'B', 'F', 'E', 'G', 'D', 'I']
+        for move in moves_to_make:
+            game.current_state = game.current_state.make_move(
+                game.str_to_move(move))
+
+        move_chosen = minimax_depth_limited_strategy(game, 1)
+        expected_moves = [game.str_to_move("H")]
+        self.assertTrue(move_chosen in expected_moves,
+                        ("Calling depth-limited minimax on a game of " +
+                         "Stonehenge with " +
+                         "the following board should return a move in {} " +
+                         "but got {} instead.\n{}").format(
+                             expected_moves, move_chosen,
+                             STONEHENGE_MINIMAX_BOARD
+                         ))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+SubtractSquare over several heaps.
+
+Players take turns subtracting a number of the subtraction set (the square
+numbers, or any set of positive numbers) from one heap, and the player who
+makes the last move wins. The game is a sum of one-heap games, so by the
+Sprague-Grundy theorem a position is lost for the player to move exactly
+when the XOR of the Grundy values of its heaps is 0.
+
+grundy_table computes the Grundy value of every heap size up to a limit
+with NumPy, which is imported only when a table is first computed. For each
+Grundy value g it keeps a boolean array of the sizes that have a move to a
+size of value g; the value of a size is the first g whose array does not
+have it, and the sizes it can be reached from are then set in one
+vectorized assignment. Tables are kept per subtraction set by
+grundy_values, so grundy_strategy and rough_outcome answer exactly, in time
+that does not grow with the search tree.
+"""
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+from math import isqrt
+import re
+from game_state import GameState
+from subtract_square_game import SubtractSquareGame
+
+# The Grundy tables computed so far, keyed by subtraction set
+_TABLES = {}
+
+
+def squares_up_to(limit: int) -> Tuple[int, ...]:
+    """
+    Return the positive square numbers up to limit.
+    """
+    return tuple(i ** 2 for i in range(1, isqrt(max(limit, 0)) + 1))
+
+
+def grundy_table(limit: int, subtractions: Iterable[int]) -> Sequence[int]:
+    """
+    Return a NumPy array of the Grundy values of the heap sizes 0 to limit,
+    when a move subtracts a number of subtractions.
+
+    It takes a byte per heap size for each distinct Grundy value.
+    """
+    import numpy as np
+    moves = np.array(sorted({s for s in subtractions if 0 < s <= limit}),
+                     dtype=np.int64)
+    values = np.zeros(limit + 1, dtype=np.int32)
+    # The number of moves from each size that stay within the table
+    counts = np.searchsorted(moves, limit - np.arange(limit + 1), 'right')
+    # reach[g][n] is whether n has a move to a size of Grundy value g
+    reach = []
+    for n in range(limit + 1):
+        g = 0
+        while g < len(reach) and reach[g][n]:
+            g += 1
+        values[n] = g
+        if g == len(reach):
+            reach.append(np.zeros(limit + 1, dtype=bool))
+        reach[g][n + moves[:counts[n]]] = True
+    return values
+
+
+def grundy_values(limit: int, subtractions: Tuple[int, ...] = None) \
+        -> Sequence[int]:
+    """
+    Return the Grundy values of the heap sizes 0 to at least limit for
+    subtractions (the squares if None), from the table kept for them if it
+    is large enough.
+    """
+    known = _TABLES.get(subtractions)
+    if known is None or len(known) <= limit:
+        if subtractions is None:
+            # Grow the table of squares geometrically
+            limit = max(limit, 2 * (0 if known is None else len(known)))
+            moves = squares_up_to(limit)
+        else:
+            moves = subtractions
+        known = _TABLES[subtractions] = grundy_table(limit, moves)
+    return known
+
+
+class MultiSubtractSquareState(GameState):
+    """
+    The state of a game of SubtractSquare over several heaps.
+
+    heaps - the sizes of the heaps
+    subtractions - the numbers that can be subtracted, or None for the
+        square numbers
+    """
+    heaps: Tuple[int, ...]
+    subtractions: Tuple[int, ...]
+    __slots__ = ('heaps', 'subtractions')
+
+    def __init__(self, is_p1_turn: bool, heaps: Iterable[int],
+                 subtractions: Iterable[int] = None) -> None:
+        """
+        Initialize this game state and set the current player based on
+        is_p1_turn. Subtractions that are not positive are left out, since
+        they would be moves that change no heap.
+        """
+        super().__init__(is_p1_turn)
+        self.heaps = tuple(heaps)
+        self.subtractions = None if subtractions is None else \
+            tuple(sorted({s for s in subtractions if s > 0}))
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the current state of the game.
+        """
+        return "Heaps: {}".format(", ".join(
+            "{}: {}".format(i, heap) for i, heap in enumerate(self.heaps)))
+
+    def _moves_from(self, heap: int) -> Iterator[int]:
+        """
+        Return an iterator over the numbers that can be subtracted from a
+        heap of size heap, in increasing order.
+        """
+        if self.subtractions is None:
+            return iter(squares_up_to(heap))
+        return (s for s in self.subtractions if s <= heap)
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state: pairs
+        of a heap's index and the number to subtract from it.
+        """
+        return list(self.iter_possible_moves())
+
+    def iter_possible_moves(self) -> Iterator[Tuple[int, int]]:
+        """
+        Return an iterator over the possible moves of this state, by heap
+        and then by increasing number.
+        """
+        return ((i, s) for i, heap in enumerate(self.heaps)
+                for s in self._moves_from(heap))
+
+    def make_move(self, move: Tuple[int, int]) -> "MultiSubtractSquareState":
+        """
+        Return the GameState that results from applying move to this
+        GameState.
+        """
+        heap, amount = move
+        heaps = list(self.heaps)
+        heaps[heap] -= amount
+        state = MultiSubtractSquareState.__new__(MultiSubtractSquareState)
+        GameState.__init__(state, not self.p1_turn)
+        state.heaps = tuple(heaps)
+        state.subtractions = self.subtractions
+        return state
+
+    def __repr__(self) -> str:
+        """
+        Return a representation of this state (which can be used for
+        equality testing).
+        """
+        return "P1's Turn: {} - Heaps: {} - Subtractions: {}".format(
+            self.p1_turn, self.heaps,
+            'squares' if self.subtractions is None else self.subtractions)
+
+    def key(self) -> tuple:
+        """
+        Return a tuple of the values that identify this state.
+        """
+        return self.p1_turn, self.heaps, self.subtractions
+
+    def code(self) -> int:
+        """
+        Return a non-negative integer that identifies the heaps and player
+        to move of this state, but not its subtraction set.
+
+        Each heap plus 1 is a digit in base (largest heap + 2), and the
+        digits are paired with the base by Cantor's pairing function, so
+        the heaps can be read back from the code.
+        """
+        base = max(self.heaps, default=0) + 2
+        digits = 0
+        for heap in self.heaps:
+            digits = digits * base + heap + 1
+        pair = (digits + base) * (digits + base + 1) // 2 + base
+        return pair * 2 + (1 if self.p1_turn else 0)
+
+    def nim_sum(self) -> int:
+        """
+        Return the XOR of the Grundy values of the heaps: 0 exactly when the
+        player to move loses under perfect play.
+        """
+        values = grundy_values(max(self.heaps, default=0), self.subtractions)
+        total = 0
+        for heap in self.heaps:
+            total ^= int(values[heap])
+        return total
+
+    def rough_outcome(self) -> float:
+        """
+        Return the outcome the current player can guarantee from state self,
+        which the Grundy values give exactly.
+        """
+        return self.WIN if self.nim_sum() else self.LOSE
+
+
+class MultiSubtractSquareGame(SubtractSquareGame):
+    """
+    SubtractSquare played over several heaps.
+    """
+
+    def __init__(self, p1_starts: bool) -> None:
+        """
+        Initialize this Game, using p1_starts to find who the first player
+        is, and asking for the heaps and the subtraction set.
+        """
+        heaps = [int(heap) for heap in re.findall(
+            r'\d+', input("Enter the heap sizes: "))]
+        subtractions = [int(s) for s in re.findall(r'\d+', input(
+            "Enter the positive numbers to subtract (blank for square "
+            "numbers): ")) if int(s) > 0]
+        self.current_state = MultiSubtractSquareState(
+            p1_starts, heaps, subtractions or None)
+
+    def get_instructions(self) -> str:
+        """
+        Return the instructions for this Game.
+        """
+        return "Players take turns subtracting an allowed number (a square" \
+            " number unless others were chosen) from one of the heaps. The" \
+            " winner is the player who makes the last move. Enter a move as" \
+            " the heap's number and the number to subtract, like '0 4'."
+
+    def is_over(self, state: MultiSubtractSquareState) -> bool:
+        """
+        Return whether or not this game is over: whether no number can be
+        subtracted from any heap.
+        """
+        return next(state.iter_possible_moves(), None) is None
+
+    def str_to_move(self, string: str) -> Any:
+        """
+        Return the move that string represents, a heap's number and the
+        number to subtract. If string is not a move, return an invalid move.
+        """
+        numbers = re.findall(r'\d+', string)
+        if len(numbers) != 2:
+            return -1
+        return int(numbers[0]), int(numbers[1])
+
+
+def grundy_strategy(game: Any) -> Any:
+    """
+    Return a move for a game of MultiSubtractSquareGame that leaves a nim
+    sum of 0, or the first possible move if there is none.
+    """
+    state = game.current_state
+    total = state.nim_sum()
+    values = grundy_values(max(state.heaps, default=0), state.subtractions)
+    if total:
+        for heap, amount in state.iter_possible_moves():
+            size = state.heaps[heap]
+            if values[size - amount] == values[size] ^ total:
+                return heap, amount
+    return next(state.iter_possible_moves(), None)
+
+
+def table_stats() -> Dict[str, Any]:
+    """
+    Return the largest heap size and Grundy value of each kept table.
+    """
+    return {'squares' if subtractions is None else str(subtractions):
+            {'limit': len(values) - 1, 'largest_value': int(values.max())}
+            for subtractions, values in _TABLES.items()}
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,96 @@
+"""
+A subset of unittests used for testing multi-heap SubtractSquare.
+"""
+import itertools
+import unittest
+from unittest.mock import patch
+
+from engine import Engine
+from game_interface import GameInterface, playable_games, usable_strategies
+from headless import make_game, play_headless
+from multi_subtract_square import MultiSubtractSquareState, grundy_strategy, \
+    grundy_table
+MultiSubtractSquareGame = playable_games['m']
+
+
+def mex_table(limit, subtractions):
+    """
+    Return the Grundy values of the heap sizes 0 to limit, computed one
+    size at a time.
+    """
+    values = []
+    for n in range(limit + 1):
+        seen = {values[n - s] for s in subtractions if 0 < s <= n}
+        values.append(next(g for g in itertools.count() if g not in seen))
+    return values
+
+
+class MultiSubtractSquareUnitTests(unittest.TestCase):
+    def test_grundy_table(self):
+        """
+        Test that the vectorized tables match the tables computed one size
+        at a time, for the squares and another subtraction set.
+        """
+        squares = [i ** 2 for i in range(1, 40)]
+        self.assertEqual(list(grundy_table(1500, squares)),
+                         mex_table(1500, squares))
+        self.assertEqual(list(grundy_table(300, [2, 3, 7])),
+                         mex_table(300, [2, 3, 7]))
+
+    def test_nim_sum_is_exact(self):
+        """
+        Test that the nim sum gives the engine's value, and that
+        grundy_strategy's moves win every winning position.
+        """
+        for subtractions in [None, (1, 3, 4), (0, 2)]:
+            for heaps in itertools.product(range(7), repeat=2):
+                state = MultiSubtractSquareState(True, heaps, subtractions)
+                game = MultiSubtractSquareGame.from_state(state)
+                value = Engine().value(game, state)
+                self.assertEqual(state.rough_outcome(), value)
+                if value == state.WIN:
+                    move = grundy_strategy(game)
+                    self.assertEqual(Engine().value(
+                        game, state.make_move(move)), state.LOSE)
+
+    def test_non_positive_subtractions(self):
+        """
+        Test that subtracting 0 is not a move, so the game still ends.
+        """
+        state = MultiSubtractSquareState(True, (3,), (0, 2))
+        self.assertEqual(state.get_possible_moves(), [(0, 2)])
+        with patch('builtins.input', side_effect=['1', '0 2']):
+            game = MultiSubtractSquareGame(True)
+        self.assertEqual(game.current_state.subtractions, (2,))
+        self.assertTrue(game.is_over(state.make_move((0, 2))))
+
+    def test_headless(self):
+        """
+        Test that headless games take heap sizes separated by commas as
+        their setting.
+        """
+        game = make_game('m', True, '3,4,5')
+        self.assertEqual(game.current_state.heaps, (3, 4, 5))
+        result = play_headless(game, grundy_strategy, usable_strategies['ro'])
+        self.assertEqual(result[0], 'p1')
+        for setting in ['', '3,x', '-1']:
+            self.assertRaises(ValueError, make_game, 'm', True, setting)
+
+    def test_play_large_heaps(self):
+        """
+        Test that grundy_strategy wins a game on large heaps from a winning
+        position.
+        """
+        answers = ['y', '1000 2345 77', '']
+        with patch('builtins.input', side_effect=answers), \
+                patch('builtins.print'):
+            interface = GameInterface(MultiSubtractSquareGame,
+                                      usable_strategies['g'],
+                                      usable_strategies['ro'])
+            won = interface.game.current_state.nim_sum() != 0
+            interface.play()
+        self.assertEqual(interface.game.is_winner('p1'), won)
+
+
+if __name__ == "__main__":
+    unittest.main()
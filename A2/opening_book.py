@@ -0,0 +1,292 @@
+"""
+Opening books for StoneHenge.
+
+build_opening_book searches every position of the first few plies of a board
+offline and writes the best move found for each to a book file. Positions
+that are mirror images or rotations of each other are stored once, under the
+canonical form given by canonical_state. The file is a header followed by
+fixed-size records sorted by key, so OpeningBook can memory-map it and look a
+position up by binary search without reading the whole book.
+
+with_opening_book wraps any strategy so that it plays from the book while the
+game is still in it.
+"""
+from typing import Any, Callable, Iterator, List, Tuple
+import mmap
+import struct
+from stonehenge import StoneHenge, StoneHengeState, ley_line_index
+from strategy import rough_outcome_evaluator
+
+BOOK_MAGIC = b'MMOB\x01'
+# The header holds the side-length, plies and search depth of the book, and
+# the number of records.
+BOOK_HEADER = struct.Struct('<5sBBBI')
+# A record holds the low and high 64 bits of the canonical state's code, the
+# position of the best move's cell in the canonical state and its score.
+BOOK_RECORD = struct.Struct('<QQBb')
+
+# Symmetries of each side-length, built on first use by board_symmetries
+_SYMMETRIES = {}
+
+
+def board_symmetries(size: int) -> List[Tuple[tuple, tuple]]:
+    """
+    Return the symmetries of a board of side-length size, the identity
+    first.
+
+    A symmetry is a pair (cells, lines): the cell at position i moves to
+    position cells[i] and ley-line x (in the order of ley_line_index) to
+    ley-line lines[x]. Every symmetry maps each ley-line onto a ley-line, so
+    it maps every position onto an equivalent one.
+    """
+    if size not in _SYMMETRIES:
+        lines, cell_lines = ley_line_index(size)
+        line_sets = [frozenset(line) for line in lines]
+        found = []
+        _extend_symmetry([], cell_lines, line_sets, found)
+        _SYMMETRIES[size] = [
+            (cells, tuple(line_sets.index(frozenset(cells[i] for i in line))
+                          for line in lines)) for cells in found]
+    return _SYMMETRIES[size]
+
+
+def _extend_symmetry(cells: list, cell_lines: tuple, line_sets: list,
+                     found: list) -> None:
+    """
+    Add to found every symmetry whose first len(cells) cells move to cells.
+    Cells sharing a ley-line must move to cells that share a ley-line.
+    """
+    i = len(cells)
+    if i == len(cell_lines):
+        if all(frozenset(cells[c] for c in line) in line_sets
+               for line in line_sets):
+            found.append(tuple(cells))
+        return
+    for j in range(len(cell_lines)):
+        if j not in cells and all(
+                bool(set(cell_lines[i]) & set(cell_lines[k])) ==
+                bool(set(cell_lines[j]) & set(cell_lines[cells[k]]))
+                for k in range(i)):
+            _extend_symmetry(cells + [j], cell_lines, line_sets, found)
+
+
+def transform_state(state: StoneHengeState,
+                    symmetry: Tuple[tuple, tuple]) -> StoneHengeState:
+    """
+    Return the state that symmetry maps state onto. Unclaimed cells take the
+    letter of their new position.
+    """
+    cells, lines = symmetry
+    values = sum(state.grid, ())
+    moved = [None] * len(values)
+    for i in range(len(values)):
+        moved[cells[i]] = values[i] if values[i] in [1, 2] \
+            else state.constant_letters[cells[i]]
+    owners = state.left_diagonal + state.right_diagonal + state.horizontal
+    new_owners = [None] * len(owners)
+    for x in range(len(owners)):
+        new_owners[lines[x]] = owners[x]
+
+    grid = []
+    for row in state.grid:
+        grid.append(tuple(moved[:len(row)]))
+        moved = moved[len(row):]
+    n = state.size + 1
+    return StoneHengeState.from_parts(
+        state.p1_turn, state.size, tuple(grid), tuple(new_owners[:n]),
+        tuple(new_owners[n:2 * n]), tuple(new_owners[2 * n:]))
+
+
+def canonical_state(state: StoneHengeState) \
+        -> Tuple[StoneHengeState, Tuple[tuple, tuple]]:
+    """
+    Return (canonical, symmetry): the state with the smallest code among
+    those equivalent to state, and the symmetry that maps state onto it.
+    """
+    best = None
+    for symmetry in board_symmetries(state.size):
+        image = transform_state(state, symmetry)
+        if best is None or image.code() < best[0].code():
+            best = (image, symmetry)
+    return best
+
+
+def opening_positions(size: int, plies: int) -> Iterator[StoneHengeState]:
+    """
+    Yield the canonical form of every position that is not over and can be
+    reached in at most plies moves, with either player starting.
+    """
+    game = StoneHenge.__new__(StoneHenge)
+    layer = {canonical_state(StoneHengeState(p1_starts, size))[0]
+             for p1_starts in [True, False]}
+    for ply in range(plies + 1):
+        next_layer = set()
+        for state in layer:
+            if game.is_over(state):
+                continue
+            yield state
+            if ply < plies:
+                next_layer.update(canonical_state(state.make_move(move))[0]
+                                  for move in state.get_possible_moves())
+        layer = next_layer
+
+
+def _search_value(game: Any, state: Any, depth: int,
+                  evaluator: Callable[[Any], float], alpha: float,
+                  beta: float) -> float:
+    """
+    Return the score strategy.depth_limited_value gives state, searching
+    with alpha-beta pruning in the window (alpha, beta).
+
+    Scores outside of (alpha, beta) are only bounds: a score <= alpha means
+    the true score is at most alpha, and a score >= beta that it is at least
+    beta.
+    """
+    if game.is_over(state):
+        # The player who made the last move has won.
+        return state.LOSE
+    moves = state.get_possible_moves()
+    if depth <= 0 or not moves:
+        return evaluator(state)
+    best = float('-inf')
+    for move in moves:
+        best = max(best, _search_value(game, state.make_move(move),
+                                       depth - 1, evaluator, -beta,
+                                       -max(alpha, best)) * -1)
+        if best >= beta:
+            break
+    return best
+
+
+def build_opening_book(size: int, plies: int, depth: int, path: str,
+                       evaluator: Callable[[Any], float] = None) -> int:
+    """
+    Write an opening book for side-length size to path and return the
+    number of positions in it.
+
+    Every position of the first plies moves is searched depth moves ahead
+    with alpha-beta, scoring the states at that depth with evaluator (by
+    default their rough_outcome).
+    """
+    if evaluator is None:
+        evaluator = rough_outcome_evaluator
+    game = StoneHenge.__new__(StoneHenge)
+    records = []
+    for state in opening_positions(size, plies):
+        moves = state.get_possible_moves()
+        best, best_move = float('-inf'), None
+        for move in moves:
+            score = _search_value(game, state.make_move(move), depth - 1,
+                                  evaluator, float('-inf'), -best) * -1
+            if score > best:
+                best, best_move = score, move
+        records.append((state.code(), state.constant_letters.index(best_move),
+                        int(best)))
+
+    records.sort()
+    with open(path, 'wb') as file:
+        file.write(BOOK_HEADER.pack(BOOK_MAGIC, size, plies, depth,
+                                    len(records)))
+        for code, cell, score in records:
+            file.write(BOOK_RECORD.pack(code & 0xFFFFFFFFFFFFFFFF, code >> 64,
+                                        cell, score))
+    return len(records)
+
+
+class OpeningBook:
+    """
+    An opening book file, memory-mapped for lookups.
+
+    size - the side-length of the book's board
+    plies - how many moves into the game the book covers
+    depth - how deep each book position was searched
+    """
+    size: int
+    plies: int
+    depth: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the book at path.
+        """
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.plies, self.depth, self._count = \
+            BOOK_HEADER.unpack_from(self._map, 0)
+        if magic != BOOK_MAGIC:
+            raise ValueError('{} is not an opening book'.format(path))
+
+    def __len__(self) -> int:
+        """
+        Return the number of positions in this book.
+        """
+        return self._count
+
+    def lookup(self, state: StoneHengeState) -> Tuple[str, int]:
+        """
+        Return (move, score) for state from this book, where score is the
+        searched outcome for the player to move, or None if state is not in
+        the book.
+        """
+        if state.size != self.size:
+            return None
+        canonical, (cells, _) = canonical_state(state)
+        key = canonical.code()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._record(middle)
+            if entry[0] == key:
+                # Map the canonical cell back onto state's board
+                return (state.constant_letters[cells.index(entry[1])],
+                        entry[2])
+            elif entry[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _record(self, index: int) -> Tuple[int, int, int]:
+        """
+        Return (code, cell, score) of the index-th record.
+        """
+        code_low, code_high, cell, score = BOOK_RECORD.unpack_from(
+            self._map, BOOK_HEADER.size + index * BOOK_RECORD.size)
+        return (code_high << 64) | code_low, cell, score
+
+    def close(self) -> None:
+        """
+        Close this book's file.
+        """
+        self._map.close()
+
+
+def with_opening_book(strategy: Callable[[Any], Any],
+                      book: OpeningBook) -> Callable[[Any], Any]:
+    """
+    Return a strategy that plays the book move of book while the game's
+    current state is in it, and strategy's move otherwise.
+    """
+    def book_strategy(game: Any) -> Any:
+        """
+        Return the book move for game, or strategy's move if there is none.
+        """
+        entry = book.lookup(game.current_state) \
+            if isinstance(game.current_state, StoneHengeState) else None
+        if entry is not None and game.current_state.is_valid_move(entry[0]):
+            return entry[0]
+        return strategy(game)
+    book_strategy.__name__ = '{}_with_book'.format(strategy.__name__)
+    return book_strategy
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) == 5:
+        # python opening_book.py SIZE PLIES DEPTH PATH builds a book
+        count = build_opening_book(int(sys.argv[1]), int(sys.argv[2]),
+                                   int(sys.argv[3]), sys.argv[4])
+        print('Wrote {} positions to {}'.format(count, sys.argv[4]))
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
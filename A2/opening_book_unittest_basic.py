@@ -0,0 +1,87 @@
+"""
+A subset of unittests used for testing StoneHenge opening books.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+from opening_book import board_symmetries, build_opening_book, \
+    canonical_state, OpeningBook, with_opening_book
+StonehengeGame = playable_games['h']
+
+
+class OpeningBookUnitTests(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Build a small opening book for a board of side-length 2.
+        """
+        handle, self.path = tempfile.mkstemp(suffix='.book')
+        os.close(handle)
+        self.count = build_opening_book(2, 2, 3, self.path)
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self) -> None:
+        """
+        Remove the opening book.
+        """
+        self.book.close()
+        os.remove(self.path)
+
+    def test_board_symmetries(self):
+        """
+        Test that the larger boards have the 6 symmetries of a triangle,
+        and that equivalent positions share a canonical form.
+        """
+        with patch('builtins.input', return_value='4'):
+            game = StonehengeGame(True)
+        self.assertEqual(len(board_symmetries(4)), 6,
+                         "A board of side-length 4 should have 6 symmetries.")
+
+        corner_a = game.current_state.make_move('A')
+        corner_b = game.current_state.make_move('B')
+        self.assertEqual(canonical_state(corner_a)[0],
+                         canonical_state(corner_b)[0],
+                         "Claiming A or B are mirror images, so they should " +
+                         "have the same canonical state.")
+
+    def test_lookup(self):
+        """
+        Test that every position of the first 2 plies is in the book, with
+        a move that is valid on the position's own board.
+        """
+        self.assertEqual(len(self.book), self.count,
+                         "The book should hold every position written.")
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(False)
+        for move in game.current_state.get_possible_moves():
+            state = game.current_state.make_move(move)
+            entry = self.book.lookup(state)
+            self.assertIsNotNone(entry,
+                                 ("The position after {} should be in the " +
+                                  "book.").format(move))
+            self.assertTrue(state.is_valid_move(entry[0]),
+                            "The book move {} should be valid after {}."
+                            .format(entry[0], move))
+
+    def test_with_opening_book(self):
+        """
+        Test that a strategy with a book plays the book move while the game
+        is in the book, and falls back to the strategy afterwards.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        strategy = with_opening_book(lambda g: 'fallback', self.book)
+
+        book_move = self.book.lookup(game.current_state)[0]
+        self.assertEqual(strategy(game), book_move,
+                         "The book move should be played from the start.")
+        for move in ['A', 'G', 'C']:
+            game.current_state = game.current_state.make_move(move)
+        self.assertEqual(strategy(game), 'fallback',
+                         "The strategy should be used after the book ends.")
+
+
+if __name__ == "__main__":
+    unittest.main()
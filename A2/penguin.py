@@ -15,7 +15,8 @@ even one line of Penguin's minimax code.
 Please report any issue to will.qie@mail.utoronto.ca so we can improve out code
 together.
 
-TODO: Put the *_results and this file in the same directory as your code
+TODO: Put the *_results.json files and this file in the same directory as
+your code. To change the positions tested, regenerate them with fixtures.py.
 Note that The tests finishes in 48s on a i7 computer.
 """
 import unittest
@@ -26,6 +27,7 @@ from unittest.mock import patch
 
 
 from game_interface import playable_games, usable_strategies
+from fixtures import load_fixtures
 minimax_iterative_strategy = usable_strategies['mi']
 minimax_recursive_strategy = usable_strategies['mr']
 rough_outcome_strategy = usable_strategies['ro']
@@ -45,17 +47,11 @@ STONEHENGE_MINIMAX_BOARD = """\
        \\   \\   \\
         2   2   1
 """
-results_file = open('my_results', 'r')
-my_results = eval(results_file.read())
-results_file.close()
-
-results_file = open('new_results', 'r')
-new_results = eval(results_file.read())
-results_file.close()
-
-results_file = open('newer_results', 'r')
-newer_results = eval(results_file.read())
-results_file.close()
+# Scores of every move of each position, solved once by fixtures.py. Every
+# position is decisive, so only a best-scoring move passes
+my_results = load_fixtures('my_results.json')
+new_results = load_fixtures('new_results.json')
+newer_results = load_fixtures('newer_results.json')
 
 
 class MinimaxUnitTests(unittest.TestCase):
@@ -90,8 +86,8 @@ class MinimaxUnitTests(unittest.TestCase):
                 game = SubtractSquareGame(True)
 
             move_scores = minimax_iterative_strategy(game)
-            expected = my_results[value]
-            self.assertTrue(move_scores in expected)
+            scores = my_results[value]
+            self.assertEqual(scores[move_scores], max(scores.values()))
             # except AssertionError:
             #     print(f"""There maybe some problem with your
             #                      iterative minimax. When pass in value
@@ -106,8 +102,8 @@ class MinimaxUnitTests(unittest.TestCase):
             with patch('builtins.input', return_value=str(value)):
                 game = SubtractSquareGame(True)
             move_scores = minimax_recursive_strategy(game)
-            expected = my_results[value]
-            self.assertTrue(move_scores in expected)
+            scores = my_results[value]
+            self.assertEqual(scores[move_scores], max(scores.values()))
             # except AssertionError:
             #     print(f"""There maybe some problem with your
             #                      recursive minimax. When pass in value
@@ -118,17 +114,18 @@ class MinimaxUnitTests(unittest.TestCase):
         """
         Too lazy to write one.
         """
-        for value in new_results:
+        for moves in new_results:
 
             with patch('builtins.input', return_value='2'):
                 game = StonehengeGame(True)
-            game.current_state = game.current_state.make_move(
-                game.str_to_move(value))
-            expected_move = new_results[value]
+            for value in moves:
+                game.current_state = game.current_state.make_move(
+                    game.str_to_move(value))
+            scores = new_results[moves]
             move_chosen = minimax_recursive_strategy(game)
             new_move = minimax_iterative_strategy(game)
-            self.assertTrue(move_chosen in expected_move)
-            self.assertTrue(move_chosen in expected_move)
+            self.assertEqual(scores[move_chosen], max(scores.values()))
+            self.assertEqual(scores[new_move], max(scores.values()))
             # except AssertionError:
             #     print(f'Failure of tests {value}')
 
@@ -142,11 +139,11 @@ class MinimaxUnitTests(unittest.TestCase):
             for move in move_to_make:
                 game.current_state = game.current_state.make_move(
                     game.str_to_move(move))
-            expected_move = newer_results[move_to_make]
+            scores = newer_results[move_to_make]
             move_chosen = minimax_recursive_strategy(game)
             new_move = minimax_iterative_strategy(game)
-            self.assertTrue(new_move in expected_move)
-            self.assertTrue(move_chosen in expected_move)
+            self.assertEqual(scores[new_move], max(scores.values()))
+            self.assertEqual(scores[move_chosen], max(scores.values()))
             # except AssertionError:
             #     print(f'Failure of tests {move_to_make}')
 
@@ -0,0 +1,157 @@
+"""
+Perft: counting the positions reachable in a number of moves.
+
+perft walks every sequence of moves from a position with
+get_possible_moves and make_move, and counts the leaves (positions reached
+after exactly depth moves) and the terminal positions (positions within
+depth moves where the game is over, which are not searched further). The
+counts depend only on the rules, so they check a rules engine against
+REFERENCE_COUNTS, and the time taken measures its speed.
+
+With workers, the count is split between processes at the root. Run
+
+    python perft.py GAME SETTING DEPTH [--workers N]
+    python perft.py --verify
+
+to count from the start of a game (h or s) with a side-length or starting
+total, or to check every reference count.
+"""
+from typing import Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import time
+from headless import make_game
+
+# (leaves, terminals) from the start of each game, with p1 moving first,
+# for depths 1, 2, ...; keyed by (game key, setting). Leaves include the
+# positions after exactly depth moves where the game is over. The counts
+# were checked against the original rules in fuzz.reference_states.
+REFERENCE_COUNTS = {
+    ('h', 1): [(3, 0), (0, 3), (0, 3)],
+    ('h', 2): [(7, 0), (42, 0), (210, 0), (768, 18), (2268, 30),
+               (2256, 1170), (1440, 1986)],
+    ('h', 3): [(12, 0), (132, 0), (1320, 0), (11880, 0), (95040, 0)],
+    ('h', 4): [(18, 0), (306, 0), (4896, 0), (73440, 0)],
+    ('h', 5): [(25, 0), (600, 0), (13800, 0)],
+    ('s', 10): [(3, 0), (6, 0), (7, 2), (11, 2), (6, 8), (7, 8)],
+    ('s', 100): [(10, 0), (69, 1), (410, 3), (2177, 3)],
+}
+
+
+def perft(game: Any, state: Any, depth: int) -> Tuple[int, int, int]:
+    """
+    Return (leaves, terminals, nodes) for the positions reached from state
+    in game in up to depth moves: the positions after exactly depth moves,
+    the positions where the game is over after fewer moves, and every
+    position visited, including state.
+    """
+    if depth == 0:
+        return 1, 0, 1
+    if game.is_over(state):
+        return 0, 1, 1
+    leaves = terminals = 0
+    nodes = 1
+    for move in state.get_possible_moves():
+        child = state.make_move(move)
+        if depth == 1:
+            leaves += 1
+            nodes += 1
+            continue
+        counts = perft(game, child, depth - 1)
+        leaves += counts[0]
+        terminals += counts[1]
+        nodes += counts[2]
+    return leaves, terminals, nodes
+
+
+def _perft_child(game: Any, move: Any, depth: int) -> Tuple[int, int, int]:
+    """
+    Return perft of the position after move in game, to depth.
+    """
+    return perft(game, game.current_state.make_move(move), depth)
+
+
+def parallel_perft(game: Any, depth: int,
+                   workers: int = None) -> Tuple[int, int, int]:
+    """
+    Return perft of game's current state to depth, with the subtree of
+    each root move counted by one of workers processes.
+    """
+    state = game.current_state
+    if depth <= 1 or game.is_over(state):
+        return perft(game, state, depth)
+    leaves = terminals = 0
+    nodes = 1
+    with ProcessPoolExecutor(workers) as pool:
+        for counts in pool.map(_perft_child, *zip(*[
+                (game, move, depth - 1)
+                for move in state.get_possible_moves()])):
+            leaves += counts[0]
+            terminals += counts[1]
+            nodes += counts[2]
+    return leaves, terminals, nodes
+
+
+def run_perft(game_key: str, setting: int, depth: int,
+              workers: int = 0) -> dict:
+    """
+    Return the counts of perft from the start of a game to depth (split
+    between workers processes if workers is not 0), the nodes per second,
+    and whether the counts match REFERENCE_COUNTS if it has them.
+    """
+    game = make_game(game_key, True, setting)
+    start = time.perf_counter()
+    if workers:
+        leaves, terminals, nodes = parallel_perft(game, depth, workers)
+    else:
+        leaves, terminals, nodes = perft(game, game.current_state, depth)
+    elapsed = time.perf_counter() - start
+    reference = REFERENCE_COUNTS.get((game_key, setting), [])
+    return {'leaves': leaves, 'terminals': terminals, 'nodes': nodes,
+            'seconds': elapsed, 'nodes_per_second': nodes / elapsed,
+            'matches': (leaves, terminals) == reference[depth - 1]
+                       if depth <= len(reference) else None}
+
+
+def verify() -> bool:
+    """
+    Print a line for every reference count and return whether they all
+    match.
+    """
+    passed = True
+    for (game_key, setting), counts in sorted(REFERENCE_COUNTS.items()):
+        for depth in range(1, len(counts) + 1):
+            result = run_perft(game_key, setting, depth)
+            passed = passed and result['matches']
+            print('{} {} depth {}: {} leaves, {} terminals, {:.0f} nodes/s '
+                  '{}'.format(game_key, setting, depth, result['leaves'],
+                              result['terminals'],
+                              result['nodes_per_second'],
+                              'ok' if result['matches'] else 'MISMATCH'))
+    return passed
+
+
+def main() -> None:
+    """
+    Run perft or verify the reference counts, as given on the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('game', nargs='?', choices=['s', 'h'])
+    parser.add_argument('setting', nargs='?', type=int)
+    parser.add_argument('depth', nargs='?', type=int)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--verify', action='store_true')
+    args = parser.parse_args()
+    if args.verify:
+        print('all ok' if verify() else 'MISMATCHES FOUND')
+    else:
+        print(run_perft(args.game, args.setting, args.depth, args.workers))
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        main()
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,34 @@
+"""
+A subset of unittests used for testing perft.
+"""
+import unittest
+
+from perft import REFERENCE_COUNTS, parallel_perft, perft, run_perft
+from headless import make_game
+
+
+class PerftUnitTests(unittest.TestCase):
+    def test_reference_counts(self):
+        """
+        Test that the counts from the smaller boards and totals match the
+        reference counts.
+        """
+        for key in [('h', 1), ('h', 2), ('s', 10), ('s', 100)]:
+            for depth in range(1, len(REFERENCE_COUNTS[key]) + 1):
+                result = run_perft(key[0], key[1], depth)
+                self.assertTrue(result['matches'],
+                                "{} to depth {} counted {}.".format(
+                                    key, depth, result))
+
+    def test_parallel_matches_serial(self):
+        """
+        Test that splitting the count between processes gives the same
+        counts.
+        """
+        game = make_game('h', True, 2)
+        self.assertEqual(parallel_perft(game, 5, 2),
+                         perft(game, game.current_state, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Pondering: searching during the opponent's turn.
+
+While the opponent of an engine decides on a move (for a person at
+interactive_strategy, while input() waits), a Ponderer solves the positions
+the opponent's likely replies lead to in a background thread, in the
+engine's own table. When the opponent moves, the thread is stopped. If the
+position reached was solved in time the engine's move is known at once: a
+hit, which saves the time the thread spent solving it.
+
+Replies are pondered in order of how good they look for the opponent, by
+the rough_outcome of the position they lead to.
+"""
+from typing import Any
+import copy
+import threading
+import time
+from engine import Engine
+from strategy import SearchControl, SearchStopped, cached_rough_outcome
+
+
+class Ponderer:
+    """
+    Ponders for an engine during its opponent's turns.
+
+    engine - the Engine whose table the positions are solved in
+    ponders - the number of opponent turns pondered
+    hits - the number of those turns whose reply had been solved
+    saved - the seconds spent solving the replies that were hits
+    """
+    engine: Engine
+    ponders: int
+    hits: int
+    saved: float
+
+    def __init__(self, engine: Engine) -> None:
+        """
+        Initialize a Ponderer for engine.
+        """
+        self.engine = engine
+        self.ponders = 0
+        self.hits = 0
+        self.saved = 0.0
+        self._thread = None
+        self._control = None
+        # The seconds taken to solve each reply position so far
+        self._solved = {}
+
+    def start(self, game: Any) -> None:
+        """
+        Start pondering the replies to game's current state, which the
+        opponent is to move from.
+        """
+        self.stop()
+        self._control = SearchControl()
+        self._solved = {}
+        self._thread = threading.Thread(
+            target=self._ponder, args=(copy.copy(game), game.current_state,
+                                       self._control, self._solved),
+            daemon=True)
+        self._thread.start()
+
+    def _ponder(self, game: Any, state: Any, control: SearchControl,
+                solved: dict) -> None:
+        """
+        Solve the position after each reply to state, most likely first,
+        recording the time each took in solved, until control says to stop.
+        """
+        children = [state.make_move(move)
+                    for move in state.get_possible_moves()]
+        children.sort(key=cached_rough_outcome)
+        for child in children:
+            if game.is_over(child):
+                continue
+            start = time.perf_counter()
+            try:
+                game.current_state = child
+                self.engine.best_move(game, control)
+            except SearchStopped:
+                return
+            if control.should_stop():
+                # best_move gives up quietly when stopped
+                return
+            solved[child] = time.perf_counter() - start
+
+    def wait(self, timeout: float = None) -> None:
+        """
+        Wait until every reply has been pondered, or for at most timeout
+        seconds.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stop(self, state: Any = None) -> bool:
+        """
+        Stop pondering, and return whether state, the position the
+        opponent's move led to, had been solved. Without a state, pondering
+        is stopped without counting a turn.
+        """
+        if self._thread is None:
+            return False
+        self._control.stop()
+        self._thread.join()
+        self._thread = None
+        if state is None:
+            return False
+        self.ponders += 1
+        if state in self._solved:
+            self.hits += 1
+            self.saved += self._solved[state]
+            return True
+        return False
+
+    def stats(self) -> dict:
+        """
+        Return the turns pondered, the hits, the hit rate and the seconds
+        saved.
+        """
+        return {'ponders': self.ponders, 'hits': self.hits,
+                'hit_rate': self.hits / self.ponders if self.ponders else 0.0,
+                'saved': self.saved}
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,63 @@
+"""
+A subset of unittests used for testing pondering.
+"""
+import unittest
+from unittest.mock import patch
+
+from engine import Engine, make_engine_strategy
+from game_interface import GameInterface, playable_games
+from headless import make_game
+from pondering import Ponderer
+from strategy import interactive_strategy
+
+
+class PonderingUnitTests(unittest.TestCase):
+    def test_reply_solved(self):
+        """
+        Test that a reply pondered to the end is a hit, and that the engine
+        then answers it without searching.
+        """
+        engine = Engine()
+        ponderer = Ponderer(engine)
+        game = make_game('h', True, 2)
+        ponderer.start(game)
+        ponderer.wait(30)
+        reply = game.current_state.make_move('A')
+        self.assertTrue(ponderer.stop(reply))
+        self.assertEqual(ponderer.stats()['hits'], 1)
+        nodes = engine.nodes
+        game.current_state = reply
+        engine.best_move(game)
+        self.assertEqual(engine.nodes, nodes)
+
+    def test_miss(self):
+        """
+        Test that a position that was not a pondered reply is a miss.
+        """
+        ponderer = Ponderer(Engine())
+        self.assertFalse(ponderer.stop(make_game('s', True, 5).current_state))
+        game = make_game('s', True, 20)
+        ponderer.start(game)
+        self.assertFalse(ponderer.stop(make_game('s', True, 3).current_state))
+        self.assertEqual(ponderer.stats(), {'ponders': 1, 'hits': 0,
+                                            'hit_rate': 0.0, 'saved': 0.0})
+
+    def test_game_interface_pondering(self):
+        """
+        Test that GameInterface ponders for an engine playing against
+        interactive_strategy, and reports it.
+        """
+        # The person tries every cell in turn until one is free
+        answers = ['y', '2'] + list('ABCDEFG') * 4
+        with patch('builtins.input', side_effect=answers), \
+                patch('builtins.print') as printed:
+            interface = GameInterface(playable_games['h'],
+                                      interactive_strategy,
+                                      make_engine_strategy(), ponder=True)
+            interface.play()
+        self.assertGreater(interface.ponderers['p2'].stats()['ponders'], 0)
+        self.assertIn('pondered', printed.call_args_list[-1][0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
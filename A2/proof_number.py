@@ -0,0 +1,193 @@
+"""
+A proof-number solver for win/loss questions.
+
+recursive_minimax searches every move of every position to find out who
+wins. Depth-first proof-number search (df-pn) instead keeps, for every
+position it has searched, a proof number (roughly how many positions still
+have to be solved to prove the player to move wins) and a disproof number
+(the same for proving they lose), and always works on the position that is
+cheapest to settle. A forced win is usually proven after searching a small
+part of the tree.
+
+ProofNumberSearch answers whether a position is a PROVEN_WIN or a
+PROVEN_LOSS for the player to move, or UNKNOWN if its node or memory limit is
+reached first, with the principal move of the proof. proof_number_strategy
+plays that move.
+"""
+from typing import Any, List, Tuple
+from strategy import SearchStopped
+
+PROVEN_WIN = 'win'
+PROVEN_LOSS = 'loss'
+UNKNOWN = 'unknown'
+# Proof and disproof numbers of solved positions; sums are capped here
+INFINITY = 1 << 30
+# A child is searched until its disproof number passes EPSILON times the
+# second smallest, which saves switching back and forth between children
+EPSILON = 1.5
+
+
+class ProofNumberSearch:
+    """
+    A df-pn solver for the positions of one game.
+
+    game - the game whose positions are solved
+    max_nodes - the number of positions expanded before giving up
+    max_entries - the number of positions table may hold
+    table - maps each searched state to its (proof, disproof) numbers for
+    the player to move
+    nodes - the number of positions expanded
+    """
+    game: Any
+    max_nodes: int
+    max_entries: int
+    table: dict
+    nodes: int
+
+    def __init__(self, game: Any, max_nodes: int = 1000000,
+                 max_entries: int = 1000000) -> None:
+        """
+        Initialize a ProofNumberSearch of game's positions that expands at
+        most max_nodes positions and keeps at most max_entries of them.
+        """
+        self.game = game
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.table = {}
+        self.nodes = 0
+
+    def solve(self, state: Any = None) -> Tuple[str, Any]:
+        """
+        Return whether state (the game's current state if None) is a
+        PROVEN_WIN, a PROVEN_LOSS or UNKNOWN for the player to move, and the
+        principal move: a winning move, the first move of a lost position,
+        or the most promising move of an unknown one (None if the game is
+        over).
+
+        The node count and table are kept between calls, so the limits
+        apply to all the calls together.
+        """
+        state = self.game.current_state if state is None else state
+        try:
+            self._search(state, INFINITY, INFINITY)
+        except SearchStopped:
+            pass
+        proof, disproof = self.numbers(state)
+        moves = state.get_possible_moves()
+        if not moves:
+            return PROVEN_LOSS, None
+        children = [self.numbers(state.make_move(move)) for move in moves]
+        best = min(range(len(moves)), key=lambda i: children[i][1])
+        if proof == 0:
+            return PROVEN_WIN, moves[best]
+        if disproof == 0:
+            return PROVEN_LOSS, moves[0]
+        return UNKNOWN, moves[best]
+
+    def numbers(self, state: Any) -> Tuple[int, int]:
+        """
+        Return the (proof, disproof) numbers of state: (INFINITY, 0) if the
+        game is over, since the player to move has lost. A position not yet
+        searched gets a proof number of 1 and a disproof number of its
+        number of moves, since every move must be refuted to disprove it.
+        """
+        known = self.table.get(state)
+        if known is not None:
+            return known
+        if self.game.is_over(state):
+            if len(self.table) < self.max_entries:
+                self.table[state] = (INFINITY, 0)
+            return INFINITY, 0
+        return 1, len(state.get_move_set())
+
+    def _search(self, state: Any, proof_limit: int,
+                disproof_limit: int) -> None:
+        """
+        Search state until its proof number reaches proof_limit or its
+        disproof number reaches disproof_limit.
+
+        The player to move wins if any move leaves the opponent lost, so
+        the proof number of state is the smallest disproof number of its
+        children and its disproof number is the sum of their proof numbers.
+        """
+        if self.game.is_over(state):
+            self._store(state, INFINITY, 0)
+            return
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SearchStopped
+        children = [state.make_move(move)
+                    for move in state.iter_possible_moves()]
+        while True:
+            proof, disproof, best, second = self._summary(children)
+            if proof >= proof_limit or disproof >= disproof_limit:
+                self._store(state, proof, disproof)
+                return
+            child_proof = self.numbers(children[best])[0]
+            self._search(children[best],
+                         min(INFINITY,
+                             disproof_limit - disproof + child_proof),
+                         min(proof_limit, int(second * EPSILON) + 1))
+
+    def _summary(self, children: List[Any]) -> Tuple[int, int, int, int]:
+        """
+        Return the proof and disproof numbers of the position with children,
+        the index of the child with the smallest disproof number and the
+        second smallest disproof number.
+        """
+        proof = second = INFINITY
+        disproof = 0
+        best = 0
+        for i, child in enumerate(children):
+            child_proof, child_disproof = self.numbers(child)
+            disproof = min(INFINITY, disproof + child_proof)
+            if child_disproof < proof:
+                proof, second, best = child_disproof, proof, i
+            elif child_disproof < second:
+                second = child_disproof
+        return proof, disproof, best, second
+
+    def _store(self, state: Any, proof: int, disproof: int) -> None:
+        """
+        Record the numbers of state, stopping the search if the table is
+        full.
+        """
+        if state not in self.table and len(self.table) >= self.max_entries:
+            raise SearchStopped
+        self.table[state] = (proof, disproof)
+
+
+def prove(game: Any, max_nodes: int = 1000000,
+          max_entries: int = 1000000) -> Tuple[str, Any]:
+    """
+    Return whether game's current state is a PROVEN_WIN, a PROVEN_LOSS or
+    UNKNOWN for the player to move, and the principal move of the proof.
+    """
+    return ProofNumberSearch(game, max_nodes, max_entries).solve()
+
+
+def proof_number_strategy(game: Any) -> Any:
+    """
+    Return the principal move of a proof-number search of game with the
+    default limits.
+    """
+    return prove(game)[1]
+
+
+def make_proof_number_strategy(max_nodes: int = 1000000,
+                               max_entries: int = 1000000) -> Any:
+    """
+    Return a strategy that plays the principal move of a proof-number search
+    with the given limits.
+    """
+    def limited_proof_number_strategy(game: Any) -> Any:
+        """
+        Return the principal move of a proof-number search of game.
+        """
+        return prove(game, max_nodes, max_entries)[1]
+    return limited_proof_number_strategy
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,64 @@
+"""
+A subset of unittests used for testing the proof-number solver.
+"""
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games, usable_strategies
+from engine import Engine
+from proof_number import ProofNumberSearch, PROVEN_LOSS, PROVEN_WIN, \
+    UNKNOWN, prove
+StonehengeGame = playable_games['h']
+SubtractSquareGame = playable_games['s']
+
+
+class ProofNumberUnitTests(unittest.TestCase):
+    def test_agrees_with_engine(self):
+        """
+        Test that the solver proves the same outcome as an exact search, and
+        that its principal move of a win wins.
+        """
+        engine = Engine()
+        for total in range(1, 40):
+            with patch('builtins.input', return_value=str(total)):
+                game = SubtractSquareGame(True)
+            state = game.current_state
+            result, move = prove(game)
+            if engine.value(game, state) == state.WIN:
+                self.assertEqual(result, PROVEN_WIN,
+                                 "{} is a win.".format(total))
+                self.assertEqual(engine.value(game, state.make_move(move)),
+                                 state.LOSE,
+                                 "Taking {} from {} should win."
+                                 .format(move, total))
+            else:
+                self.assertEqual(result, PROVEN_LOSS,
+                                 "{} is a loss.".format(total))
+
+    def test_stonehenge_and_strategy(self):
+        """
+        Test that the start of side-length 3 is proven a win, and that the
+        strategy plays the principal move.
+        """
+        with patch('builtins.input', return_value='3'):
+            game = StonehengeGame(True)
+        search = ProofNumberSearch(game)
+        result, move = search.solve()
+        self.assertEqual(result, PROVEN_WIN)
+        self.assertEqual(usable_strategies['pn'](game), move)
+
+    def test_limits(self):
+        """
+        Test that the solver answers UNKNOWN, with a valid move, when it runs
+        out of nodes or of table entries.
+        """
+        with patch('builtins.input', return_value='4'):
+            game = StonehengeGame(True)
+        for nodes, entries in [(100, 1000000), (1000000, 100)]:
+            result, move = prove(game, nodes, entries)
+            self.assertEqual(result, UNKNOWN)
+            self.assertTrue(game.current_state.is_valid_move(move))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,320 @@
+"""
+A local asyncio server for playing many games at once.
+
+Clients connect over TCP or a Unix socket and send one command per line;
+every command gets a one-line reply that starts with OK or ERR:
+
+    NEW <game> <first> <setting>  start a game of playable_games[game], where
+                                  first is p1 or p2 and setting is the
+                                  side-length, starting total or heap
+                                  sizes separated by commas
+                                  -> OK <game id>
+    STATE <id>                    -> OK <player to move> <moves, comma
+                                     separated> or OK OVER <winner>
+    MOVE <id> <move>              make a move -> the new STATE reply
+    ENGINE <id> [<seconds>]       ask the engine for a move, without making
+                                  it -> OK <move>
+    END <id>                      forget a game -> OK
+    STATS                         -> OK <engine, server and cache counters>
+
+Engine searches run in a pool of worker threads. All of them share one
+Engine, so a position solved for one game is known to every other game.
+
+run_load is a load generator: it plays engine-against-engine games through a
+server and reports throughput and latency percentiles. Run
+
+    python server.py serve [--port PORT | --unix PATH]
+    python server.py load [--port PORT | --unix PATH] [--clients N] ...
+"""
+from typing import Any, List
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import copy
+import itertools
+import json
+import time
+from engine import Engine
+from headless import make_game, read_setting, winner
+from strategy import SearchControl, memo_stats
+
+
+class GameServer:
+    """
+    The games of every session of the server and the engine they share.
+
+    engine - the Engine used for every ENGINE command
+    games - maps each game id to its game
+    move_timeout - the default number of seconds an ENGINE command may take
+    """
+    engine: Engine
+    games: dict
+    move_timeout: float
+
+    def __init__(self, engine: Engine = None, workers: int = 4,
+                 move_timeout: float = 1.0) -> None:
+        """
+        Initialize a GameServer that searches with engine (a new Engine if
+        None) in a pool of workers threads.
+        """
+        self.engine = Engine() if engine is None else engine
+        self.games = {}
+        self.move_timeout = move_timeout
+        self._pool = ThreadPoolExecutor(workers)
+        self._ids = itertools.count(1)
+        self._requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """
+        Answer the commands of one client connection until it closes.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.execute(line.decode().split())
+                writer.write((reply + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def execute(self, words: List[str]) -> str:
+        """
+        Return the reply to the command words.
+        """
+        self._requests += 1
+        commands = {'NEW': self.new_game, 'STATE': self.describe,
+                    'MOVE': self.move, 'ENGINE': self.engine_move,
+                    'END': self.end_game, 'STATS': self.stats}
+        if not words or words[0].upper() not in commands:
+            return 'ERR unknown command'
+        try:
+            return await commands[words[0].upper()](*words[1:])
+        except (TypeError, ValueError, KeyError) as error:
+            return 'ERR {}'.format(str(error) or 'bad arguments')
+
+    async def new_game(self, game_key: str, first: str,
+                       setting: str) -> str:
+        """
+        Start a new game and return its id.
+
+        Raise ValueError if first or setting is not one the game can start
+        with.
+        """
+        if first not in ['p1', 'p2']:
+            raise ValueError('first player must be p1 or p2')
+        setting = read_setting(game_key, setting)
+        game_id = str(next(self._ids))
+        self.games[game_id] = make_game(game_key, first == 'p1', setting)
+        return 'OK {}'.format(game_id)
+
+    async def describe(self, game_id: str) -> str:
+        """
+        Return the player to move and the possible moves of a game, or its
+        winner if it is over.
+        """
+        game = self.games[game_id]
+        state = game.current_state
+        if game.is_over(state):
+            return 'OK OVER {}'.format(winner(game))
+        return 'OK {} {}'.format(state.get_current_player_name(),
+                                 ','.join(str(move) for move in
+                                          state.iter_possible_moves()))
+
+    async def move(self, game_id: str, move: str) -> str:
+        """
+        Make move in a game and return its new state.
+        """
+        game = self.games[game_id]
+        move = game.str_to_move(move)
+        if game.is_over(game.current_state) or \
+                not game.current_state.is_valid_move(move):
+            raise ValueError('invalid move')
+        game.current_state = game.current_state.make_move(move)
+        return await self.describe(game_id)
+
+    async def engine_move(self, game_id: str, seconds: str = None) -> str:
+        """
+        Return the engine's move for a game, searching for at most seconds
+        (or move_timeout) seconds, or an error reply if the search fails
+        (as a RecursionError does on very large SubtractSquare totals).
+        """
+        game = self.games[game_id]
+        if game.is_over(game.current_state):
+            raise ValueError('game is over')
+        timeout = self.move_timeout if seconds is None else float(seconds)
+        control = SearchControl(time.monotonic() + timeout)
+        loop = asyncio.get_running_loop()
+        search = loop.run_in_executor(self._pool, self.engine.best_move,
+                                      copy.copy(game), control)
+        try:
+            move = await asyncio.wait_for(asyncio.shield(search),
+                                          timeout + 0.5)
+        except asyncio.TimeoutError:
+            control.stop()
+            move = control.best_move
+        except Exception as error:  # the client gets a reply in any case
+            return 'ERR search failed: {}'.format(
+                str(error) or type(error).__name__)
+        return 'OK {}'.format(move)
+
+    async def end_game(self, game_id: str) -> str:
+        """
+        Forget a game.
+        """
+        del self.games[game_id]
+        return 'OK'
+
+    async def stats(self) -> str:
+        """
+        Return the engine's counters, the server's and those of the shared
+        caches of strategy.memo_stats as JSON.
+        """
+        counters = self.engine.stats()
+        counters.update({'games': len(self.games),
+                         'requests': self._requests})
+        counters.update(memo_stats())
+        return 'OK {}'.format(json.dumps(counters))
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 7777,
+                    path: str = None) -> asyncio.AbstractServer:
+        """
+        Return a started asyncio server for this GameServer, listening on
+        the Unix socket path if it is given and on host:port otherwise.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path=path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self) -> None:
+        """
+        Shut down the worker pool.
+        """
+        self._pool.shutdown(wait=False)
+
+
+async def connect(host: str = '127.0.0.1', port: int = 7777,
+                  path: str = None) -> tuple:
+    """
+    Return (reader, writer) for a connection to a server.
+    """
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+async def request(reader: asyncio.StreamReader,
+                  writer: asyncio.StreamWriter, command: str,
+                  latencies: List[float]) -> str:
+    """
+    Send command, append its round-trip time to latencies and return the
+    reply without its OK. Raise ValueError on an ERR reply.
+    """
+    start = time.perf_counter()
+    writer.write((command + '\n').encode())
+    await writer.drain()
+    reply = (await reader.readline()).decode().strip()
+    latencies.append(time.perf_counter() - start)
+    if not reply.startswith('OK'):
+        raise ValueError('{} -> {}'.format(command, reply))
+    return reply[3:]
+
+
+async def play_client(games: int, game_key: str, setting: int,
+                      latencies: List[float], **address: Any) -> int:
+    """
+    Play games engine-against-engine games through a server over one
+    connection, and return the number of moves made.
+    """
+    reader, writer = await connect(**address)
+    moves = 0
+    for number in range(games):
+        first = 'p1' if number % 2 == 0 else 'p2'
+        game_id = await request(reader, writer, 'NEW {} {} {}'.format(
+            game_key, first, setting), latencies)
+        state = await request(reader, writer, 'STATE ' + game_id, latencies)
+        while not state.startswith('OVER'):
+            move = await request(reader, writer, 'ENGINE ' + game_id,
+                                 latencies)
+            state = await request(reader, writer, 'MOVE {} {}'.format(
+                game_id, move), latencies)
+            moves += 1
+        await request(reader, writer, 'END ' + game_id, latencies)
+    writer.close()
+    return moves
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return the value below which fraction of the sorted values lie.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_load(clients: int = 10, games: int = 5, game_key: str = 'h',
+                   setting: int = 2, **address: Any) -> dict:
+    """
+    Play games games on each of clients concurrent connections to a server
+    and return the throughput and latency of its requests.
+    """
+    latencies = []
+    start = time.perf_counter()
+    moves = await asyncio.gather(*[
+        play_client(games, game_key, setting, latencies, **address)
+        for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {'games': clients * games, 'moves': sum(moves),
+            'requests': len(latencies), 'seconds': elapsed,
+            'requests_per_second': len(latencies) / elapsed,
+            'games_per_second': clients * games / elapsed,
+            'latency_ms': {name: percentile(latencies, fraction) * 1000
+                           for name, fraction in [('p50', 0.5), ('p90', 0.9),
+                                                  ('p99', 0.99),
+                                                  ('max', 1.0)]}}
+
+
+def main() -> None:
+    """
+    Serve games or generate load, as given on the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('mode', choices=['serve', 'load'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', dest='path')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--games', type=int, default=5)
+    parser.add_argument('--game', default='h')
+    parser.add_argument('--setting', type=int, default=2)
+    args = parser.parse_args()
+    address = {'host': args.host, 'port': args.port, 'path': args.path}
+
+    async def serve_forever() -> None:
+        """
+        Run a server until interrupted.
+        """
+        server = await GameServer(workers=args.workers).serve(**address)
+        async with server:
+            await server.serve_forever()
+
+    if args.mode == 'serve':
+        asyncio.run(serve_forever())
+    else:
+        print(json.dumps(asyncio.run(run_load(
+            args.clients, args.games, args.game, args.setting, **address)),
+                         indent=2))
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        main()
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,104 @@
+"""
+A subset of unittests used for testing the game server and its engine.
+"""
+import asyncio
+import random
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+from engine import Engine
+from server import GameServer, connect, run_load
+from strategy import recursive_minimax
+StonehengeGame = playable_games['h']
+
+
+class ServerUnitTests(unittest.TestCase):
+    def test_engine_matches_recursive_minimax(self):
+        """
+        Test that the engine chooses the same moves as recursive_minimax,
+        with one table shared between the positions.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        engine = Engine()
+        rng = random.Random(35)
+        for _ in range(10):
+            state = game.current_state
+            while not game.is_over(state):
+                self.assertEqual(engine(game), recursive_minimax(game),
+                                 "The engine and recursive_minimax chose " +
+                                 "different moves for\n{}".format(state))
+                state = state.make_move(rng.choice(
+                    state.get_possible_moves()))
+                game.current_state = state
+            with patch('builtins.input', return_value='2'):
+                game = StonehengeGame(rng.random() < 0.5)
+        self.assertGreater(engine.hits, 0,
+                           "Later searches should reuse the table.")
+
+    def test_protocol_and_load(self):
+        """
+        Test the server's replies to single commands, and that a load of
+        concurrent engine-against-engine games all finish.
+        """
+        async def session():
+            server = GameServer()
+            listener = await server.serve(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await connect(port=port)
+            replies = []
+            for command in ['NEW s p1 10', 'MOVE 1 4', 'MOVE 1 3',
+                            'ENGINE 1', 'STATE 2', 'BOGUS']:
+                writer.write((command + '\n').encode())
+                replies.append((await reader.readline()).decode().strip())
+            writer.close()
+            report = await run_load(clients=4, games=2, setting=2,
+                                    port=port)
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+            return replies, report
+
+        replies, report = asyncio.run(session())
+        self.assertEqual(replies[:2], ['OK 1', 'OK p2 1,4'])
+        for reply in [replies[2], replies[4], replies[5]]:
+            self.assertTrue(reply.startswith('ERR'),
+                            "Expected an error reply, not " + reply)
+        self.assertEqual(replies[3], 'OK 1',
+                         "Both moves from 6 win, so the first, 1, is chosen.")
+        self.assertEqual(report['games'], 8)
+        self.assertGreaterEqual(report['moves'], 8,
+                                "Each game needs at least one move.")
+        self.assertLessEqual(report['latency_ms']['p50'],
+                             report['latency_ms']['p99'])
+
+    def test_error_replies(self):
+        """
+        Test that bad settings and failed searches get an ERR reply, and
+        that the server keeps answering after them.
+        """
+        async def session():
+            server = GameServer()
+            replies = [await server.execute(command.split()) for command in
+                       ['NEW h p1 6', 'NEW h p1 0', 'NEW s p1 -3',
+                        'NEW s p1 3000', 'ENGINE 1 5', 'NEW s p1 0',
+                        'STATE 2', 'NEW m p1 1,2', 'MOVE 3 1,1',
+                        'NEW m p1 1,x']]
+            server.close()
+            return replies
+
+        replies = asyncio.run(session())
+        for reply in replies[:3]:
+            self.assertTrue(reply.startswith('ERR setting'),
+                            "Expected a setting error, not " + reply)
+        self.assertEqual(replies[3], 'OK 1')
+        self.assertTrue(replies[4].startswith('ERR search failed'),
+                        "Expected a failed search, not " + replies[4])
+        self.assertEqual(replies[5:9], ['OK 2', 'OK OVER p2', 'OK 3',
+                                        'OK p2 (0, 1),(1, 1)'])
+        self.assertTrue(replies[9].startswith('ERR heaps'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,288 @@
+"""
+A transposition table in shared memory, for searching with several
+processes.
+
+SharedTable is a fixed-size table of solved positions held in a
+multiprocessing.shared_memory block, so every process of a search reads and
+writes the same entries. A position is found by a 64-bit hash of its code()
+and each entry is two 64-bit words: the hash XORed with the packed data, and
+the packed data (the position's value and the index of its best move). There
+are no locks. Processes may write an entry at the same time, but a torn
+entry no longer XORs back to its hash and is read as a miss, so a reader
+never sees one position's data under another's hash. Two positions with the
+same 64-bit hash are not told apart, which is rare enough to accept.
+
+A SharedTable can be used as the table of an Engine, and can be pickled to
+another process, which attaches to the same memory. parallel_best_move
+splits a search between the root moves in a ProcessPoolExecutor, and
+compare_tables times it with a SharedTable against private tables. Run
+
+    python shared_table.py SIZE WORKERS [PLIES]
+
+to compare on a StoneHenge board of side-length SIZE after PLIES random
+moves.
+"""
+from typing import Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import random
+import struct
+import time
+from engine import Engine
+from game_state import GameState
+
+# An entry: the hash XORed with the data, and the data
+ENTRY = struct.Struct('<QQ')
+# Entries tried from a hash's slot before one is replaced
+PROBES = 4
+MASK64 = (1 << 64) - 1
+
+
+def _mix(x: int) -> int:
+    """
+    Return the 64-bit finalizer of splitmix64 applied to x.
+    """
+    x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & MASK64
+    return x ^ (x >> 31)
+
+
+def hash64(code: int) -> int:
+    """
+    Return an odd 64-bit hash of the non-negative integer code, the same in
+    every process. Codes longer than 64 bits are folded in 64 bits at a time.
+    """
+    h = 0
+    while True:
+        h = _mix(h ^ (code & MASK64))
+        code >>= 64
+        if not code:
+            return h | 1
+
+
+def pack(value: int, move: int) -> int:
+    """
+    Return value (from -128 to 127) and move (an index from -1 for no move
+    to 254) packed into one word.
+    """
+    return (value & 0xff) | ((move + 1) << 8)
+
+
+def unpack(data: int) -> Tuple[int, int]:
+    """
+    Return the (value, move) packed in data.
+    """
+    value = data & 0xff
+    return value - 256 if value > 127 else value, ((data >> 8) & 0xff) - 1
+
+
+class SharedTable:
+    """
+    A fixed-size table of solved positions in shared memory.
+
+    slots - the number of entries, a power of two
+    name - the name of the shared memory block
+    hits - the number of probes in this process that found their position
+    misses - the number of probes in this process that did not
+    stores - the number of entries written by this process
+    """
+    slots: int
+    name: str
+    hits: int
+    misses: int
+    stores: int
+
+    def __init__(self, slots: int = 1 << 20, name: str = None) -> None:
+        """
+        Initialize a SharedTable of at least slots entries in a new shared
+        memory block, or attached to the block called name.
+        """
+        self.slots = 1 << max(slots - 1, 1).bit_length()
+        if name is None:
+            self._memory = shared_memory.SharedMemory(
+                create=True, size=self.slots * ENTRY.size)
+            self._memory.buf[:] = bytes(self.slots * ENTRY.size)
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self.name = self._memory.name
+        self.hits = self.misses = self.stores = 0
+
+    def probe(self, state: GameState) -> Optional[Tuple[int, int]]:
+        """
+        Return the (value, move) stored for state, where move is the index
+        of the best move in state.get_possible_moves() or -1, or None if
+        state is not in the table.
+        """
+        key = hash64(state.code())
+        buffer = self._memory.buf
+        slot = key >> 1
+        for i in range(PROBES):
+            check, data = ENTRY.unpack_from(
+                buffer, ((slot + i) & (self.slots - 1)) * ENTRY.size)
+            if check ^ data == key:
+                self.hits += 1
+                return unpack(data)
+            if not check:
+                break
+        self.misses += 1
+        return None
+
+    def store(self, state: GameState, value: int, move: int = -1) -> None:
+        """
+        Store value and the index move of the best move for state.
+
+        state goes in the first of its PROBES entries that holds it or is
+        empty, and replaces the last one if none does.
+        """
+        key = hash64(state.code())
+        data = pack(value, move)
+        buffer = self._memory.buf
+        slot = key >> 1
+        for i in range(PROBES):
+            offset = ((slot + i) & (self.slots - 1)) * ENTRY.size
+            check, old = ENTRY.unpack_from(buffer, offset)
+            if not check or check ^ old == key:
+                break
+        ENTRY.pack_into(buffer, offset, key ^ data, data)
+        self.stores += 1
+
+    def get(self, state: GameState, default: Any = None) -> Any:
+        """
+        Return the value stored for state, or default if there is none, as
+        dict.get does.
+        """
+        entry = self.probe(state)
+        return default if entry is None else entry[0]
+
+    def __setitem__(self, state: GameState, value: int) -> None:
+        """
+        Store value for state with no best move.
+        """
+        self.store(state, value)
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in use.
+        """
+        words = self._memory.buf.cast('Q')
+        count = self.slots - words[::2].tolist().count(0)
+        words.release()
+        return count
+
+    def __getstate__(self) -> dict:
+        """
+        Return what another process needs to attach to this table.
+        """
+        return {'slots': self.slots, 'name': self.name}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Attach to the table described by state.
+        """
+        self.__init__(state['slots'], state['name'])
+
+    def close(self) -> None:
+        """
+        Detach from the shared memory, and free it if this table created it.
+        """
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+# The Engine of a search worker process, set by _start_worker
+_ENGINE = None
+
+
+def _start_worker(table: Any) -> None:
+    """
+    Give this worker process an Engine using table, or a private table if
+    table is None.
+    """
+    global _ENGINE
+    _ENGINE = Engine(table)
+
+
+def _solve_child(game: Any, move: Any) -> Tuple[int, int, dict]:
+    """
+    Return the value of the state after move in game, for the player to
+    move there, with this worker's process id and engine counters.
+    """
+    value = _ENGINE.value(game, game.current_state.make_move(move))
+    return value, os.getpid(), {'nodes': _ENGINE.nodes,
+                                'hits': _ENGINE.hits}
+
+
+def parallel_best_move(game: Any, workers: int = None,
+                       table: SharedTable = None) -> Tuple[Any, dict]:
+    """
+    Return the most optimal move for game, and the numbers of nodes searched
+    and table hits summed over the workers.
+
+    Each root move is solved by one of workers processes. The workers share
+    table if it is given and otherwise each keeps a private table. The move
+    is the one recursive_minimax chooses: the first that wins, or the first
+    move if none does.
+    """
+    state = game.current_state
+    moves = state.get_possible_moves()
+    if not moves:
+        return None, {'nodes': 0, 'hits': 0}
+    with ProcessPoolExecutor(workers, initializer=_start_worker,
+                             initargs=(table,)) as pool:
+        results = [pool.submit(_solve_child, game, move).result
+                   for move in moves]
+        results = [result() for result in results]
+    # Each worker's counters keep growing, so its last ones are its totals
+    last = {pid: counters for _, pid, counters in results}
+    totals = {name: sum(counters[name] for counters in last.values())
+              for name in ['nodes', 'hits']}
+    values = [value for value, _, _ in results]
+    best = next((i for i, value in enumerate(values)
+                 if value == state.LOSE), None)
+    if table is not None:
+        table.store(state, state.LOSE if best is None else state.WIN,
+                    0 if best is None else best)
+    return moves[0 if best is None else best], totals
+
+
+def compare_tables(game: Any, workers: int, slots: int = 1 << 22) -> dict:
+    """
+    Return the time taken and nodes searched by parallel_best_move on game
+    with workers processes, with private tables and with one SharedTable,
+    and the speedup of sharing.
+    """
+    start = time.perf_counter()
+    private_move, private_counts = parallel_best_move(game, workers)
+    private = time.perf_counter() - start
+    table = SharedTable(slots)
+    try:
+        start = time.perf_counter()
+        shared_move, shared_counts = parallel_best_move(game, workers, table)
+        shared = time.perf_counter() - start
+        used = len(table)
+    finally:
+        table.close()
+    return {'workers': workers, 'private_seconds': private,
+            'shared_seconds': shared, 'speedup': private / shared,
+            'private_nodes': private_counts['nodes'],
+            'shared_nodes': shared_counts['nodes'], 'entries': used,
+            'same_move': private_move == shared_move}
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) >= 3:
+        from headless import make_game
+        board = make_game('h', True, int(sys.argv[1]))
+        rng = random.Random(0)
+        for _ in range(int(sys.argv[3]) if len(sys.argv) > 3 else 0):
+            board.current_state = board.current_state.make_move(
+                rng.choice(board.current_state.get_possible_moves()))
+        print(compare_tables(board, int(sys.argv[2])))
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,63 @@
+"""
+A subset of unittests used for testing the shared-memory transposition
+table.
+"""
+import pickle
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+from engine import Engine
+from shared_table import SharedTable, parallel_best_move
+StonehengeGame = playable_games['h']
+
+
+class SharedTableUnitTests(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Create a small shared table and a Stonehenge game of side-length 2.
+        """
+        self.table = SharedTable(1 << 12)
+        with patch('builtins.input', return_value='2'):
+            self.game = StonehengeGame(True)
+
+    def tearDown(self) -> None:
+        """
+        Free the shared table.
+        """
+        self.table.close()
+
+    def test_store_and_probe(self):
+        """
+        Test that a stored value and move are read back, from this table and
+        from a copy attached to the same memory.
+        """
+        state = self.game.current_state
+        child = state.make_move('C')
+        self.assertIsNone(self.table.probe(state))
+        self.table.store(state, state.WIN, 2)
+        self.table[child] = child.LOSE
+
+        attached = pickle.loads(pickle.dumps(self.table))
+        self.assertEqual(attached.probe(state), (state.WIN, 2))
+        self.assertEqual(attached.get(child), child.LOSE)
+        self.assertEqual(len(attached), 2,
+                         "Two entries should be in use.")
+        attached.close()
+
+    def test_parallel_best_move(self):
+        """
+        Test that the parallel search chooses the engine's move with a
+        shared table, and leaves the solved positions in it.
+        """
+        expected = Engine().best_move(self.game)
+        move, counters = parallel_best_move(self.game, 2, self.table)
+        self.assertEqual(move, expected)
+        self.assertGreater(counters['nodes'], 0)
+        self.assertEqual(self.table.probe(self.game.current_state),
+                         (self.game.current_state.WIN, 0),
+                         "The start of side-length 2 is won by playing A.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,8 @@
 An implementation of Stonehenge.
 """
 
-from typing import List
+from typing import Any, Iterator, List
+import re
 from math import ceil
 from game import Game
 from game_state import GameState
@@ -81,9 +82,17 @@ class StoneHengeState(GameState):
 
     size - the side-length of the stonehenge grid
     p1_turn - whether it is p1's turn or not
+    grid - the rows of cells, each a tuple of letters and claimed cells (1, 2)
+    left_diagonal, right_diagonal, horizontal - tuples of ley-line owners
     """
     size: int
     p1_turn: bool
+    grid: tuple
+    left_diagonal: tuple
+    right_diagonal: tuple
+    horizontal: tuple
+    __slots__ = ('size', 'grid', 'left_diagonal', 'right_diagonal',
+                 'horizontal')
     constant_letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J',
                         'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T',
                         'U', 'V', 'W', 'X', 'Y', 'Z']
@@ -98,122 +107,51 @@ class StoneHengeState(GameState):
 
         Precondition: 1 <= size <= 5
         """
-        self.p1_turn = is_p1_turn
+        super().__init__(is_p1_turn)
         self.size = size
         initial = 2
         letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L',
                    'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W',
                    'X', 'Y', 'Z']
 
-        self.grid = []
+        grid = []
         for _ in range(self.size + 1):
-            self.grid.append([letters.pop(0) for _ in range(initial)])
+            grid.append(tuple([letters.pop(0) for _ in range(initial)]))
             if initial > self.size:
                 initial -= 1
             else:
                 initial += 1
+        self.grid = tuple(grid)
 
-        self.left_diagonal = []
-        self.right_diagonal = []
-        self.horizontal = []
-        for _ in range(self.size + 1):
-            self.left_diagonal.append('@')
-            self.right_diagonal.append('@')
-            self.horizontal.append('@')
+        self.left_diagonal = ('@',) * (self.size + 1)
+        self.right_diagonal = ('@',) * (self.size + 1)
+        self.horizontal = ('@',) * (self.size + 1)
+
+    @classmethod
+    def from_parts(cls, is_p1_turn: bool, size: int, grid: tuple,
+                   left_diagonal: tuple, right_diagonal: tuple,
+                   horizontal: tuple) -> 'StoneHengeState':
+        """
+        Return the state with the given player, side-length, cells and
+        ley-lines. The tuples are shared, not copied.
+        """
+        state = cls.__new__(cls)
+        GameState.__init__(state, is_p1_turn)
+        state.size = size
+        state.grid = grid
+        state.left_diagonal = left_diagonal
+        state.right_diagonal = right_diagonal
+        state.horizontal = horizontal
+        return state
 
     def __str__(self) -> str:
         """
         Return a string representation of the current state of the game.
         """
-        bl1 = \
-            """\
-                  @11   @10
-                 /   /
-            @30 - A - B
-                 \\ / \\
-              @31 - C   @21
-                   \\
-                    @20"""
-        bl2 = \
-            """\
-                    @12   @11
-                   /   /
-              @30 - A - B   @10
-                 / \\ / \\ /
-            @31 - C - D - E
-                 \\ / \\ / \\
-              @32 - F - G   @22
-                   \\   \\
-                    @20   @21"""
-        bl3 = \
-            """\
-                    @13   @12
-                   /   /
-              @30 - A - B   @11
-                 / \\ / \\ /
-            @31 - C - D - E   @10
-               / \\ / \\ / \\ /
-          @32 - F - G - H - I
-               \\ / \\ / \\ / \\
-            @33 - J - K - L   @23
-                \\    \\    \\
-                 @20    @21    @22"""
-
-        bl4 = \
-            """\
-                    @14   @13
-                   /   /
-              @30 - A - B   @12
-                 / \\ / \\ /
-            @31 - C - D - E   @11
-               / \\ / \\ / \\ /
-          @32 - F - G - H - I   @10
-             / \\ / \\ / \\ / \\ /
-        @33 - J - K - L - M - N
-             \\ / \\ / \\ / \\ / \\
-          @34 - O - P - Q - R   @24
-                \\   \\   \\   \\
-                 @20   @21   @22   @23"""
-
-        bl5 = \
-            """\
-                    @15   @14
-                   /   /
-              @30 - A - B   @13
-                 / \\ / \\ /
-            @31 - C - D - E   @12
-               / \\ / \\ / \\ /
-          @32 - F - G - H - I   @11
-             / \\ / \\ / \\ / \\ /
-        @33 - J - K - L - M - N   @10
-           / \\ / \\ / \\ / \\ / \\ /
-      @34 - O - P - Q - R - S - T
-           \\ / \\ / \\ / \\ / \\ / \\
-        @35 - U - V - W - X - Y   @25
-             \\   \\   \\   \\   \\
-              @20   @21   @22   @23   @24"""
-
-        if self.size == 1:
-            copy = bl1
-        elif self.size == 2:
-            copy = bl2
-        elif self.size == 3:
-            copy = bl3
-        elif self.size == 4:
-            copy = bl4
-        else:
-            copy = bl5
-
-        combined_grid = sum(self.grid, [])
-        for x in range(len(combined_grid)):
-            copy = copy.replace(self.constant_letters[x], str(combined_grid[x]))
-        for x in range(len(self.left_diagonal)):
-            copy = copy.replace('@1' + str(x), str(self.left_diagonal[x]))
-        for x in range(len(self.right_diagonal)):
-            copy = copy.replace('@2' + str(x), str(self.right_diagonal[x]))
-        for x in range(len(self.horizontal)):
-            copy = copy.replace('@3' + str(x), str(self.horizontal[x]))
-        return copy
+        layout, slots = board_layout(self.size)
+        values = sum(self.grid, ()) + self.left_diagonal + \
+            self.right_diagonal + self.horizontal
+        return layout.format(*[values[i] for i in slots])
 
     def __repr__(self) -> str:
         """
@@ -223,93 +161,90 @@ class StoneHengeState(GameState):
         return "Turn: {}, Cells: {}, Left Diagonal " \
                "LeyLines: {}, Right Diagonal LeyLines: {}, " \
                "Horizontal LeyLines: {}"\
-            .format('p1' if self.p1_turn else 'p2', self.grid,
-                    self.left_diagonal, self.right_diagonal, self.horizontal)
+            .format('p1' if self.p1_turn else 'p2',
+                    [list(row) for row in self.grid],
+                    list(self.left_diagonal), list(self.right_diagonal),
+                    list(self.horizontal))
+
+    def key(self) -> tuple:
+        """
+        Return a tuple of the values that identify this state.
+        """
+        return (self.p1_turn, self.size, self.grid, self.left_diagonal,
+                self.right_diagonal, self.horizontal)
+
+    def code(self) -> int:
+        """
+        Return a non-negative integer that identifies this state.
+
+        Every cell and ley-line is a base 3 digit (0 when unclaimed, else the
+        player who claimed it), after a leading digit for the player to move;
+        the lowest 3 bits hold the side-length.
+        """
+        code = 1 if self.p1_turn else 2
+        for x in sum(self.grid, ()) + self.left_diagonal + \
+                self.right_diagonal + self.horizontal:
+            code = code * 3 + (x if x in [1, 2] else 0)
+        return code * 8 + self.size
 
     def get_possible_moves(self) -> list:
         """
         Return all possible moves that can be applied to this state.
         """
-        lst = []
-        total = len(self.left_diagonal +
-                    self.right_diagonal + self.horizontal)
-        p1l = self.left_diagonal.count(1)
-        p2l = self.left_diagonal.count(2)
-        p1r = self.right_diagonal.count(1)
-        p2r = self.right_diagonal.count(2)
-        p1h = self.horizontal.count(1)
-        p2h = self.horizontal.count(2)
-        if sum([p1l, p1r, p1h]) >= int(ceil(total / 2)) or sum(
-                [p2l, p2r, p2h]) >= int(ceil(total)):
-            return []
-
-        for x in sum(self.grid, []):
-            if x in self.constant_letters:
-                lst.append(x)
-        return lst
+        return list(self.iter_possible_moves())
+
+    def iter_possible_moves(self) -> Iterator[str]:
+        """
+        Return an iterator over the possible moves of this state, i.e. the
+        letters of the unclaimed cells in order.
+        """
+        owners = self.left_diagonal + self.right_diagonal + self.horizontal
+        if not self.has_moves(owners.count(1), owners.count(2), len(owners)):
+            return iter([])
+        return (x for row in self.grid for x in row if isinstance(x, str))
 
     def make_move(self, move: str) -> 'StoneHengeState':
         """
         Return the GameState that results from applying move to this GameState.
-        """
-        new_state = StoneHengeState(not self.p1_turn, self.size)
-        holder = sum(self.grid, [])
-        new_state.grid = []
-        new_state.left_diagonal = self.left_diagonal[:]
-        new_state.right_diagonal = self.right_diagonal[:]
-        new_state.horizontal = self.horizontal[:]
-
-        # Fills in grid according to updated values
-        for e in range(len(holder)):
-            if holder[e] == move:
-                if self.p1_turn:
-                    holder[e] = 1
-                elif not self.p1_turn:
-                    holder[e] = 2
-        initial = 2
-        for _ in range(self.size + 1):
-            new_state.grid.append([holder.pop(0) for _ in range(initial)])
-            if initial > self.size:
-                initial -= 1
-            else:
-                initial += 1
 
-        # Updates right_diagonal
-        right_list = self.transform_to_right(new_state.grid)
-        counter1 = 0
-        for sublst in right_list:
-            if sublst.count(1) >= int(ceil(len(sublst)/2)) and \
-                    new_state.right_diagonal[counter1] not in [1, 2]:
-                new_state.right_diagonal[counter1] = 1
-            elif sublst.count(2) >= int(ceil(len(sublst)/2)) and \
-                    new_state.right_diagonal[counter1] not in [1, 2]:
-                new_state.right_diagonal[counter1] = 2
-            counter1 += 1
-
-        # Updates left_diagonal
-        left_list = self.transform_to_left(new_state.grid)
-        counter2 = 0
-        for sublst in left_list:
-            if sublst.count(1) >= int(ceil(len(sublst)/2)) and \
-                    new_state.left_diagonal[counter2] not in [1, 2]:
-                new_state.left_diagonal[counter2] = 1
-            elif sublst.count(2) >= int(ceil(len(sublst)/2)) and \
-                    new_state.left_diagonal[counter2] not in [1, 2]:
-                new_state.left_diagonal[counter2] = 2
-            counter2 += 1
-
-        # Updates horizontal
-        counter3 = 0
-        for sublst in new_state.grid:
-            if sublst.count(1) >= int(ceil(len(sublst)/2)) and \
-                    new_state.horizontal[counter3] not in [1, 2]:
-                new_state.horizontal[counter3] = 1
-            elif sublst.count(2) >= int(ceil(len(sublst)/2)) and \
-                    new_state.horizontal[counter3] not in [1, 2]:
-                new_state.horizontal[counter3] = 2
-            counter3 += 1
-
-        return new_state
+        Rows and ley-line tuples that the move does not change are shared
+        with the new state.
+        """
+        player = 1 if self.p1_turn else 2
+        lines, cell_lines = ley_line_index(self.size)
+
+        # Fills in the rows containing move
+        grid = list(self.grid)
+        changed = set()
+        start = 0
+        for r in range(len(grid)):
+            if move in grid[r]:
+                grid[r] = tuple([player if x == move else x for x in grid[r]])
+                changed.update(start + i for i in range(len(grid[r]))
+                               if self.grid[r][i] == move)
+            start += len(grid[r])
+        grid = tuple(grid)
+
+        # Updates the ley-lines through the claimed cells, in the order of
+        # left_diagonal + right_diagonal + horizontal
+        cells = sum(grid, ())
+        owners = list(self.left_diagonal + self.right_diagonal +
+                      self.horizontal)
+        for x in sorted(set().union(*[cell_lines[i] for i in changed])):
+            values = [cells[i] for i in lines[x]]
+            if values.count(1) >= int(ceil(len(values) / 2)) and \
+                    owners[x] not in [1, 2]:
+                owners[x] = 1
+            elif values.count(2) >= int(ceil(len(values) / 2)) and \
+                    owners[x] not in [1, 2]:
+                owners[x] = 2
+
+        n = self.size + 1
+        return StoneHengeState.from_parts(
+            not self.p1_turn, self.size, grid,
+            share(self.left_diagonal, owners[:n]),
+            share(self.right_diagonal, owners[n:2 * n]),
+            share(self.horizontal, owners[2 * n:]))
 
     def transform_to_left(self, ogrid: List[list]) -> List[list]:
         """
@@ -317,7 +252,7 @@ class StoneHengeState(GameState):
         new grid sorted left diagonally. Does not mutate self.grid.
         """
         lgrid = []
-        c = sum(ogrid, [])
+        c = [x for row in ogrid for x in row]
         if self.size == 1:
             lgrid = [[c[2], c[1]], [c[0]]]
         elif self.size == 2:
@@ -344,7 +279,7 @@ class StoneHengeState(GameState):
         new grid sorted right diagonally. Does not mutate self.grid.
         """
         rgrid = []
-        c = sum(ogrid, [])
+        c = [x for row in ogrid for x in row]
         if self.size == 1:
             rgrid = [[c[0], c[2]], [c[1]]]
         elif self.size == 2:
@@ -369,70 +304,200 @@ class StoneHengeState(GameState):
         """
         Return an estimate in interval [LOSE, WIN] of best outcome the current
         player can guarantee from state self.
+
+        Immediate wins and forced losses are found from how many cells each
+        player still needs to claim every ley-line, without making any moves.
+        """
+        lines, cell_lines = ley_line_index(self.size)
+        cells = sum(self.grid, ())
+        owners = self.left_diagonal + self.right_diagonal + self.horizontal
+        total = len(owners)
+        half = int(ceil(total / 2))
+        owned = {1: owners.count(1), 2: owners.count(2)}
+        if not self.has_moves(owned[1], owned[2], total):
+            return self.LOSE
+
+        player = 1 if self.p1_turn else 2
+        other = 3 - player
+        free = [i for i in range(len(cells))
+                if cells[i] in self.constant_letters]
+        # Ley-lines in which each player is one cell away from claiming
+        one_away = {}
+        for p in [player, other]:
+            one_away[p] = set()
+            for x in range(len(lines)):
+                claimed = [cells[i] for i in lines[x]].count(p)
+                if owners[x] == '@' and \
+                        claimed + 1 >= int(ceil(len(lines[x]) / 2)):
+                    one_away[p].add(x)
+
+        forced_losses = 0
+        for cell in free:
+            taken = one_away[player].intersection(cell_lines[cell])
+            if owned[player] + len(taken) >= half:
+                return self.WIN
+            after = {player: owned[player] + len(taken), other: owned[other]}
+            if not self.has_moves(after[1], after[2], total):
+                continue
+            threats = one_away[other] - taken
+            if any(owned[other] + len(threats.intersection(cell_lines[reply]))
+                   >= half for reply in free if reply != cell):
+                forced_losses += 1
+
+        if forced_losses == len(free):
+            return self.LOSE
+        return self.DRAW
+
+    @staticmethod
+    def has_moves(p1_lines: int, p2_lines: int, total: int) -> bool:
         """
-        total = len(self.left_diagonal +
-                    self.right_diagonal + self.horizontal)
-        if self.p1_turn:
-            return self.helper_function_p1(total)
-        return self.helper_function_p2(total)
-
-    def helper_function_p1(self, total: int) -> int:
-        """
-        Helper function for rough_outcome
-        """
-        p2_wins = []
-        for move in self.get_possible_moves():
-            new_state = self.make_move(move)
-            p1l = new_state.left_diagonal.count(1)
-            p1r = new_state.right_diagonal.count(1)
-            p1h = new_state.horizontal.count(1)
-            if sum([p1l, p1r, p1h]) >= int(ceil(total / 2)):
-                return 1
-
-            p2_wins_mini = []
-            for p2_move in new_state.get_possible_moves():
-                new_state_p2 = new_state.make_move(p2_move)
-                p2l = new_state_p2.left_diagonal.count(2)
-                p2r = new_state_p2.right_diagonal.count(2)
-                p2h = new_state_p2.horizontal.count(2)
-                if sum([p2l, p2r, p2h]) >= int(ceil(total / 2)):
-                    p2_wins_mini.append(True)
-
-            if any(p2_wins_mini):
-                p2_wins.append(True)
-
-        if len(p2_wins) == len(self.get_possible_moves()):
-            return -1
-        return 0
-
-    def helper_function_p2(self, total: int) -> int:
-        """
-        Helper function for rough_outcome
-        """
-        p1_wins = []
-        for move in self.get_possible_moves():
-            new_state = self.make_move(move)
-            p2l = new_state.left_diagonal.count(2)
-            p2r = new_state.right_diagonal.count(2)
-            p2h = new_state.horizontal.count(2)
-            if sum([p2l, p2r, p2h]) >= int(ceil(total / 2)):
-                return 1
-
-            p1_wins_mini = []
-            for p1_move in new_state.get_possible_moves():
-                new_state_p1 = new_state.make_move(p1_move)
-                p1l = new_state_p1.left_diagonal.count(1)
-                p1r = new_state_p1.right_diagonal.count(1)
-                p1h = new_state_p1.horizontal.count(1)
-                if sum([p1l, p1r, p1h]) >= int(ceil(total / 2)):
-                    p1_wins_mini.append(True)
-
-            if any(p1_wins_mini):
-                p1_wins.append(True)
-
-        if len(p1_wins) == len(self.get_possible_moves()):
-            return -1
-        return 0
+        Return whether get_possible_moves returns any moves for a state
+        where p1 and p2 have claimed p1_lines and p2_lines of total ley-lines
+        and cells are still unclaimed.
+        """
+        return not (p1_lines >= int(ceil(total / 2)) or
+                    p2_lines >= int(ceil(total)))
+
+
+def share(old: tuple, new: list) -> tuple:
+    """
+    Return old if it holds the same values as new, and new as a tuple
+    otherwise.
+    """
+    if list(old) == new:
+        return old
+    return tuple(new)
+
+
+# Ley-line index for each side-length, built on first use by ley_line_index
+_LEY_LINES = {}
+
+
+def ley_line_index(size: int) -> tuple:
+    """
+    Return (lines, cell_lines) for a board of side-length size.
+
+    lines lists the cell positions of every ley-line, in the order of
+    left_diagonal + right_diagonal + horizontal, where a cell's position is
+    its index in sum(grid, []). cell_lines[i] lists the ley-lines that go
+    through the cell at position i.
+    """
+    if size not in _LEY_LINES:
+        state = StoneHengeState(True, size)
+        positions = []
+        start = 0
+        for row in state.grid:
+            positions.append(list(range(start, start + len(row))))
+            start += len(row)
+        lines = [tuple(line) for line in
+                 state.transform_to_left(positions) +
+                 state.transform_to_right(positions) + positions]
+        cell_lines = [tuple(x for x in range(len(lines)) if i in lines[x])
+                      for i in range(start)]
+        _LEY_LINES[size] = (tuple(lines), tuple(cell_lines))
+    return _LEY_LINES[size]
+
+
+# Boards by side-length. A letter marks a cell, in the order of
+# sum(grid, ()), and @1x, @2x and @3x mark the x-th left diagonal, right
+# diagonal and horizontal ley-line.
+BOARD_TEMPLATES = {
+    1: """\
+                  @11   @10
+                 /   /
+            @30 - A - B
+                 \\ / \\
+              @31 - C   @21
+                   \\
+                    @20""",
+
+    2: """\
+                    @12   @11
+                   /   /
+              @30 - A - B   @10
+                 / \\ / \\ /
+            @31 - C - D - E
+                 \\ / \\ / \\
+              @32 - F - G   @22
+                   \\   \\
+                    @20   @21""",
+
+    3: """\
+                    @13   @12
+                   /   /
+              @30 - A - B   @11
+                 / \\ / \\ /
+            @31 - C - D - E   @10
+               / \\ / \\ / \\ /
+          @32 - F - G - H - I
+               \\ / \\ / \\ / \\
+            @33 - J - K - L   @23
+                \\    \\    \\
+                 @20    @21    @22""",
+
+    4: """\
+                    @14   @13
+                   /   /
+              @30 - A - B   @12
+                 / \\ / \\ /
+            @31 - C - D - E   @11
+               / \\ / \\ / \\ /
+          @32 - F - G - H - I   @10
+             / \\ / \\ / \\ / \\ /
+        @33 - J - K - L - M - N
+             \\ / \\ / \\ / \\ / \\
+          @34 - O - P - Q - R   @24
+                \\   \\   \\   \\
+                 @20   @21   @22   @23""",
+
+    5: """\
+                    @15   @14
+                   /   /
+              @30 - A - B   @13
+                 / \\ / \\ /
+            @31 - C - D - E   @12
+               / \\ / \\ / \\ /
+          @32 - F - G - H - I   @11
+             / \\ / \\ / \\ / \\ /
+        @33 - J - K - L - M - N   @10
+           / \\ / \\ / \\ / \\ / \\ /
+      @34 - O - P - Q - R - S - T
+           \\ / \\ / \\ / \\ / \\ / \\
+        @35 - U - V - W - X - Y   @25
+             \\   \\   \\   \\   \\
+              @20   @21   @22   @23   @24"""}
+
+BOARD_SLOT = re.compile(r'@([123])(\d)|([A-Z])')
+
+# Compiled boards for each side-length, built on first use by board_layout
+_LAYOUTS = {}
+
+
+def board_layout(size: int) -> tuple:
+    """
+    Return (layout, slots) for a board of side-length size.
+
+    layout is the board template with a {} in place of every cell and
+    ley-line marker. slots[i] is the position of the value for the i-th {}
+    in sum(grid, ()) + left_diagonal + right_diagonal + horizontal.
+    """
+    if size not in _LAYOUTS:
+        cells = len(ley_line_index(size)[1])
+        slots = []
+
+        def fill(match: Any) -> str:
+            """
+            Record the value position for match and return its placeholder.
+            """
+            kind, index, letter = match.groups()
+            if letter:
+                slots.append(ord(letter) - ord('A'))
+            else:
+                slots.append(cells + (int(kind) - 1) * (size + 1) + int(index))
+            return '{}'
+        layout = BOARD_SLOT.sub(fill, BOARD_TEMPLATES[size])
+        _LAYOUTS[size] = (layout, tuple(slots))
+    return _LAYOUTS[size]
 
 
 if __name__ == "__main__":
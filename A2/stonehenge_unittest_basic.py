@@ -16,6 +16,7 @@ from unittest.mock import patch
 
 # Import the student solution
 from game_interface import playable_games
+from game_state import InternTable
 StonehengeGame = playable_games['h']
 
 # Below are some sample Stonehenge boards for use in the unittests
@@ -542,6 +543,28 @@ class StonehengeUnitTests(unittest.TestCase):
                          "After calling make_move, the current_state of a " +
                          "game should not be changed.")
 
+    @patch('builtins.input', side_effect=['3'])
+    def test_make_move_shares_unchanged_rows(self, input):
+        """
+        Test make_move() to make sure the new state shares the rows and
+        ley-lines that the move did not change with the old state.
+        """
+        game = StonehengeGame(True)
+        state = game.current_state
+        new_state = state.make_move(game.str_to_move("G"))
+
+        self.assertFalse(hasattr(new_state, '__dict__'),
+                         "Stonehenge states should not have a __dict__.")
+        self.assertEqual(new_state.grid[2], ('F', 1, 'H', 'I'),
+                         "Claiming G should change the third row.")
+        for i in [0, 1, 3]:
+            self.assertIs(new_state.grid[i], state.grid[i],
+                          "Row {} was not changed by the move ".format(i) +
+                          "and should be shared between the states.")
+        self.assertIs(new_state.horizontal, state.horizontal,
+                      "Claiming G on a board of side-length 3 claims no " +
+                      "horizontal ley-line, so they should be shared.")
+
     @patch('builtins.input', side_effect=['1'])
     def test_stonehenge_is_valid_move_false(self, input):
         """
@@ -683,6 +706,40 @@ class StonehengeUnitTests(unittest.TestCase):
                          "should return the same __repr__.")
 
 
+    @patch('builtins.input', side_effect=['2'])
+    def test_stonehenge_eq_hash_same_value(self, input):
+        """
+        Test to make sure 2 states that have the same value and the same
+        player, but which were reached differently, are equal, hash the same
+        and are interned to one object.
+        """
+        game = StonehengeGame(True)
+        initial_state = game.current_state
+
+        state_1 = initial_state
+        for move in ["A", "G", "B"]:
+            state_1 = state_1.make_move(game.str_to_move(move))
+        state_2 = initial_state
+        for move in ["B", "G", "A"]:
+            state_2 = state_2.make_move(game.str_to_move(move))
+
+        self.assertEqual(state_1, state_2,
+                         "2 states that have the same values and the same " +
+                         "current player should be equal.")
+        self.assertEqual(hash(state_1), hash(state_2),
+                         "Equal states should have the same hash.")
+        self.assertEqual(len({state_1, state_2}), 1,
+                         "A set of 2 equal states should have 1 element.")
+        self.assertNotEqual(state_1, state_1.make_move("C"),
+                            "States with different values should not be " +
+                            "equal.")
+
+        table = InternTable()
+        self.assertIs(table.intern(state_2), table.intern(state_1),
+                      "Equal states should intern to the same object.")
+        self.assertEqual(len(table), 1,
+                         "The intern table should hold 1 distinct state.")
+
     @patch('builtins.input', side_effect = ['1'])
     def test_stonehenge_rough_outcome_state_over(self, input):
         """
@@ -5,8 +5,11 @@ NOTE: Make sure this file adheres to python-ta.
 Adjust the type annotations as needed, and implement both a recursive
 and an iterative version of minimax.
 """
-from typing import Any
+from typing import Any, Callable, Dict, List
 import copy
+import functools
+import time
+from subtract_square_state import is_pos_square
 
 
 # TODO: Adjust the type annotation as needed.
@@ -18,6 +21,37 @@ def interactive_strategy(game: Any) -> Any:
     return game.str_to_move(move)
 
 
+# Results of cached_rough_outcome are remembered for this many of the most
+# recently evaluated states
+ROUGH_OUTCOME_CACHE_SIZE = 1 << 16
+
+
+@functools.lru_cache(maxsize=ROUGH_OUTCOME_CACHE_SIZE)
+def cached_rough_outcome(state: Any) -> float:
+    """
+    Return state.rough_outcome(), remembered for the most recently
+    evaluated states. Equal states share a result, and every strategy
+    shares the cache.
+    """
+    return state.rough_outcome()
+
+
+def memo_stats() -> Dict[str, dict]:
+    """
+    Return the hits, misses, size and hit rate of the caches of
+    cached_rough_outcome and is_pos_square.
+    """
+    stats = {}
+    for name, function in [('rough_outcome', cached_rough_outcome),
+                           ('is_pos_square', is_pos_square)]:
+        info = function.cache_info()
+        calls = info.hits + info.misses
+        stats[name] = {'hits': info.hits, 'misses': info.misses,
+                       'size': info.currsize, 'max_size': info.maxsize,
+                       'hit_rate': info.hits / calls if calls else 0.0}
+    return stats
+
+
 def rough_outcome_strategy(game: Any) -> Any:
     """
     Return a move for game by picking a move which results in a state with
@@ -48,7 +82,7 @@ def rough_outcome_strategy(game: Any) -> Any:
 
         # We multiply the below by -1 since a state that's bad for the opponent
         # is good for us.
-        guessed_score = new_state.rough_outcome() * -1
+        guessed_score = cached_rough_outcome(new_state) * -1
         if guessed_score > best_outcome:
             best_outcome = guessed_score
             best_move = move
@@ -93,6 +127,191 @@ def helper_recursion(game) -> list:
         lst.append(new_game)
     return max([(helper_recursion(new) * -1) for new in lst])
 
+
+def analyse(game: Any, table: Dict[Any, int] = None) -> List[tuple]:
+    """
+    Return (move, score, line) for every possible move of game's current
+    state, best first, with its principal variation, as engine.analyse
+    does: every move is solved in one table, so positions shared between
+    the moves' subtrees are solved once.
+
+    engine is imported here because it imports this module.
+    """
+    from engine import analyse as engine_analyse
+    return engine_analyse(game, table)
+
+
+# Search depths used by depth_limited_minimax when no depth is given. The
+# outer key is the name of the game's class and the inner key is the board
+# size of its current state (None matches any size).
+DEFAULT_DEPTH = 4
+SEARCH_DEPTHS = {'StoneHenge': {1: 6, 2: 6, 3: 3, 4: 2, 5: 1},
+                 'SubtractSquareGame': {None: 6}}
+
+
+def get_search_depth(game: Any) -> int:
+    """
+    Return the depth depth_limited_minimax searches to for game, looked up
+    in SEARCH_DEPTHS by game and board size.
+    """
+    depths = SEARCH_DEPTHS.get(type(game).__name__, {})
+    size = getattr(game.current_state, 'size', None)
+    if size in depths:
+        return depths[size]
+    return depths.get(None, DEFAULT_DEPTH)
+
+
+def rough_outcome_evaluator(state: Any) -> float:
+    """
+    Return state.rough_outcome(), the default leaf evaluator of
+    depth_limited_minimax, from the cache of cached_rough_outcome.
+    """
+    return cached_rough_outcome(state)
+
+
+def depth_limited_minimax(game: Any, depth: int = None,
+                          evaluator: Callable[[Any], float] = None) -> Any:
+    """
+    Return the most optimal move for game found by searching depth moves
+    ahead, scoring the states at that depth with evaluator.
+
+    evaluator takes a state and returns a score in [LOSE, WIN] for the current
+    player of that state. It defaults to the state's rough_outcome, and depth
+    defaults to get_search_depth(game).
+    """
+    if depth is None:
+        depth = get_search_depth(game)
+    if evaluator is None:
+        evaluator = rough_outcome_evaluator
+    state = game.current_state
+    moves = state.get_possible_moves()
+    lst = [depth_limited_value(game, state.make_move(move), depth - 1,
+                               evaluator) * -1 for move in moves]
+    return moves[lst.index(max(lst))]
+
+
+def depth_limited_value(game: Any, state: Any, depth: int,
+                        evaluator: Callable[[Any], float]) -> float:
+    """
+    Return the minimax score of state for its current player, searching
+    depth moves ahead and scoring the states at that depth with evaluator.
+    """
+    if game.is_over(state):
+        # The player who made the last move has won.
+        return state.LOSE
+    moves = state.get_possible_moves()
+    if depth <= 0 or not moves:
+        return evaluator(state)
+    return max([depth_limited_value(game, state.make_move(move), depth - 1,
+                                    evaluator) * -1 for move in moves])
+
+
+def make_depth_limited_strategy(depth: int = None,
+                                evaluator: Callable[[Any], float] = None) \
+        -> Callable[[Any], Any]:
+    """
+    Return a strategy that plays depth_limited_minimax with a fixed depth
+    and evaluator.
+    """
+    def strategy(game: Any) -> Any:
+        """
+        Return depth_limited_minimax's move for game.
+        """
+        return depth_limited_minimax(game, depth, evaluator)
+    strategy.__name__ = 'depth_limited_minimax_{}'.format(depth)
+    return strategy
+
+
+class SearchStopped(Exception):
+    """
+    Raised inside a search when its SearchControl asks it to stop.
+    """
+
+
+class SearchControl:
+    """
+    Lets the caller of a search stop it, and lets the search report the
+    best move it has found so far.
+
+    deadline - the time.monotonic() time to stop at, or None
+    best_move - the best move found so far, or None
+    depth - the depth best_move was found at
+    """
+    deadline: float
+    best_move: Any
+    depth: int
+
+    def __init__(self, deadline: float = None) -> None:
+        """
+        Initialize a SearchControl that stops searches at deadline.
+        """
+        self.deadline = deadline
+        self.best_move = None
+        self.depth = 0
+        self._stopped = False
+
+    def stop(self) -> None:
+        """
+        Ask the search to stop as soon as it can.
+        """
+        self._stopped = True
+
+    def should_stop(self) -> bool:
+        """
+        Return whether the search should stop now.
+        """
+        return self._stopped or (self.deadline is not None and
+                                 time.monotonic() >= self.deadline)
+
+    def report(self, move: Any, depth: int) -> None:
+        """
+        Record move as the best move found by a search to depth.
+        """
+        self.best_move = move
+        self.depth = depth
+
+
+def iterative_deepening_minimax(game: Any, control: SearchControl = None,
+                                max_depth: int = None,
+                                evaluator: Callable[[Any], float] = None) \
+        -> Any:
+    """
+    Return the move of depth_limited_minimax for game at the deepest depth
+    searched before control says to stop.
+
+    Depths 1, 2, ... are searched in turn, reporting each move to control,
+    until max_depth is reached or a search reaches the end of every line of
+    play. Without a control, max_depth defaults to get_search_depth(game).
+    """
+    if control is None:
+        control = SearchControl()
+        if max_depth is None:
+            max_depth = get_search_depth(game)
+    if evaluator is None:
+        evaluator = rough_outcome_evaluator
+    cut_off = [True]
+
+    def leaf(state: Any) -> float:
+        """
+        Return evaluator(state), or stop the search if control says so.
+        """
+        if control.should_stop():
+            raise SearchStopped
+        cut_off[0] = True
+        return evaluator(state)
+
+    depth = 0
+    while cut_off[0] and (max_depth is None or depth < max_depth):
+        depth += 1
+        cut_off[0] = False
+        try:
+            control.report(depth_limited_minimax(game, depth, leaf), depth)
+        except SearchStopped:
+            break
+    if control.best_move is None:
+        return next(game.current_state.iter_possible_moves(), None)
+    return control.best_move
+
 # Class Stack and Tree Taken from lecture
 
 
@@ -3,14 +3,20 @@ An implementation of a state for SubtractSquare.
 
 NOTE: You do not have to run python-ta on this file.
 """
-from typing import Any
+from typing import Any, Iterator
+from math import isqrt
+import functools
 from game_state import GameState
 
 
 class SubtractSquareState(GameState):
     """
     The state of a game at a certain point in time.
+
+    current_total - the number left to subtract from
     """
+    current_total: int
+    __slots__ = ('current_total',)
 
     def __init__(self, is_p1_turn: bool, current_total: int) -> None:
         """
@@ -30,12 +36,24 @@ class SubtractSquareState(GameState):
         """
         Return all possible moves that can be applied to this state.
         """
-        moves = []
-        for i in range(1, self.current_total + 1):
-            if i ** 2 <= self.current_total:
-                moves.append(i ** 2)
+        return list(self.iter_possible_moves())
+
+    def iter_possible_moves(self) -> Iterator[int]:
+        """
+        Return an iterator over the possible moves of this state, in
+        increasing order.
+        """
+        return (i ** 2 for i in range(1, isqrt(max(self.current_total, 0)) + 1))
 
-        return moves
+    def is_valid_move(self, move: Any) -> bool:
+        """
+        Return whether move is a valid move for this GameState, without
+        generating the possible moves.
+        """
+        if isinstance(move, float) and move.is_integer():
+            move = int(move)
+        return isinstance(move, int) and move <= self.current_total \
+            and is_pos_square(move)
 
     def make_move(self, move: Any) -> "SubtractSquareState":
         """
@@ -56,6 +74,19 @@ class SubtractSquareState(GameState):
         return "P1's Turn: {} - Total: {}".format(self.p1_turn,
                                                   self.current_total)
 
+    def key(self) -> tuple:
+        """
+        Return a tuple of the values that identify this state.
+        """
+        return self.p1_turn, self.current_total
+
+    def code(self) -> int:
+        """
+        Return a non-negative integer that identifies this state: twice the
+        current total, plus 1 if it is p1's turn.
+        """
+        return self.current_total * 2 + (1 if self.p1_turn else 0)
+
     def rough_outcome(self) -> float:
         """
         Return an estimate in interval [LOSE, WIN] of best outcome the current
@@ -63,14 +94,20 @@ class SubtractSquareState(GameState):
         """
         if is_pos_square(self.current_total):
             return self.WIN
-        elif all([is_pos_square(self.current_total - n ** 2)
-                  for n in range(1, self.current_total + 1)
-                  if n ** 2 < self.current_total]):
+        elif all([is_pos_square(self.current_total - move)
+                  for move in self.iter_possible_moves()
+                  if move < self.current_total]):
             return self.LOSE
 
         return self.DRAW
 
 
+# Results of is_pos_square are remembered for this many of the most
+# recently checked numbers
+POS_SQUARE_CACHE_SIZE = 1 << 12
+
+
+@functools.lru_cache(maxsize=POS_SQUARE_CACHE_SIZE)
 def is_pos_square(n: int) -> bool:
     """
     Return whether n is a positive perfect square
@@ -80,7 +117,7 @@ def is_pos_square(n: int) -> bool:
     >>> is_pos_square(9)
     True
     """
-    return 0 < n and (round(n ** 0.5) ** 2 == n)
+    return 0 < n and isqrt(n) ** 2 == n
 
 
 if __name__ == "__main__":
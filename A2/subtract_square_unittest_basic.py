@@ -0,0 +1,94 @@
+"""
+A subset of unittests used for testing SubtractSquare.
+
+These unittests check the moves SubtractSquare generates and validates,
+including for totals large enough that looping up to the total would be
+noticeably slow.
+"""
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+SubtractSquareGame = playable_games['s']
+
+
+class SubtractSquareUnitTests(unittest.TestCase):
+    @patch('builtins.input', side_effect=['20'])
+    def test_get_possible_moves(self, input):
+        """
+        Test get_possible_moves() to make sure it returns every square up to
+        the current total, in increasing order.
+        """
+        game = SubtractSquareGame(True)
+        moves = game.current_state.get_possible_moves()
+
+        self.assertEqual(moves, [1, 4, 9, 16],
+                         ("get_possible_moves() on a game of SubtractSquare " +
+                          "with a value of 20 should return [1, 4, 9, 16] " +
+                          "but returned {} instead.").format(moves))
+
+    @patch('builtins.input', side_effect=['0'])
+    def test_get_possible_moves_game_over(self, input):
+        """
+        Test get_possible_moves() to make sure it returns no moves once the
+        total has reached 0.
+        """
+        game = SubtractSquareGame(True)
+
+        self.assertEqual(game.current_state.get_possible_moves(), [],
+                         "get_possible_moves() on a game of SubtractSquare " +
+                         "that is over should return no moves.")
+
+    @patch('builtins.input', side_effect=['1000000000000'])
+    def test_moves_large_total(self, input):
+        """
+        Test the lazy moves and the move set of a game with a very large
+        total, which should only cost about sqrt(total) squares.
+        """
+        game = SubtractSquareGame(True)
+        moves = game.current_state.iter_possible_moves()
+
+        self.assertEqual([next(moves) for _ in range(3)], [1, 4, 9],
+                         "iter_possible_moves() should produce the squares " +
+                         "in increasing order.")
+        self.assertEqual(len(game.current_state.get_move_set()), 10 ** 6,
+                         "A total of 10 ** 12 should have 10 ** 6 moves.")
+
+    @patch('builtins.input', side_effect=['1000000000000'])
+    def test_is_valid_move(self, input):
+        """
+        Test is_valid_move() to make sure it accepts exactly the squares up to
+        the current total.
+        """
+        game = SubtractSquareGame(True)
+        state = game.current_state
+
+        for move in [1, 4, 10 ** 12, (10 ** 6 - 1) ** 2]:
+            self.assertTrue(state.is_valid_move(move),
+                            "{} should be a valid move.".format(move))
+        for move in [0, -4, 2, 10 ** 12 + 1, (10 ** 6 + 1) ** 2, '4', None]:
+            self.assertFalse(state.is_valid_move(move),
+                             "{!r} should not be a valid move.".format(move))
+
+    def test_eq_hash(self):
+        """
+        Test to make sure SubtractSquare states are equal exactly when they
+        have the same total and player, and hash consistently.
+        """
+        with patch('builtins.input', return_value='20'):
+            game = SubtractSquareGame(True)
+        state = game.current_state
+
+        by_one = state.make_move(1).make_move(4)
+        by_four = state.make_move(4).make_move(1)
+        self.assertEqual(by_one, by_four,
+                         "20 - 1 - 4 and 20 - 4 - 1 should be equal states.")
+        self.assertEqual(hash(by_one), hash(by_four),
+                         "Equal states should have the same hash.")
+        self.assertNotEqual(by_one, type(by_one)(False, 15),
+                            "States with different players should not be " +
+                            "equal.")
+
+
+if __name__ == "__main__":
+    unittest.main()
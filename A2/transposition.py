@@ -0,0 +1,269 @@
+"""
+A transposition table with a fixed memory budget.
+
+An Engine's dict of solved positions grows with every position it solves,
+which is more than memory allows on StoneHenge boards of side-length 4 and
+5. TranspositionTable holds at most as many entries as fit in a budget of
+megabytes: two 64-bit words each (the hash of the position's code() and the
+packed data, as in shared_table) in one array, found by open addressing
+over PROBES entries from the hash's slot.
+
+When a position's entries are all in use one is replaced, by policy:
+
+    'depth' - entries from earlier searches first, then the one with the
+              lowest draft. A position is not stored over an entry of the
+              current search with a higher draft.
+    'age'   - the entry from the oldest search, and the first of equals.
+
+The draft of a position is its number of possible moves, which grows with
+the size of the subtree below it, so the depth policy keeps the positions
+that cost most to solve again. new_search starts a new search, aging every
+entry. Dropping an entry only costs time, since a position not found is
+solved again, so an Engine using the table stays exact however small the
+budget. Run
+
+    python transposition.py SIZE PLIES MEGABYTES...
+
+to solve a StoneHenge board of side-length SIZE after PLIES random moves
+with each budget and with a dict, and compare.
+"""
+from typing import Any, Iterable, Optional, Tuple
+from array import array
+import random
+import time
+from engine import Engine
+from game_state import GameState
+from shared_table import ENTRY, hash64, pack, unpack
+
+# Entries tried from a hash's slot before one is replaced
+PROBES = 4
+# The replacement policies
+POLICIES = ('depth', 'age')
+
+
+class TranspositionTable:
+    """
+    A table of solved positions of at most a fixed size, usable as the table
+    of an Engine.
+
+    slots - the number of entries, a power of two
+    policy - the replacement policy, one of POLICIES
+    age - the number of the current search, modulo 256
+    used - the number of entries in use
+    hits - the number of probes that found their position
+    misses - the number of probes that did not
+    stores - the number of positions stored
+    evictions - the number of entries replaced by another position
+    rejected - the number of positions not stored, under the depth policy
+    """
+    slots: int
+    policy: str
+    age: int
+    used: int
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    rejected: int
+
+    def __init__(self, megabytes: float = 64, policy: str = 'depth') -> None:
+        """
+        Initialize an empty TranspositionTable of as many entries as fit in
+        megabytes, rounded down to a power of two.
+
+        Raise ValueError if policy is not one of POLICIES.
+        """
+        if policy not in POLICIES:
+            raise ValueError('unknown replacement policy {!r}'.format(policy))
+        entries = max(int(megabytes * (1 << 20)) // ENTRY.size, PROBES)
+        self.slots = 1 << (entries.bit_length() - 1)
+        self.policy = policy
+        self.age = 0
+        self._words = array('Q', bytes(self.slots * ENTRY.size))
+        self.used = 0
+        self.hits = self.misses = self.stores = 0
+        self.evictions = self.rejected = 0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Return the memory taken by the entries, in bytes.
+        """
+        return self._words.itemsize * len(self._words)
+
+    def _find(self, key: int) -> int:
+        """
+        Return the index in the array of the entry for the hash key, or -1.
+        """
+        words = self._words
+        for i in range(PROBES):
+            index = (((key >> 1) + i) & (self.slots - 1)) * 2
+            check = words[index]
+            if check == key:
+                return index
+            if not check:
+                return -1
+        return -1
+
+    def probe(self, state: GameState) -> Optional[Tuple[int, int]]:
+        """
+        Return the (value, move) stored for state, where move is the index
+        of the best move in state.get_possible_moves() or -1, or None if
+        state is not in the table.
+        """
+        index = self._find(hash64(state.code()))
+        if index < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return unpack(self._words[index + 1] & 0xffff)
+
+    def _victim(self, key: int, draft: int) -> int:
+        """
+        Return the index in the array of the entry to store the hash key
+        in, or -1 if it should not be stored.
+        """
+        words = self._words
+        best = -1
+        best_rank = None
+        for i in range(PROBES):
+            index = (((key >> 1) + i) & (self.slots - 1)) * 2
+            check = words[index]
+            if not check or check == key:
+                return index
+            data = words[index + 1]
+            staleness = (self.age - (data >> 24)) & 0xff
+            if self.policy == 'depth':
+                rank = (staleness == 0, (data >> 16) & 0xff)
+            else:
+                rank = (-staleness, i)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = index, rank
+        if self.policy == 'depth' and best_rank[0] and best_rank[1] > draft:
+            return -1
+        return best
+
+    def store(self, state: GameState, value: int, move: int = -1) -> None:
+        """
+        Store value and the index move of the best move for state, unless
+        the replacement policy keeps the entry it would replace.
+        """
+        key = hash64(state.code())
+        draft = min(len(state.get_move_set()), 0xff)
+        index = self._victim(key, draft)
+        if index < 0:
+            self.rejected += 1
+            return
+        check = self._words[index]
+        if not check:
+            self.used += 1
+        elif check != key:
+            self.evictions += 1
+        self._words[index] = key
+        self._words[index + 1] = pack(value, move) | (draft << 16) | \
+            (self.age << 24)
+        self.stores += 1
+
+    def new_search(self) -> None:
+        """
+        Start a new search, so entries stored until now are from an earlier
+        one.
+        """
+        self.age = (self.age + 1) & 0xff
+
+    def get(self, state: GameState, default: Any = None) -> Any:
+        """
+        Return the value stored for state, or default if there is none, as
+        dict.get does.
+        """
+        entry = self.probe(state)
+        return default if entry is None else entry[0]
+
+    def __getitem__(self, state: GameState) -> int:
+        """
+        Return the value stored for state.
+
+        Raise KeyError if there is none.
+        """
+        entry = self.probe(state)
+        if entry is None:
+            raise KeyError(state)
+        return entry[0]
+
+    def __setitem__(self, state: GameState, value: int) -> None:
+        """
+        Store value for state with no best move.
+        """
+        self.store(state, value)
+
+    def __contains__(self, state: GameState) -> bool:
+        """
+        Return whether state is in the table.
+        """
+        return self._find(hash64(state.code())) >= 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in use.
+        """
+        return self.used
+
+    def update(self, values: Any) -> None:
+        """
+        Store the value of every state of the mapping values.
+        """
+        for state, value in values.items():
+            self.store(state, value)
+
+    def clear(self) -> None:
+        """
+        Remove every entry, keeping the counters.
+        """
+        self._words = array('Q', bytes(self.slots * ENTRY.size))
+        self.used = 0
+
+    def stats(self) -> dict:
+        """
+        Return the table's size, occupancy and counters.
+        """
+        return {'slots': self.slots, 'bytes': self.nbytes,
+                'used': self.used, 'occupancy': self.used / self.slots,
+                'hits': self.hits, 'misses': self.misses,
+                'stores': self.stores, 'evictions': self.evictions,
+                'rejected': self.rejected}
+
+
+def budget_report(game: Any, budgets: Iterable[float],
+                  policy: str = 'depth') -> list:
+    """
+    Return, for a dict and then for a TranspositionTable of each of budgets
+    megabytes, the move the Engine chooses for game, its nodes searched and
+    the seconds taken, with the table's stats.
+    """
+    report = []
+    for budget in [None] + list(budgets):
+        table = {} if budget is None else TranspositionTable(budget, policy)
+        engine = Engine(table)
+        start = time.perf_counter()
+        move = engine.best_move(game)
+        row = {'megabytes': budget, 'move': move, 'nodes': engine.nodes,
+               'seconds': time.perf_counter() - start}
+        row.update({'used': len(table)} if budget is None else table.stats())
+        report.append(row)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 3:
+        from headless import make_game
+        board = make_game('h', True, int(sys.argv[1]))
+        rng = random.Random(0)
+        for _ in range(int(sys.argv[2])):
+            board.current_state = board.current_state.make_move(
+                rng.choice(board.current_state.get_possible_moves()))
+        for line in budget_report(board, [float(mb) for mb in sys.argv[3:]]):
+            print(line)
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
@@ -0,0 +1,68 @@
+"""
+A subset of unittests used for testing the bounded transposition table.
+"""
+import unittest
+
+from engine import Engine
+from headless import make_game
+from subtract_square_state import SubtractSquareState
+from transposition import TranspositionTable
+
+
+class TranspositionTableUnitTests(unittest.TestCase):
+    def test_store_and_probe(self):
+        """
+        Test that stored values and moves are read back like a dict's.
+        """
+        table = TranspositionTable(1)
+        state = make_game('h', True, 2).current_state
+        child = state.make_move('C')
+        self.assertIsNone(table.get(state))
+        self.assertRaises(KeyError, table.__getitem__, state)
+        table.store(state, state.WIN, 2)
+        table[child] = child.LOSE
+        self.assertEqual(table.probe(state), (state.WIN, 2))
+        self.assertEqual(table[child], child.LOSE)
+        self.assertIn(child, table)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.nbytes, 1 << 20)
+
+    def test_replacement_policies(self):
+        """
+        Test that the depth policy keeps entries with more moves from the
+        current search, and that both policies replace entries from earlier
+        searches.
+        """
+        states = [SubtractSquareState(True, total)
+                  for total in [100, 99, 98, 97, 3]]
+        for policy in ['depth', 'age']:
+            # One set of PROBES entries, which every state shares
+            table = TranspositionTable(0, policy)
+            for state in states[:4]:
+                table[state] = state.WIN
+            table[states[4]] = states[4].LOSE
+            self.assertEqual(states[4] in table, policy == 'age')
+            table.new_search()
+            table[states[4]] = states[4].LOSE
+            self.assertIn(states[4], table)
+            self.assertEqual(len(table), 4)
+            self.assertGreater(table.stats()['evictions'], 0)
+
+    def test_engine_within_budget(self):
+        """
+        Test that an engine with a table too small for the search still
+        finds the exact values, with the table's size unchanged.
+        """
+        game = make_game('h', True, 3)
+        state = game.current_state.make_move('A')
+        table = TranspositionTable(0.01)
+        size = table.nbytes
+        self.assertEqual(Engine(table).value(game, state),
+                         Engine().value(game, state))
+        self.assertEqual(table.nbytes, size)
+        self.assertEqual(len(table), table.slots)
+        self.assertGreater(table.evictions + table.rejected, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
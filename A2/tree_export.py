@@ -0,0 +1,342 @@
+"""
+Streaming export of the game trees explored by minimax.
+
+export_minimax searches a game like recursive_minimax, but writes every node
+it finishes to a writer as soon as the node's score is known, so the explored
+tree (or, with dag=True, the DAG of distinct states) can be studied afterwards
+without ever holding it in memory. Each node record has the fields
+
+    id          the node's number, in the order nodes were created
+    parent      the id of the node it was reached from (None for the root)
+    move        the move that led to it from parent (None for the root)
+    move_index  the index of move in the parent's get_possible_moves()
+    depth       its distance from the root
+    key         state.code() of its state
+    score       its minimax score for the player to move
+
+In DAG mode a state already exported is not searched again; its record is
+written again under the existing id with the new parent, so a node with
+several records has several incoming edges. Records arrive in post-order:
+children before their parent.
+"""
+from typing import Any, Callable, Iterator, TextIO, BinaryIO
+from array import array
+import json
+import struct
+
+# The default number of states export_minimax remembers in DAG mode. An entry
+# is keyed by state.code() rather than the state, so it takes about 270
+# bytes: about 18 MB for the whole table.
+DAG_TABLE_SIZE = 1 << 16
+
+
+class NodeStore:
+    """
+    The nodes on the current search path, kept in parallel arrays.
+
+    Only the path from the root to the node being searched is stored, so the
+    store's size is bounded by the depth of the game rather than the number of
+    nodes exported.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty NodeStore.
+        """
+        self.ids = array('q')
+        self.parents = array('q')
+        self.move_indexes = array('l')
+        self.depths = array('L')
+        self.moves_tried = array('L')
+        self.scores = array('d')
+        self.best_moves = array('l')
+        self.states = []
+        self.moves = []
+
+    def push(self, node_id: int, state: Any, moves: list) -> None:
+        """
+        Add the node node_id with state and its possible moves to the top of
+        the path, as a child of the current top node reached by its next
+        move.
+        """
+        if self.ids:
+            self.parents.append(self.ids[-1])
+            self.move_indexes.append(self.moves_tried[-1] - 1)
+        else:
+            self.parents.append(-1)
+            self.move_indexes.append(-1)
+        self.ids.append(node_id)
+        self.depths.append(len(self.ids) - 1)
+        self.moves_tried.append(0)
+        self.scores.append(float('-inf'))
+        self.best_moves.append(-1)
+        self.states.append(state)
+        self.moves.append(moves)
+
+    def pop(self) -> None:
+        """
+        Remove the node at the top of the path.
+        """
+        for column in [self.ids, self.parents, self.move_indexes, self.depths,
+                       self.moves_tried, self.scores, self.best_moves,
+                       self.states, self.moves]:
+            column.pop()
+
+    def record(self) -> dict:
+        """
+        Return the node record of the top node.
+        """
+        parent, move = None, None
+        if len(self) > 1:
+            parent = self.parents[-1]
+            move = self.moves[-2][self.move_indexes[-1]]
+        return _record(self.ids[-1], parent, move, self.move_indexes[-1],
+                       self.depths[-1], self.states[-1], self.scores[-1])
+
+    def record_child(self, score: float) -> None:
+        """
+        Record that the last move tried from the top node scored score for
+        the child's player to move.
+        """
+        if -score > self.scores[-1]:
+            self.scores[-1] = -score
+            self.best_moves[-1] = self.moves_tried[-1] - 1
+
+    def __len__(self) -> int:
+        """
+        Return the number of nodes on the path.
+        """
+        return len(self.ids)
+
+
+class NDJSONWriter:
+    """
+    Write node records to a text file, one JSON object per line.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        """
+        Initialize this NDJSONWriter to write to file.
+        """
+        self.file = file
+
+    def write(self, record: dict) -> None:
+        """
+        Write record to the file.
+        """
+        self.file.write(json.dumps(record) + '\n')
+
+
+# A binary record: id, parent (-1 for the root), depth, index of the move in
+# the parent's get_possible_moves() (ROOT_INDEX for the root, which is told
+# apart by its parent), score, and the low and high 64 bits of the key.
+BINARY_MAGIC = b'MMTX\x02'
+BINARY_RECORD = struct.Struct('<qqIIdQQ')
+ROOT_INDEX = 0xFFFFFFFF
+# Version 1 records, with 16-bit depths and move indexes, are still read
+_BINARY_V1_MAGIC = b'MMTX\x01'
+_BINARY_V1_RECORD = struct.Struct('<qqHHdQQ')
+
+
+class BinaryWriter:
+    """
+    Write node records to a binary file as fixed-size BINARY_RECORDs, after
+    the BINARY_MAGIC header. Moves are stored by their index, not their value.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        """
+        Initialize this BinaryWriter to write to file.
+        """
+        self.file = file
+        self.file.write(BINARY_MAGIC)
+
+    def write(self, record: dict) -> None:
+        """
+        Write record to the file.
+        """
+        parent = -1 if record['parent'] is None else record['parent']
+        index = ROOT_INDEX if record['parent'] is None \
+            else record['move_index']
+        self.file.write(BINARY_RECORD.pack(
+            record['id'], parent, record['depth'], index, record['score'],
+            record['key'] & 0xFFFFFFFFFFFFFFFF, record['key'] >> 64))
+
+
+def read_binary(file: BinaryIO) -> Iterator[dict]:
+    """
+    Yield the node records of a file written by BinaryWriter, or by its
+    version 1 format. Their moves are None, since only move_index is stored.
+    """
+    magic = file.read(len(BINARY_MAGIC))
+    if magic == BINARY_MAGIC:
+        layout = BINARY_RECORD
+    elif magic == _BINARY_V1_MAGIC:
+        layout = _BINARY_V1_RECORD
+    else:
+        raise ValueError('not a binary tree export')
+    chunk = file.read(layout.size)
+    while len(chunk) == layout.size:
+        node_id, parent, depth, index, score, low, high = \
+            layout.unpack(chunk)
+        yield {'id': node_id, 'parent': None if parent < 0 else parent,
+               'move': None, 'move_index': None if parent < 0 else index,
+               'depth': depth, 'key': (high << 64) | low, 'score': score}
+        chunk = file.read(layout.size)
+
+
+def read_ndjson(file: TextIO) -> Iterator[dict]:
+    """
+    Yield the node records of a file written by NDJSONWriter.
+    """
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def export_minimax(game: Any, writer: Any, max_depth: int = None,
+                   evaluator: Callable[[Any], float] = None,
+                   dag: bool = False,
+                   max_table: int = DAG_TABLE_SIZE) -> Any:
+    """
+    Return the most optimal move for game, writing every node searched to
+    writer as it is finished.
+
+    With max_depth, states max_depth moves ahead are scored with evaluator
+    (by default their rough_outcome). With dag, states already exported are
+    linked to rather than searched again; at most max_table states are
+    remembered for this, after which repeated states are searched as new
+    nodes.
+    """
+    store = NodeStore()
+    table = {}
+    next_id = 1
+    store.push(0, game.current_state,
+               list(game.current_state.iter_possible_moves()))
+
+    while store:
+        state = store.states[-1]
+        depth = store.depths[-1]
+        moves = store.moves[-1]
+        if store.moves_tried[-1] == 0 and game.is_over(state):
+            # The player who made the last move has won.
+            store.scores[-1] = state.LOSE
+            moves = []
+        elif store.moves_tried[-1] == 0 and \
+                (not moves or depth == max_depth):
+            store.scores[-1] = state.rough_outcome() if evaluator is None \
+                else evaluator(state)
+            moves = []
+
+        if store.moves_tried[-1] < len(moves):
+            child = state.make_move(moves[store.moves_tried[-1]])
+            store.moves_tried[-1] += 1
+            remaining = None if max_depth is None else max_depth - depth - 1
+            known = table.get((child.code(), remaining)) if dag else None
+            if known is None:
+                store.push(next_id, child, list(child.iter_possible_moves()))
+                next_id += 1
+            else:
+                index = store.moves_tried[-1] - 1
+                writer.write(_record(known[0], store.ids[-1], moves[index],
+                                     index, depth + 1, child, known[1]))
+                store.record_child(known[1])
+        else:
+            writer.write(store.record())
+            if dag and len(table) < max_table:
+                remaining = None if max_depth is None else max_depth - depth
+                table[(state.code(), remaining)] = (store.ids[-1],
+                                                    store.scores[-1])
+            score = store.scores[-1]
+            best = store.best_moves[-1]
+            store.pop()
+            if store:
+                store.record_child(score)
+            elif best >= 0:
+                return moves[best]
+    return None
+
+
+def _record(node_id: int, parent: int, move: Any, index: int, depth: int,
+            state: Any, score: float) -> dict:
+    """
+    Return the node record with the given fields. move_index is kept for
+    BinaryWriter, which stores moves by index.
+    """
+    return {'id': node_id, 'parent': parent, 'move': move,
+            'move_index': index, 'depth': depth, 'key': state.code(),
+            'score': score}
+
+
+def make_exporting_strategy(path: str, binary: bool = False,
+                            **options: Any) -> Callable[[Any], Any]:
+    """
+    Return a strategy that plays export_minimax, writing the tree searched
+    for its n-th move to path with n added before the extension. options are
+    passed on to export_minimax.
+    """
+    calls = [0]
+
+    def strategy(game: Any) -> Any:
+        """
+        Return export_minimax's move for game, exporting its search.
+        """
+        calls[0] += 1
+        stem, dot, extension = path.rpartition('.')
+        name = '{}{}{}{}'.format(stem, calls[0], dot, extension) if dot \
+            else '{}{}'.format(path, calls[0])
+        with open(name, 'wb' if binary else 'w') as file:
+            writer = BinaryWriter(file) if binary else NDJSONWriter(file)
+            return export_minimax(game, writer, **options)
+    return strategy
+
+
+def to_graphviz(records: Iterator[dict], file: TextIO,
+                max_nodes: int = 1000) -> None:
+    """
+    Write the tree or DAG described by records to file in Graphviz DOT
+    format, labelling each node with its score and each edge with its move.
+
+    Raise ValueError if there are more than max_nodes nodes, since larger
+    graphs are unreadable when drawn.
+    """
+    nodes = set()
+    file.write('digraph minimax {\n')
+    for record in records:
+        if record['id'] not in nodes:
+            if len(nodes) == max_nodes:
+                raise ValueError('more than {} nodes'.format(max_nodes))
+            nodes.add(record['id'])
+            file.write('  n{} [label="{:g}"];\n'.format(record['id'],
+                                                       record['score']))
+        if record['parent'] is not None:
+            label = record['move'] if record['move'] is not None \
+                else '#{}'.format(record['move_index'])
+            file.write('  n{} -> n{} [label="{}"];\n'.format(
+                record['parent'], record['id'], label))
+    file.write('}\n')
+
+
+def read_export(path: str) -> Iterator[dict]:
+    """
+    Yield the node records of the export at path, in either format.
+    """
+    with open(path, 'rb') as file:
+        binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if binary:
+        with open(path, 'rb') as file:
+            yield from read_binary(file)
+    else:
+        with open(path) as file:
+            yield from read_ndjson(file)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) == 3:
+        # python tree_export.py EXPORT DOT converts an export to Graphviz
+        with open(sys.argv[2], 'w') as dot:
+            to_graphviz(read_export(sys.argv[1]), dot)
+    else:
+        from python_ta import check_all
+        check_all(config="a2_pyta.txt")
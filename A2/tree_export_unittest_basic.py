@@ -0,0 +1,105 @@
+"""
+A subset of unittests used for testing the tree export of minimax.
+"""
+import io
+import struct
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+from tree_export import export_minimax, NDJSONWriter, BinaryWriter, \
+    NodeStore, read_ndjson, read_binary, to_graphviz
+StonehengeGame = playable_games['h']
+SubtractSquareGame = playable_games['s']
+
+
+class TreeExportUnitTests(unittest.TestCase):
+    def test_export_subtract_square_18(self):
+        """
+        Test export_minimax on a game of SubtractSquare with a value of 18 to
+        make sure it picks a winning move and exports one record per node,
+        ending with the root.
+        """
+        with patch('builtins.input', return_value='18'):
+            game = SubtractSquareGame(True)
+        file = io.StringIO()
+
+        move_chosen = export_minimax(game, NDJSONWriter(file))
+        records = list(read_ndjson(io.StringIO(file.getvalue())))
+
+        self.assertTrue(move_chosen in [1, 16],
+                        "export_minimax should choose 1 or 16 for 18, but " +
+                        "chose {}.".format(move_chosen))
+        self.assertEqual(sorted(r['id'] for r in records),
+                         list(range(len(records))),
+                         "Every node of the tree should be exported once.")
+        self.assertEqual((records[-1]['parent'], records[-1]['score']),
+                         (None, 1),
+                         "The root, which is a win, should be exported last.")
+
+    def test_export_dag_stonehenge(self):
+        """
+        Test that DAG mode on a game of Stonehenge finds the same move while
+        exporting fewer distinct nodes than the tree, and that the binary
+        format holds the same records.
+        """
+        with patch('builtins.input', return_value='2'):
+            game = StonehengeGame(True)
+        for move in ['A', 'F', 'D']:
+            game.current_state = game.current_state.make_move(move)
+        tree, dag = io.StringIO(), io.BytesIO()
+
+        tree_move = export_minimax(game, NDJSONWriter(tree))
+        dag_move = export_minimax(game, BinaryWriter(dag), dag=True)
+        dag.seek(0)
+        tree_records = list(read_ndjson(io.StringIO(tree.getvalue())))
+        dag_records = list(read_binary(dag))
+
+        self.assertEqual((tree_move, dag_move), ('E', 'E'),
+                         "Both modes should choose the winning move E.")
+        self.assertLess(len({r['id'] for r in dag_records}),
+                        len(tree_records),
+                        "The DAG should have fewer nodes than the tree.")
+        self.assertEqual(dag_records[-1]['key'],
+                         game.current_state.code(),
+                         "The root record should hold the root's key.")
+
+        dot = io.StringIO()
+        to_graphviz(iter(dag_records), dot)
+        self.assertTrue(dot.getvalue().startswith('digraph'),
+                        "to_graphviz should write a Graphviz digraph.")
+
+    def test_deep_path(self):
+        """
+        Test that the path store holds depths and move counts past 65535.
+        """
+        store = NodeStore()
+        for node_id in range(70000):
+            store.push(node_id, None, [])
+            store.moves_tried[-1] = 70000
+        self.assertEqual(store.depths[-1], 69999)
+        store.record_child(-1)
+        self.assertEqual(store.best_moves[-1], 69999)
+
+    def test_binary_wide_fields(self):
+        """
+        Test that binary exports keep depths and move indexes past 65535,
+        including the index 65535, and still read version 1 files.
+        """
+        records = [{'id': 1, 'parent': 0, 'move': None, 'move_index': 65535,
+                    'depth': 70000, 'key': 1 << 70, 'score': -1.0},
+                   {'id': 0, 'parent': None, 'move': None, 'move_index': None,
+                    'depth': 0, 'key': 5, 'score': 1.0}]
+        file = io.BytesIO()
+        writer = BinaryWriter(file)
+        for record in records:
+            writer.write(record)
+        file.seek(0)
+        self.assertEqual(list(read_binary(file)), records)
+        old = io.BytesIO(b'MMTX\x01' + struct.pack('<qqHHdQQ', 0, -1, 0,
+                                                    0xFFFF, 1.0, 5, 0))
+        self.assertEqual(list(read_binary(old)), records[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()